@@ -254,7 +254,10 @@ def chk_make_subdir(base, name):
     """Check if sub-directory exists in parent directory"""
     d = os.path.join(base, name)
     if not os.path.exists(d):
-        os.mkdir(d)
+        try:
+            os.mkdir(d)
+        except FileExistsError: # created in the meantime by other process
+            pass
     return d
 
 def check_dirs_exist(*dirs, **add_dirs):
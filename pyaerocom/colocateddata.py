@@ -12,7 +12,7 @@ from pyaerocom.plot.plotscatter import plot_scatter
 from pyaerocom.variable import Variable
 from pyaerocom.region import valid_default_region, Region
 from pyaerocom.geodesy import get_country_info_coords
-from pyaerocom.helpers_landsea_masks import (load_region_mask_xr, get_mask_value)
+from pyaerocom.helpers_landsea_masks import check_coords_in_region_mask
 
 import numpy as np
 import pandas as pd
@@ -394,8 +394,14 @@ class ColocatedData(object):
         # if colocate time is activated, remove datapoints from model, where
         # there is no observation
         if colocate_time:
-            mask = np.isnan(col.data[0]).data
-            col.data.data[1][mask] = np.nan
+            if isinstance(col.data.data, np.ndarray):
+                mask = np.isnan(col.data[0]).data
+                col.data.data[1][mask] = np.nan
+            else: # lazy (dask) array, does not support item assignment
+                arr = col.data
+                invalid = (np.isnan(arr[0]) &
+                           (arr.data_source == arr.data_source[1]))
+                col._data = arr.where(~invalid)
 
         from pyaerocom.time_resampler import TimeResampler
 
@@ -522,17 +528,18 @@ class ColocatedData(object):
                 list(obs.longitude[~invalid].values))
 
     def _iter_stats(self):
+        return list(zip(*self._get_stat_coords_arrays()))
+
+    def _get_stat_coords_arrays(self):
+        """Arrays of latitudes, longitudes and names of stations"""
         if not 'station_name' in self.data.dims:
             raise AttributeError('ColocatedData object has no dimension '
                                  'station_name. Consider stacking...')
         if 'latitude' in self.dims and 'longitude' in self.dims:
             raise AttributeError('Cannot init station iter index since '
                                  'latitude and longitude are othorgonal')
-        lats = self.data.latitude.values
-        lons = self.data.longitude.values
-        stats = self.data.station_name.values
-
-        return list(zip(lats, lons, stats))
+        return (self.data.latitude.values, self.data.longitude.values,
+                self.data.station_name.values)
 
     def _get_stat_coords(self):
         if self.ndim == 4:
@@ -1221,16 +1228,12 @@ class ColocatedData(object):
 
         data = self if inplace else self.copy()
 
-        mask = load_region_mask_xr(region_id)
-
         if data.ndim == 4:
             data = data.flatten_latlondim_station_name()
         arr = data.data
-        drop_idx = []
-        for (lat, lon, stat) in data._iter_stats():
-
-            if get_mask_value(lat, lon, mask) < 1:
-                drop_idx.append(stat)
+        lats, lons, stats = data._get_stat_coords_arrays()
+        in_mask = check_coords_in_region_mask(lats, lons, region_id)
+        drop_idx = stats[~in_mask].tolist()
 
         if len(drop_idx) > 0:
             arr = arr.drop(dim='station_name', labels=drop_idx)
@@ -3,6 +3,7 @@
 """
 Methods and / or classes to perform colocation
 """
+from collections import OrderedDict as od
 import numpy as np
 import os
 import pandas as pd
@@ -12,6 +13,7 @@ from pyaerocom import __version__ as pya_ver
 
 from pyaerocom.colocateddata import ColocatedData
 from pyaerocom.exceptions import (ColocationError,
+                                  DataCoverageError,
                                   DataUnitError,
                                   DimensionOrderError,
                                   MetaDataError,
@@ -21,7 +23,11 @@ from pyaerocom.filter import Filter
 from pyaerocom.helpers import (to_pandas_timestamp,
                                to_datestring_YYYYMMDD,
                                make_datetime_index,
+                               start_stop,
                                isnumeric)
+from pyaerocom.stationdata import StationData
+from pyaerocom.time_config import TS_TYPE_TO_NUMPY_FREQ
+from pyaerocom.time_resampler import TimeResampler
 from pyaerocom.tstype import TsType
 from pyaerocom.variable import Variable
 
@@ -74,6 +80,130 @@ def _regrid_gridded(gridded, regrid_scheme, regrid_res_deg):
 
     return gridded.regrid(scheme=regrid_scheme, **regrid_res_deg)
 
+def _get_overlap_time_window(gridded_data, gridded_data_ref, start=None,
+                             stop=None):
+    """Get overlapping time window of 2 gridded data objects
+
+    Parameters
+    ----------
+    gridded_data : GriddedData
+        gridded data (e.g. model results)
+    gridded_data_ref : GriddedData
+        reference gridded data
+    start : :obj:`str` or :obj:`datetime64` or similar, optional
+        desired start time. If None, the start of `gridded_data` is used.
+    stop : :obj:`str` or :obj:`datetime64` or similar, optional
+        desired stop time. If None, the stop of `gridded_data` is used.
+
+    Raises
+    ------
+    TimeMatchError
+        if time window does not overlap with `gridded_data`
+
+    Returns
+    -------
+    pandas.Timestamp
+        start of overlapping time window
+    pandas.Timestamp
+        stop of overlapping time window
+    """
+    grid_start = to_pandas_timestamp(gridded_data.start)
+    grid_stop = to_pandas_timestamp(gridded_data.stop)
+
+    grid_start_ref = to_pandas_timestamp(gridded_data_ref.start)
+    grid_stop_ref = to_pandas_timestamp(gridded_data_ref.stop)
+
+    if start is None:
+        start = grid_start
+    else:
+        start = to_pandas_timestamp(start)
+    if stop is None:
+        stop = grid_stop
+    else:
+        stop = to_pandas_timestamp(stop)
+
+    if grid_start_ref > start:
+        start = grid_start_ref
+    if grid_stop_ref < stop:
+        stop = grid_stop_ref
+    # check overlap
+    if stop < grid_start or start > grid_stop:
+        raise TimeMatchError('Input time range {}-{} does not '
+                             'overlap with data range: {}-{}'
+                             .format(start, stop, grid_start, grid_stop))
+    return start, stop
+
+def _precrop_gridded(gridded, start, stop, regfilter, pad_deg=0):
+    """Crop gridded data to subset that is required for colocation
+
+    Used to reduce the amount of data *before* expensive operations such as
+    regridding and resampling in time. The data is cropped to the full years
+    covered by the input time window and to the bounding box of the region
+    of the input filter (padded by input `pad_deg`), so that the final
+    (exact) cropping and filtering of the colocated data yields the same
+    result as without this step. Mask regions (HTAP) are not cropped.
+
+    Parameters
+    ----------
+    gridded : GriddedData
+        data object to be cropped
+    start : pandas.Timestamp
+        start of colocation time window
+    stop : pandas.Timestamp
+        stop of colocation time window
+    regfilter : Filter
+        region filter that is applied to the colocated data
+    pad_deg : float
+        padding of region bounding box in degrees
+
+    Returns
+    -------
+    GriddedData
+        cropped data object (or input object, if nothing is to be cropped)
+    """
+    crop_args = {}
+    t0 = pd.Timestamp(start.year, 1, 1)
+    t1 = pd.Timestamp(stop.year + 1, 1, 1) - pd.Timedelta(1, 'us')
+    if (to_pandas_timestamp(gridded.start) < t0 or
+            to_pandas_timestamp(gridded.stop) > t1):
+        crop_args['time_range'] = (t0, t1)
+
+    region = regfilter.region_name
+    if (region != regfilter.NO_REGION_FILTER_NAME and
+            not region in const.HTAP_REGIONS):
+        lon0, lon1 = regfilter.lon_range
+        lat0, lat1 = regfilter.lat_range
+        lat_range = (max(lat0 - pad_deg, -90), min(lat1 + pad_deg, 90))
+        if lat_range != (-90, 90):
+            crop_args['lat_range'] = lat_range
+        if lon1 - lon0 + 2 * pad_deg < 360:
+            crop_args['lon_range'] = (max(lon0 - pad_deg, -180),
+                                      min(lon1 + pad_deg, 180))
+    if len(crop_args) == 0:
+        return gridded
+    logger.info('Cropping {} before colocation: {}'.format(gridded.data_id,
+                                                           crop_args))
+    return gridded.crop(**crop_args)
+
+def _get_regrid_pad_deg(*gridded, regrid_res_deg=None):
+    """Padding of region bounding box required for regridding
+
+    Twice the coarsest lon / lat resolution of the input data objects (and
+    of `regrid_res_deg`, if provided), such that all grid cells that
+    overlap with grid cells at the border of a region are retained.
+    """
+    res = []
+    for data in gridded:
+        try:
+            res.extend([abs(data.lon_res), abs(data.lat_res)])
+        except (AttributeError, ValueError):
+            return 360
+    if isinstance(regrid_res_deg, dict):
+        res.extend(regrid_res_deg.values())
+    elif regrid_res_deg is not None:
+        res.append(regrid_res_deg)
+    return 2 * max(res)
+
 def colocate_gridded_gridded(gridded_data, gridded_data_ref, ts_type=None,
                              start=None, stop=None, filter_name=None,
                              regrid_res_deg=None, remove_outliers=True,
@@ -197,6 +327,23 @@ def colocate_gridded_gridded(gridded_data, gridded_data_ref, ts_type=None,
     if filter_name is None:
         filter_name = const.DEFAULT_REG_FILTER
 
+    if update_baseyear_gridded is not None:
+        # update time dimension in gridded data
+        gridded_data.base_year = update_baseyear_gridded
+
+    # compute overlapping time window and bounding box of region first and
+    # crop input data accordingly, so that regridding and resampling are
+    # only applied to the required subset
+    start, stop = _get_overlap_time_window(gridded_data, gridded_data_ref,
+                                           start, stop)
+    regfilter = Filter(name=filter_name)
+    pad_deg = _get_regrid_pad_deg(gridded_data, gridded_data_ref,
+                                  regrid_res_deg=regrid_res_deg)
+    gridded_data = _precrop_gridded(gridded_data, start, stop, regfilter,
+                                    pad_deg)
+    gridded_data_ref = _precrop_gridded(gridded_data_ref, start, stop,
+                                        regfilter, pad_deg)
+
     if harmonise_units and gridded_data.var_info.has_unit:
         if not gridded_data.units == gridded_data_ref.units:
             try:
@@ -212,8 +359,8 @@ def colocate_gridded_gridded(gridded_data, gridded_data_ref, ts_type=None,
     aerocom_var = gridded_data.var_name_aerocom
     _check_var_registered(var, aerocom_var, gridded_data)
 
+    low, high, low_ref, high_ref = None, None, None, None
     if remove_outliers:
-        low, high, low_ref, high_ref = None, None, None, None
         if var in var_outlier_ranges:
             low, high = var_outlier_ranges[var]
         if var_ref in var_ref_outlier_ranges:
@@ -226,10 +373,6 @@ def colocate_gridded_gridded(gridded_data, gridded_data_ref, ts_type=None,
             gridded_data_ref.remove_outliers(low_ref, high_ref,
                                              inplace=True)
 
-    if update_baseyear_gridded is not None:
-        # update time dimension in gridded data
-        gridded_data.base_year = update_baseyear_gridded
-
     if regrid_res_deg is not None:
         gridded_data_ref = _regrid_gridded(gridded_data_ref,
                                            regrid_scheme,
@@ -241,12 +384,6 @@ def colocate_gridded_gridded(gridded_data, gridded_data_ref, ts_type=None,
     else:
         gridded_data_ref = gridded_data_ref.regrid(gridded_data,
                                                    scheme=regrid_scheme)
-    # get start / stop of gridded data as pandas.Timestamp
-    grid_start = to_pandas_timestamp(gridded_data.start)
-    grid_stop = to_pandas_timestamp(gridded_data.stop)
-
-    grid_start_ref = to_pandas_timestamp(gridded_data_ref.start)
-    grid_stop_ref = to_pandas_timestamp(gridded_data_ref.stop)
 
     # time resolution of dataset to be analysed
     grid_ts_type = grid_ts_type_src = gridded_data.ts_type
@@ -276,29 +413,10 @@ def colocate_gridded_gridded(gridded_data, gridded_data_ref, ts_type=None,
     if ts_type is None or TsType(grid_ts_type) < TsType(ts_type):
         ts_type = grid_ts_type
 
-    if start is None:
-        start = grid_start
-    else:
-        start = to_pandas_timestamp(start)
-    if stop is None:
-        stop = grid_stop
-    else:
-        stop = to_pandas_timestamp(stop)
-
-    if grid_start_ref > start:
-        start = grid_start_ref
-    if grid_stop_ref < stop:
-        stop = grid_stop_ref
-    # check overlap
-    if stop < grid_start or start > grid_stop:
-        raise TimeMatchError('Input time range {}-{} does not '
-                             'overlap with data range: {}-{}'
-                             .format(start, stop, grid_start, grid_stop))
     gridded_data = gridded_data.crop(time_range=(start, stop))
     gridded_data_ref = gridded_data_ref.crop(time_range=(start, stop))
 
     # perform region extraction (if applicable)
-    regfilter = Filter(name=filter_name)
     gridded_data = regfilter(gridded_data)
     gridded_data_ref = regfilter(gridded_data_ref)
 
@@ -332,14 +450,21 @@ def colocate_gridded_gridded(gridded_data, gridded_data_ref, ts_type=None,
 
     meta.update(regfilter.to_dict())
 
-    data = gridded_data.grid.data
-    if isinstance(data, np.ma.core.MaskedArray):
-        data = data.filled(np.nan)
-    data_ref = gridded_data_ref.grid.data
-    if isinstance(data_ref, np.ma.core.MaskedArray):
-        data_ref = data_ref.filled(np.nan)
-    arr = np.asarray((data_ref,
-                      data))
+    if gridded_data.lazy_mode or gridded_data_ref.lazy_mode:
+        # keep data lazy, it is computed when it is accessed or saved
+        import dask.array as da
+        data = da.ma.filled(gridded_data.grid.lazy_data(), np.nan)
+        data_ref = da.ma.filled(gridded_data_ref.grid.lazy_data(), np.nan)
+        arr = da.stack((data_ref, data))
+    else:
+        data = gridded_data.grid.data
+        if isinstance(data, np.ma.core.MaskedArray):
+            data = data.filled(np.nan)
+        data_ref = gridded_data_ref.grid.data
+        if isinstance(data_ref, np.ma.core.MaskedArray):
+            data_ref = data_ref.filled(np.nan)
+        arr = np.asarray((data_ref,
+                          data))
     time = gridded_data.time_stamps().astype('datetime64[ns]')
     lats = gridded_data.latitude.points
     lons = gridded_data.longitude.points
@@ -356,8 +481,9 @@ def colocate_gridded_gridded(gridded_data, gridded_data_ref, ts_type=None,
 
     dims = ['data_source', 'time', 'latitude', 'longitude']
 
-    data = ColocatedData(data=arr, coords=coords, dims=dims,
-                         name=gridded_data.var_name, attrs=meta)
+    data = ColocatedData(data=xr.DataArray(arr, coords=coords, dims=dims,
+                                           name=gridded_data.var_name,
+                                           attrs=meta))
 
     # add correct units for lat / lon dimensions
     data.latitude.attrs['standard_name'] = gridded_data.latitude.standard_name
@@ -448,6 +574,578 @@ def _colocate_site_data_helper(stat_data, stat_data_ref, var, var_ref,
     # fill up missing time stamps
     return pd.concat([obs_ts2, grid_ts2], axis=1, keys=['ref', 'data'])
 
+def _colocate_stations_chunk(grid_stats, obs_stats, var, var_ref,
+                             harmonise_units, remove_outliers_grid, low, high,
+                             ts_type, resample_how,
+                             apply_time_resampling_constraints, min_num_obs,
+                             use_climatology_ref):
+    """
+    Helper method that colocates a list of model / obs site pairs
+
+    Performs unit harmonisation and outlier removal in the model timeseries
+    and colocation of each pair of sites using
+    :func:`_colocate_site_data_helper`. Used in main loop of
+    :func:`colocate_gridded_ungridded` (also in worker processes, if
+    colocation is run in parallel).
+
+    Parameters
+    ----------
+    grid_stats : list
+        list of :class:`StationData` objects extracted from gridded data
+    obs_stats : list
+        list of corresponding :class:`StationData` objects from observations
+    var : str
+        variable to be used from `grid_stats`
+    var_ref : str
+        variable to be used from `obs_stats`
+    harmonise_units : bool
+        if True, units of model data are converted into units of obs data
+    remove_outliers_grid : bool
+        if True, outliers are removed from model data
+    low : float, optional
+        lower outlier bound for model data
+    high : float, optional
+        upper outlier bound for model data
+    ts_type : str
+        output frequency
+    resample_how : str or dict
+        how to aggregate data when resampling in time
+    apply_time_resampling_constraints : bool, optional
+        cf. :func:`_colocate_site_data_helper`
+    min_num_obs : int or dict, optional
+        cf. :func:`_colocate_site_data_helper`
+    use_climatology_ref : bool
+        if True, climatological timeseries are used from observations
+
+    Returns
+    -------
+    list
+        list containing 2-element tuples with colocated obs and model data
+        arrays for each input site pair
+    """
+    result = []
+    for grid_stat, obs_stat in zip(grid_stats, obs_stats):
+        if harmonise_units:
+            grid_unit = grid_stat.get_unit(var)
+            obs_unit = obs_stat.get_unit(var_ref)
+            if not grid_unit == obs_unit:
+                grid_stat.convert_unit(var, obs_unit)
+
+        if remove_outliers_grid:
+            # don't check if harmonise_units is active, because the
+            # remove_outliers method checks units based on AeroCom default
+            # variables, and a variable mapping might be active, i.e.
+            # sometimes models use abs550aer for absorption coefficients
+            # with units [m-1] and not for AAOD (which is the AeroCom default
+            # and unitless. Hence, unit check in remove_outliers works only
+            # if the variable name (and unit) corresonds to AeroCom default)
+            #chk_unit = not harmonise_units
+            grid_stat.remove_outliers(var, low=low, high=high,
+                                      check_unit=True)
+
+        _df = _colocate_site_data_helper(
+            stat_data=grid_stat,
+            stat_data_ref=obs_stat,
+            var=var, var_ref=var_ref,
+            ts_type=ts_type,
+            resample_how=resample_how,
+            apply_time_resampling_constraints=apply_time_resampling_constraints,
+            min_num_obs=min_num_obs,
+            use_climatology_ref=use_climatology_ref)
+
+        result.append((_df['ref'].values, _df['data'].values))
+    return result
+
+def _colocate_stations_multiproc(grid_stats, obs_stats, num_proc, **kwargs):
+    """
+    Run :func:`_colocate_stations_chunk` in parallel using multiprocessing
+
+    The input site pairs are split into contiguous chunks (preserving the
+    order of the sites), which are processed in separate worker processes.
+
+    Parameters
+    ----------
+    grid_stats : list
+        list of :class:`StationData` objects extracted from gridded data
+    obs_stats : list
+        list of corresponding :class:`StationData` objects from observations
+    num_proc : int
+        number of processes
+    **kwargs
+        remaining input args for :func:`_colocate_stations_chunk`
+
+    Returns
+    -------
+    list
+        colocated data for each input site pair (in the same order as input)
+    """
+    import multiprocessing
+    from functools import partial
+    num_stats = len(obs_stats)
+    # use a few more chunks than processes for better load balancing
+    num_chunks = min(num_stats, num_proc * 4)
+    args = []
+    for chunk in np.array_split(np.arange(num_stats), num_chunks):
+        if len(chunk) == 0:
+            continue
+        start, stop = chunk[0], chunk[-1] + 1
+        args.append((grid_stats[start:stop], obs_stats[start:stop]))
+
+    const.print_log.info('Colocating {} sites using {} processes'
+                         .format(num_stats, num_proc))
+    with multiprocessing.Pool(processes=num_proc) as pool:
+        results = pool.starmap(partial(_colocate_stations_chunk, **kwargs),
+                               args)
+    return [item for chunk_result in results for item in chunk_result]
+
+def _floor_times(times, ts_type):
+    """
+    Floor timestamps to the start of the enclosing period of a given frequency
+
+    Parameters
+    ----------
+    times : ndarray
+        array of :class:`numpy.datetime64` timestamps
+    ts_type : str
+        temporal resolution (must be specified in
+        :attr:`ARRAY_ENGINE_TS_TYPES`)
+
+    Returns
+    -------
+    ndarray
+        start timestamps of periods (datetime64[ns])
+    """
+    unit = TS_TYPE_TO_NUMPY_FREQ[ts_type]
+    return (np.asarray(times).astype('datetime64[{}]'.format(unit))
+            .astype('datetime64[ns]'))
+
+#: Colocation frequencies that are supported by the array based colocation
+#: engine (cf. :func:`_colocate_gridded_ungridded_arr`). These are all
+#: frequencies for which the pandas resampling bins correspond to calendar
+#: periods (i.e. closed left and labelled with period start)
+ARRAY_ENGINE_TS_TYPES = ['minutely', 'hourly', 'daily', 'monthly', 'yearly']
+
+def _get_resample_steps(from_ts_type, to_ts_type, how, apply_constraints,
+                        min_num_obs):
+    """
+    Get resampling steps applied in :func:`TimeResampler.resample`
+
+    Parameters
+    ----------
+    from_ts_type : TsType, optional
+        current temporal resolution of data
+    to_ts_type : TsType
+        output resolution
+    how : str or dict, optional
+        aggregator(s) used for resampling
+    apply_constraints : bool, optional
+        whether hierarchical resampling constraints are applied
+    min_num_obs : int or dict, optional
+        resampling constraints
+
+    Returns
+    -------
+    list, optional
+        list of 3-element tuples containing output frequency, minimum number
+        of observations and aggregator for each resampling step. None, if
+        resampling in :class:`TimeResampler` would raise an Exception or if
+        any of the steps is not supported by the array based colocation
+        engine.
+    """
+    if how is None:
+        how = 'mean'
+    if apply_constraints is None:
+        apply_constraints = TimeResampler.APPLY_CONSTRAINTS
+    if not apply_constraints or from_ts_type is None:
+        if not isinstance(how, str):
+            return None
+        steps = [(to_ts_type.val, None, how)]
+    elif to_ts_type > from_ts_type:
+        return None
+    elif to_ts_type == from_ts_type:
+        steps = [(to_ts_type.val, None, 'mean')]
+    else:
+        if min_num_obs is None:
+            min_num_obs = TimeResampler.SAMPLING_CONSTRAINTS
+        try:
+            steps = TimeResampler()._gen_idx(from_ts_type, to_ts_type,
+                                             min_num_obs, how)
+        except ValueError:
+            return None
+    if not all([step[0] in ARRAY_ENGINE_TS_TYPES for step in steps]):
+        return None
+    return steps
+
+def _resample_arr(groups, times, vals, steps):
+    """
+    Resample timeseries of multiple sites, provided in long format
+
+    Parameters
+    ----------
+    groups : ndarray
+        site index of each value
+    times : ndarray
+        timestamps of each value
+    vals : ndarray
+        values
+    steps : list
+        resampling steps (cf. :func:`_get_resample_steps`)
+
+    Returns
+    -------
+    ndarray
+        site index of each resampled value
+    ndarray
+        period start timestamps of each resampled value
+    ndarray
+        resampled values
+    """
+    for to_ts_type, min_num, how in steps:
+        periods = _floor_times(times, to_ts_type)
+        df = pd.DataFrame({'group' : groups, 'period' : periods, 'val' : vals})
+        grouped = df.groupby(['group', 'period'], sort=False)['val']
+        if min_num is None:
+            result = grouped.agg(how)
+            vals = result.values.astype(np.float64)
+        else:
+            result = grouped.agg([how, 'count'])
+            vals = result[how].values.astype(np.float64)
+            vals[result['count'].values < min_num] = np.nan
+        groups = result.index.get_level_values(0).values
+        times = result.index.get_level_values(1).values
+    return (groups, times, vals)
+
+def _resample_arr_shared_time(times, data, steps):
+    """
+    Resample timeseries of multiple sites that share a common time axis
+
+    Parameters
+    ----------
+    times : ndarray
+        timestamps (first dimension of `data`)
+    data : ndarray
+        2D array containing timeseries of each site in columns
+    steps : list
+        resampling steps (cf. :func:`_get_resample_steps`)
+
+    Returns
+    -------
+    ndarray
+        period start timestamps of resampled data
+    ndarray
+        resampled 2D array
+    """
+    df = pd.DataFrame(data, index=times)
+    for to_ts_type, min_num, how in steps:
+        grouped = df.groupby(_floor_times(df.index.values, to_ts_type))
+        result = grouped.agg(how)
+        if min_num is not None:
+            result[grouped.count() < min_num] = np.nan
+        df = result
+    return (df.index.values, df.values.astype(np.float64))
+
+def _periods_to_time_index(periods, time_idx, ts_type):
+    """
+    Find positions of period start timestamps in colocation time index
+
+    Returns
+    -------
+    ndarray
+        positions of input periods in `time_idx`
+    ndarray
+        boolean mask specifying which periods could be matched
+    """
+    idx_periods = _floor_times(time_idx.values, ts_type)
+    pos = np.searchsorted(idx_periods, periods)
+    pos[pos >= len(idx_periods)] = 0
+    return (pos, idx_periods[pos] == periods)
+
+def _check_array_engine_applicable(gridded_data, col_freq,
+                                   use_climatology_ref, **kwargs):
+    """
+    Check if array based colocation engine can be used
+
+    Returns
+    -------
+    bool
+        True if :func:`_colocate_gridded_ungridded_arr` can be used for
+        input, else False
+    """
+    if use_climatology_ref:
+        return False
+    elif kwargs:
+        return False
+    elif gridded_data.ndim > 3:
+        return False
+    return col_freq in ARRAY_ENGINE_TS_TYPES
+
+def _colocate_gridded_ungridded_arr(gridded_data, ungridded_data, time_idx,
+                                    var, var_ref, obs_start, obs_stop,
+                                    ignore_station_names, colocate_opts):
+    """
+    Array based colocation of gridded and ungridded data
+
+    Alternative to converting the ungridded data into a list of
+    :class:`StationData` objects and colocating each site individually in
+    :func:`colocate_gridded_ungridded`. The observations are read directly
+    from the data array of the :class:`UngriddedData` object, and model
+    timeseries are extracted for all sites at once. Resampling of the
+    observations (including hierarchical resampling constraints) and the
+    model data is done via grouped aggregations for all sites at once.
+
+    Sites that are represented by more than one metadata block (i.e.
+    require merging) or that cannot be resampled by this engine (e.g.
+    weekly input data) are colocated using the standard routine (cf.
+    :func:`_colocate_stations_chunk`).
+
+    Parameters
+    ----------
+    gridded_data : GriddedData
+        model data (must be 3D, i.e. not contain vertical dimension)
+    ungridded_data : UngriddedData
+        observation data (single dataset)
+    time_idx : DatetimeIndex
+        colocation time index
+    var : str
+        model variable
+    var_ref : str
+        observation variable
+    obs_start : pandas.Timestamp
+        start time of observations
+    obs_stop : pandas.Timestamp
+        stop time of observations
+    ignore_station_names : str or list, optional
+        station names or patterns that are ignored
+    colocate_opts : dict
+        colocation options (cf. input args of
+        :func:`_colocate_stations_chunk`)
+
+    Returns
+    -------
+    dict
+        dictionary containing colocated data array (key `coldata`) as well
+        as lists of coordinates and names of all colocated sites and
+        information about the units and source frequencies.
+    """
+    from pyaerocom.ungriddeddata import _index_to_arr
+    col_freq = colocate_opts['ts_type']
+    col_ts_type = TsType(col_freq)
+    rshow = colocate_opts['resample_how']
+    constraints = colocate_opts['apply_time_resampling_constraints']
+    min_num_obs = colocate_opts['min_num_obs']
+
+    start, stop = start_stop(obs_start, obs_stop)
+    start, stop = np.datetime64(start), np.datetime64(stop)
+
+    data = ungridded_data._data
+    # find all metadata blocks for each site that contain obs variable
+    blocks = od()
+    for stat_name in ungridded_data._generate_station_index(
+            by_station_name=True, ignore_index=ignore_station_names):
+        blocks[stat_name] = []
+    for meta_key, meta in ungridded_data.metadata.items():
+        name = meta['station_name']
+        if not name in blocks:
+            continue
+        if 'var_info' in meta:
+            vars_avail = meta['var_info'].keys()
+        elif 'variables' in meta and meta['variables'] is not None:
+            vars_avail = meta['variables']
+        else:
+            continue
+        if var_ref in vars_avail and var_ref in ungridded_data.meta_idx[meta_key]:
+            blocks[name].append(meta_key)
+
+    stats = []
+    simple_rows, simple_groups = [], []
+    for stat_name, meta_keys in blocks.items():
+        if len(meta_keys) == 0:
+            continue
+        elif len(meta_keys) == 1:
+            meta = ungridded_data.metadata[meta_keys[0]]
+            rows = ungridded_data.meta_idx[meta_keys[0]][var_ref]
+            subset = data[rows]
+            rows = _index_to_arr(rows)
+            dtime = subset[:, ungridded_data._TIMEINDEX].astype('datetime64[s]')
+            tmask = np.logical_and(dtime >= start, dtime <= stop)
+            vals = subset[tmask, ungridded_data._DATAINDEX]
+            if len(vals) == 0 or np.all(np.isnan(vals)):
+                continue
+            vi = meta['var_info'] if 'var_info' in meta else {}
+            try:
+                from_ts_type = TsType(vi[var_ref]['ts_type'])
+            except Exception:
+                try:
+                    from_ts_type = TsType(meta['ts_type'])
+                except Exception:
+                    from_ts_type = None
+            steps = None
+            if from_ts_type is not None:
+                steps = _get_resample_steps(from_ts_type, col_ts_type, rshow,
+                                            constraints, min_num_obs)
+            heights = subset[tmask, ungridded_data._DATAHEIGHTINDEX]
+            if steps is not None and np.isnan(heights).all():
+                try:
+                    unit = vi[var_ref]['units']
+                except Exception:
+                    unit = None
+                stats.append(dict(station_name=stat_name,
+                                  latitude=meta.get('latitude', np.nan),
+                                  longitude=meta.get('longitude', np.nan),
+                                  altitude=meta.get('altitude', np.nan),
+                                  ts_type_src=meta.get('ts_type'),
+                                  unit=unit,
+                                  steps=steps,
+                                  obs_stat=None))
+                simple_rows.append(rows[tmask])
+                simple_groups.append(len(stats) - 1)
+                continue
+        # use StationData for this site
+        try:
+            obs_stat = ungridded_data.to_station_data(
+                    stat_name, var_ref, obs_start, obs_stop,
+                    merge_if_multi=True,
+                    allow_wildcards_station_name=False)
+        except (VarNotAvailableError, TimeMatchError,
+                DataCoverageError) as e:
+            logger.warning('Failed to convert to StationData '
+                           'Error: {}'.format(repr(e)))
+            continue
+        try:
+            unit = obs_stat['var_info'][var_ref]['units']
+        except KeyError as e:
+            logger.exception(repr(e))
+            unit = None
+        stats.append(dict(station_name=obs_stat.station_name,
+                          latitude=obs_stat.latitude,
+                          longitude=obs_stat.longitude,
+                          altitude=obs_stat.altitude,
+                          ts_type_src=obs_stat['ts_type_src'],
+                          unit=unit,
+                          steps=None,
+                          obs_stat=obs_stat))
+
+    if len(stats) == 0:
+        raise VarNotAvailableError('Variable {} is not available in specified '
+                                   'time interval ({}-{})'
+                                   .format(var_ref, obs_start, obs_stop))
+
+    ts_type_src_ref = None
+    ungridded_unit = None
+    for stat in stats:
+        if ts_type_src_ref is None:
+            ts_type_src_ref = stat['ts_type_src']
+        elif stat['ts_type_src'] != ts_type_src_ref:
+            spl = ts_type_src_ref.split(';')
+            if not stat['ts_type_src'] in spl:
+                spl.append(stat['ts_type_src'])
+            ts_type_src_ref = ';'.join(spl)
+        if ungridded_unit is None:
+            ungridded_unit = stat['unit']
+        if not stat['unit'] == ungridded_unit:
+            raise ValueError('Cannot perform colocation. Ungridded data '
+                             'object contains different units ({})'.format(var_ref))
+
+    num_stats = len(stats)
+    coldata = np.full((2, len(time_idx), num_stats), np.nan)
+
+    # extract model timeseries at all sites at once
+    lats = [stat['latitude'] for stat in stats]
+    lons = [stat['longitude'] for stat in stats]
+    grid_data, _ = gridded_data.extract_nearest_latlon_arr(lats, lons,
+                                                           check_domain=False)
+    grid_data = np.asarray(grid_data, dtype=np.float64)
+    grid_times = gridded_data.time_stamps()
+    grid_ts_type = TsType(gridded_data.ts_type)
+    grid_unit = str(gridded_data.units)
+
+    gridded_unit = None
+    if colocate_opts['harmonise_units']:
+        if ungridded_unit is None:
+            raise MetaDataError('Failed to access units attribute for '
+                                'variable {}'.format(var_ref))
+        gridded_unit = str(ungridded_unit)
+
+    # colocate sites that are represented by a single metadata block
+    if len(simple_groups) > 0:
+        simple_groups = np.asarray(simple_groups)
+        grid_all = StationData(data_id=gridded_data.name,
+                               ts_type=gridded_data.ts_type)
+        grid_all.var_info[var] = {'units' : gridded_data.units}
+        grid_all[var] = grid_data[:, simple_groups].copy()
+        if colocate_opts['harmonise_units'] and not grid_unit == gridded_unit:
+            grid_all.convert_unit(var, gridded_unit)
+        if colocate_opts['remove_outliers_grid']:
+            grid_all.remove_outliers(var, low=colocate_opts['low'],
+                                     high=colocate_opts['high'],
+                                     check_unit=True)
+
+        grid_steps = _get_resample_steps(grid_ts_type, col_ts_type, rshow,
+                                         constraints, min_num_obs)
+        if grid_steps is None:
+            raise ColocationError('Failed to resample model data from {} '
+                                  'to {}'.format(grid_ts_type, col_ts_type))
+        periods, grid_vals = _resample_arr_shared_time(grid_times,
+                                                       grid_all[var],
+                                                       grid_steps)
+        pos, ok = _periods_to_time_index(periods, time_idx, col_freq)
+        coldata[1][np.ix_(pos[ok], simple_groups)] = grid_vals[ok]
+
+        # resample all obs timeseries at once (grouped by resampling steps)
+        lens = [len(rows) for rows in simple_rows]
+        rows = np.concatenate(simple_rows)
+        groups = np.repeat(simple_groups, lens)
+        times = data[rows, ungridded_data._TIMEINDEX].astype('datetime64[s]')
+        # sort by site and time
+        order = np.lexsort((times, groups))
+        groups, times = groups[order], times[order]
+        vals = data[rows[order], ungridded_data._DATAINDEX]
+        step_groups = od()
+        for i in simple_groups:
+            key = repr(stats[i]['steps'])
+            if not key in step_groups:
+                step_groups[key] = (stats[i]['steps'], [])
+            step_groups[key][1].append(i)
+        for steps, stat_idx in step_groups.values():
+            mask = np.isin(groups, stat_idx)
+            _groups, _periods, _vals = _resample_arr(groups[mask],
+                                                     times[mask],
+                                                     vals[mask],
+                                                     steps)
+            pos, ok = _periods_to_time_index(_periods, time_idx, col_freq)
+            coldata[0, pos[ok], _groups[ok]] = _vals[ok]
+
+    # colocate all other sites using StationData
+    other = [i for i, stat in enumerate(stats) if stat['obs_stat'] is not None]
+    for i in other:
+        stat = stats[i]
+        grid_stat = StationData(latitude=stat['latitude'],
+                                longitude=stat['longitude'],
+                                data_id=gridded_data.name,
+                                ts_type=gridded_data.ts_type)
+        grid_stat.var_info[var] = {'units' : gridded_data.units}
+        grid_stat[var] = pd.Series(grid_data[:, i].copy(), index=grid_times)
+        obs_vals, grid_vals = _colocate_stations_chunk([grid_stat],
+                                                       [stat['obs_stat']],
+                                                       **colocate_opts)[0]
+        try:
+            coldata[0, :, i] = obs_vals
+            coldata[1, :, i] = grid_vals
+        except ValueError as e:
+            const.print_log.warning(
+                f'Failed to colocate time for station {stat["station_name"]}. '
+                f'This station will be skipped (error: {e})'
+                )
+
+    return dict(coldata=coldata,
+                station_name=[stat['station_name'] for stat in stats],
+                latitude=lats,
+                longitude=lons,
+                altitude=[stat['altitude'] for stat in stats],
+                ts_type_src_ref=ts_type_src_ref,
+                ungridded_unit=ungridded_unit,
+                gridded_unit=gridded_unit)
+
 def colocate_gridded_ungridded(gridded_data, ungridded_data, ts_type=None,
                                start=None, stop=None, filter_name=None,
                                regrid_res_deg=None, remove_outliers=True,
@@ -465,6 +1163,8 @@ def colocate_gridded_ungridded(gridded_data, ungridded_data, ts_type=None,
                                var_ref_keep_outliers=False,
                                use_climatology_ref=False,
                                resample_how=None,
+                               num_proc=None,
+                               use_array_engine=False,
                                **kwargs):
     """Colocate gridded with ungridded data (low level method)
 
@@ -565,6 +1265,22 @@ def colocate_gridded_ungridded(gridded_data, ungridded_data, ts_type=None,
         Default is "mean". Can also be a nested dictionary, e.g.
         resample_how={'daily': {'hourly' : 'max'}} would use the maximum value
         to aggregate from hourly to daily, rather than the mean.
+    num_proc : int, optional
+        number of processes used to colocate the individual sites (i.e. unit
+        harmonisation, outlier removal and time resampling of each site). If
+        None or smaller than 2, the sites are processed sequentially. This is
+        recommended for large networks (e.g. thousands of sites) and high
+        temporal resolution.
+    use_array_engine : bool
+        if True, the array based colocation engine is used, which works
+        directly on the data array of the input :class:`UngriddedData` object
+        and resamples all sites at once, rather than converting each site to
+        :class:`StationData` and colocating each site individually (cf.
+        :func:`_colocate_gridded_ungridded_arr`). This is much faster for
+        large networks. Only applicable for 3D model data (i.e. without
+        vertical dimension), colocation frequencies specified in
+        :attr:`ARRAY_ENGINE_TS_TYPES`, no climatological obs data and
+        without additional `**kwargs`. Else, the standard routine is used.
     **kwargs
         additional keyword args (passed to
         :func:`UngriddedData.to_station_data_all`)
@@ -611,8 +1327,8 @@ def colocate_gridded_ungridded(gridded_data, ungridded_data, ts_type=None,
         else:
             var_ref = var
 
+    low, high, low_ref, high_ref = None, None, None, None
     if remove_outliers:
-        low, high, low_ref, high_ref = None, None, None, None
         if var in var_outlier_ranges:
             low, high = var_outlier_ranges[var]
         if var_ref in var_ref_outlier_ranges:
@@ -711,138 +1427,147 @@ def colocate_gridded_ungridded(gridded_data, ungridded_data, ts_type=None,
     ungridded_data = ungridded_data.filter_by_meta(latitude=lat_range,
                                                    longitude=lon_range)
 
-    # get timeseries from all stations in provided time resolution
-    # (time resampling is done below in main loop)
-    all_stats = ungridded_data.to_station_data_all(
-            vars_to_convert=var_ref,
-            start=obs_start,
-            stop=obs_stop,
-            by_station_name=True,
-            ignore_index=ignore_station_names,
-            **kwargs
-            )
-
-    obs_stat_data = all_stats['stats']
-    ungridded_lons = all_stats['longitude']
-    ungridded_lats = all_stats['latitude']
-
-    if len(obs_stat_data) == 0:
-        raise VarNotAvailableError('Variable {} is not available in specified '
-                                   'time interval ({}-{})'
-                                   .format(var_ref, start, stop))
-    # make sure the gridded data is in the right dimension
-    if gridded_data.ndim > 3:
-        if vert_scheme is None:
-            vert_scheme = 'mean'
-        if not vert_scheme in gridded_data.SUPPORTED_VERT_SCHEMES:
-            raise ValueError('Vertical scheme {} is not supported'.format(vert_scheme))
-
-    grid_stat_data = gridded_data.to_time_series(longitude=ungridded_lons,
-                                                 latitude=ungridded_lats,
-                                                 vert_scheme=vert_scheme)
-
     pd_freq = TsType(col_freq).to_pandas_freq()
     time_idx = make_datetime_index(start, stop, pd_freq)
 
-    coldata = np.empty((2, len(time_idx), len(obs_stat_data)))
-
-    lons = []
-    lats = []
-    alts = []
-    station_names = []
+    # options for colocation of individual sites
+    colocate_opts = dict(var=var, var_ref=var_ref,
+                         harmonise_units=harmonise_units,
+                         remove_outliers_grid=(remove_outliers and
+                                               not var_keep_outliers),
+                         low=low, high=high,
+                         ts_type=col_freq,
+                         resample_how=resample_how,
+                         apply_time_resampling_constraints=apply_time_resampling_constraints,
+                         min_num_obs=min_num_obs,
+                         use_climatology_ref=use_climatology_ref)
+
+    if use_array_engine and not _check_array_engine_applicable(
+            gridded_data, col_freq, use_climatology_ref, **kwargs):
+        const.print_log.info('Array based colocation engine does not support '
+                             'input, using StationData based colocation')
+        use_array_engine = False
 
-    ungridded_unit = None
-    ts_type_src_ref = None
     if not harmonise_units:
         gridded_unit = str(gridded_data.units)
     else:
         gridded_unit = None
 
-    # loop over all stations and append to colocated data object
-    for i, obs_stat in enumerate(obs_stat_data):
-        # ToDo: consider removing to keep ts_type_src_ref (this was probably
-        # introduced for EBAS were the original data frequency is not constant
-        # but can vary from site to site)
-        if ts_type_src_ref is None:
-            ts_type_src_ref = obs_stat['ts_type_src']
-        elif obs_stat['ts_type_src'] != ts_type_src_ref:
-            spl = ts_type_src_ref.split(';')
-            if not obs_stat['ts_type_src'] in spl:
-                spl.append(obs_stat['ts_type_src'])
-            ts_type_src_ref = ';'.join(spl)
-
-        if ungridded_unit is None:
-            try:
-                ungridded_unit = obs_stat['var_info'][var_ref]['units']
-            except KeyError as e: #variable information or unit is not defined
-                logger.exception(repr(e))
-        try:
-            unit = obs_stat['var_info'][var_ref]['units']
-        except Exception:
-            unit = None
-        if not unit == ungridded_unit:
-            raise ValueError('Cannot perform colocation. Ungridded data '
-                             'object contains different units ({})'.format(var_ref))
-        # get observations (Note: the index of the observation time series
-        # is already in the specified frequency format, and thus, does not
-        # need to be updated, for details (or if errors occur), cf.
-        # UngriddedData.to_station_data, where the conversion happens)
-
-        # get model station data
-        grid_stat = grid_stat_data[i]
+    if use_array_engine:
+        result = _colocate_gridded_ungridded_arr(
+                gridded_data, ungridded_data, time_idx,
+                var=var, var_ref=var_ref,
+                obs_start=obs_start, obs_stop=obs_stop,
+                ignore_station_names=ignore_station_names,
+                colocate_opts=colocate_opts)
+        coldata = result['coldata']
+        lons = result['longitude']
+        lats = result['latitude']
+        alts = result['altitude']
+        station_names = result['station_name']
+        ts_type_src_ref = result['ts_type_src_ref']
+        ungridded_unit = result['ungridded_unit']
         if harmonise_units:
-            grid_unit = grid_stat.get_unit(var)
-            obs_unit = obs_stat.get_unit(var_ref)
-            if not grid_unit == obs_unit:
-                grid_stat.convert_unit(var, obs_unit)
-            if gridded_unit is None:
-                gridded_unit = obs_unit
-
-        if remove_outliers and not var_keep_outliers:
-            # don't check if harmonise_units is active, because the
-            # remove_outliers method checks units based on AeroCom default
-            # variables, and a variable mapping might be active, i.e.
-            # sometimes models use abs550aer for absorption coefficients
-            # with units [m-1] and not for AAOD (which is the AeroCom default
-            # and unitless. Hence, unit check in remove_outliers works only
-            # if the variable name (and unit) corresonds to AeroCom default)
-            #chk_unit = not harmonise_units
-            grid_stat.remove_outliers(var, low=low, high=high,
-                                      check_unit=True)
-
-        _df = _colocate_site_data_helper(
-
-            stat_data=grid_stat,
-            stat_data_ref=obs_stat,
-            var=var, var_ref=var_ref,
-            ts_type=col_freq,
-            resample_how=resample_how,
-            apply_time_resampling_constraints=apply_time_resampling_constraints,
-            min_num_obs=min_num_obs,
-            use_climatology_ref=use_climatology_ref)
-
-
-        # this try/except block was introduced on 23/2/2021 as temporary fix from
-        # v0.10.0 -> v0.10.1 as a result of multi-weekly obsdata (EBAS) that
-        # can end up resulting in incorrect number of timestamps after resampling
-        # (the error was discovered using EBASMC, concpm10, 2019 and colocation
-        # frequency monthly)
-        try:
-            # assign the unified timeseries data to the colocated data array
-            coldata[0, :, i] = _df['ref'].values
-            coldata[1, :, i] = _df['data'].values
-        except ValueError as e:
-            const.print_log.warning(
-                f'Failed to colocate time for station {obs_stat.station_name}. '
-                f'This station will be skipped (error: {e})'
+            gridded_unit = result['gridded_unit']
+    else:
+        # get timeseries from all stations in provided time resolution
+        # (time resampling is done below in main loop)
+        all_stats = ungridded_data.to_station_data_all(
+                vars_to_convert=var_ref,
+                start=obs_start,
+                stop=obs_stop,
+                by_station_name=True,
+                ignore_index=ignore_station_names,
+                **kwargs
                 )
 
-
-
-        lons.append(obs_stat.longitude)
-        lats.append(obs_stat.latitude)
-        alts.append(obs_stat.altitude)
-        station_names.append(obs_stat.station_name)
+        obs_stat_data = all_stats['stats']
+        ungridded_lons = all_stats['longitude']
+        ungridded_lats = all_stats['latitude']
+
+        if len(obs_stat_data) == 0:
+            raise VarNotAvailableError('Variable {} is not available in specified '
+                                       'time interval ({}-{})'
+                                       .format(var_ref, start, stop))
+        # make sure the gridded data is in the right dimension
+        if gridded_data.ndim > 3:
+            if vert_scheme is None:
+                vert_scheme = 'mean'
+            if not vert_scheme in gridded_data.SUPPORTED_VERT_SCHEMES:
+                raise ValueError('Vertical scheme {} is not supported'.format(vert_scheme))
+
+        grid_stat_data = gridded_data.to_time_series(longitude=ungridded_lons,
+                                                     latitude=ungridded_lats,
+                                                     vert_scheme=vert_scheme)
+
+        coldata = np.empty((2, len(time_idx), len(obs_stat_data)))
+
+        lons = []
+        lats = []
+        alts = []
+        station_names = []
+
+        ungridded_unit = None
+        ts_type_src_ref = None
+
+        # loop over all stations and check metadata
+        for i, obs_stat in enumerate(obs_stat_data):
+            # ToDo: consider removing to keep ts_type_src_ref (this was probably
+            # introduced for EBAS were the original data frequency is not constant
+            # but can vary from site to site)
+            if ts_type_src_ref is None:
+                ts_type_src_ref = obs_stat['ts_type_src']
+            elif obs_stat['ts_type_src'] != ts_type_src_ref:
+                spl = ts_type_src_ref.split(';')
+                if not obs_stat['ts_type_src'] in spl:
+                    spl.append(obs_stat['ts_type_src'])
+                ts_type_src_ref = ';'.join(spl)
+
+            if ungridded_unit is None:
+                try:
+                    ungridded_unit = obs_stat['var_info'][var_ref]['units']
+                except KeyError as e: #variable information or unit is not defined
+                    logger.exception(repr(e))
+            try:
+                unit = obs_stat['var_info'][var_ref]['units']
+            except Exception:
+                unit = None
+            if not unit == ungridded_unit:
+                raise ValueError('Cannot perform colocation. Ungridded data '
+                                 'object contains different units ({})'.format(var_ref))
+            if harmonise_units and gridded_unit is None:
+                gridded_unit = obs_stat.get_unit(var_ref)
+
+            lons.append(obs_stat.longitude)
+            lats.append(obs_stat.latitude)
+            alts.append(obs_stat.altitude)
+            station_names.append(obs_stat.station_name)
+
+        if num_proc is not None and num_proc > 1 and len(obs_stat_data) > 1:
+            coldata_stats = _colocate_stations_multiproc(grid_stat_data,
+                                                         obs_stat_data,
+                                                         num_proc=num_proc,
+                                                         **colocate_opts)
+        else:
+            coldata_stats = _colocate_stations_chunk(grid_stat_data,
+                                                     obs_stat_data,
+                                                     **colocate_opts)
+
+        for i, (obs_vals, grid_vals) in enumerate(coldata_stats):
+            # this try/except block was introduced on 23/2/2021 as temporary fix from
+            # v0.10.0 -> v0.10.1 as a result of multi-weekly obsdata (EBAS) that
+            # can end up resulting in incorrect number of timestamps after resampling
+            # (the error was discovered using EBASMC, concpm10, 2019 and colocation
+            # frequency monthly)
+            try:
+                # assign the unified timeseries data to the colocated data array
+                coldata[0, :, i] = obs_vals
+                coldata[1, :, i] = grid_vals
+            except ValueError as e:
+                const.print_log.warning(
+                    f'Failed to colocate time for station {station_names[i]}. '
+                    f'This station will be skipped (error: {e})'
+                    )
 
     try:
         revision = ungridded_data.data_revision[dataset_ref]
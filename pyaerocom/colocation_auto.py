@@ -27,6 +27,10 @@ from pyaerocom.colocateddata import ColocatedData
 
 from pyaerocom.filter import Filter
 from pyaerocom.io import ReadUngridded, ReadGridded, ReadMscwCtm
+from pyaerocom.io.cache_ungridded_memory import OBS_MEMCACHE
+from pyaerocom.io.cachehandler_ungridded import CacheHandlerUngridded
+from pyaerocom.io.fingerprint_manifest import (FingerprintManifest,
+                                               make_fingerprint, files_info)
 from pyaerocom.tstype import TsType
 from pyaerocom.exceptions import (DataCoverageError,
                                   VariableDefinitionError)
@@ -173,6 +177,31 @@ class ColocationSetup(BrowseDict):
         specify model, else obs_id will be used
     save_coldata : bool
         if True, colocated data objects are saved as NetCDF file.
+    num_proc : int, optional
+        number of processes used for colocation of the individual sites
+        in gridded / ungridded colocation (cf.
+        :func:`pyaerocom.colocation.colocate_gridded_ungridded`). If None,
+        the sites are processed sequentially.
+    use_array_engine : bool
+        if True, the array based engine is used for gridded / ungridded
+        colocation, where applicable (cf.
+        :func:`pyaerocom.colocation.colocate_gridded_ungridded`).
+    obs_use_memcache : bool
+        if True (default), loaded and filtered observation data is kept in
+        an in-memory cache that is shared within the current process, so
+        that it does not need to be re-read for other model variables or
+        models (cf.
+        :class:`pyaerocom.io.cache_ungridded_memory.UngriddedMemoryCache`).
+    reanalyse_existing : bool
+        if True, existing colocated data files are recomputed and overwritten.
+    reanalyse_changed : bool
+        if True (and :attr:`reanalyse_existing` is False), existing colocated
+        data files are only recomputed if the fingerprint of their inputs
+        (model files, observation database, colocation settings and pyaerocom
+        version) has changed since they were computed. Fingerprints of saved
+        files are stored in sub-directory *manifest* of
+        :attr:`basedir_coldata` (cf.
+        :class:`pyaerocom.io.fingerprint_manifest.FingerprintManifest`).
     """
     #: Dictionary specifying alternative vertical types that may be used to
     #: read model data. E.g. consider the variable is  ec550aer,
@@ -183,6 +212,17 @@ class ColocationSetup(BrowseDict):
     #: exists, it will load it and extract the surface level.
     OBS_VERT_TYPES_ALT = {'Surface'    :   'ModelLevel'}
 
+    #: Setup keys that are not considered in fingerprints of colocated data
+    #: files, since they do not affect the output (cf.
+    #: :func:`fingerprint_settings`). Names and variables are encoded
+    #: elsewhere.
+    FINGERPRINT_IGNORE = ['basedir_coldata', 'save_coldata',
+                          'reanalyse_existing', 'reanalyse_changed',
+                          'raise_exceptions', 'num_proc', 'use_array_engine',
+                          'obs_use_memcache', 'obs_vars', 'model_use_vars',
+                          'model_add_vars', 'model_name', 'obs_name',
+                          'data', 'file_status', 'logging', '_log']
+
     def __init__(self, model_id=None, obs_id=None, obs_vars=None,
                  ts_type=None, start=None, stop=None,
                  filter_name=None,
@@ -275,10 +315,17 @@ class ColocationSetup(BrowseDict):
         self.flex_ts_type_gridded = True
         #: If True, existing colocated data files will be re-computed and overwritten
         self.reanalyse_existing = False
+        #: If True, existing colocated data files will only be re-computed if
+        #: their inputs changed
+        self.reanalyse_changed = False
         #: If True, the colocation routine will raise any Exception that may occur,
         #: else (False), expected expcetions will be ignored and logged.
         self.raise_exceptions = False
 
+        self.num_proc = None
+        self.use_array_engine = False
+        self.obs_use_memcache = True
+
         self.update(**kwargs)
 
     @property
@@ -295,6 +342,17 @@ class ColocationSetup(BrowseDict):
     def __dir__(self):
         return self.keys()
 
+    def fingerprint_settings(self):
+        """Settings that are relevant for fingerprints of output files
+
+        Returns
+        -------
+        dict
+            current setup, except for keys in :attr:`FINGERPRINT_IGNORE`
+        """
+        return {k : v for k, v in self.items()
+                if not k in self.FINGERPRINT_IGNORE}
+
     def update(self, **kwargs):
         for key, val in kwargs.items():
             if key in self and isinstance(self[key], dict):
@@ -672,8 +730,13 @@ class Colocator(ColocationSetup):
         return remaining
 
     def _save_coldata(self, coldata, savename, out_dir, model_var, model_data,
-                      obs_var):
-        """Helper for saving colocateddata"""
+                      obs_var, fingerprint_info=None):
+        """Helper for saving colocateddata
+
+        If :attr:`reanalyse_changed` is True, the fingerprint of the inputs
+        is registered in :attr:`manifest` (cf.
+        :func:`_coldata_fingerprint_info`).
+        """
         if model_var != model_data.var_name:
             coldata.rename_variable(model_data.var_name,
                                     model_var,
@@ -688,6 +751,13 @@ class Colocator(ColocationSetup):
 
         coldata.to_netcdf(out_dir, savename=savename)
         self.file_status[savename] = 'saved'
+        if self.reanalyse_changed:
+            if fingerprint_info is None:
+                self.manifest.remove(savename)
+            else:
+                self.manifest.set(savename,
+                                  make_fingerprint(fingerprint_info),
+                                  fingerprint_info)
         if self._log:
             msg = 'WRITE: {}\n'.format(savename)
             self._write_log(msg)
@@ -737,6 +807,172 @@ class Colocator(ColocationSetup):
         elif self.stop is not None:
             self.stop = None
 
+    def _get_obs_outlier_range(self, obs_var):
+        """Outlier range applied to observation variable on read
+
+        Returns
+        -------
+        tuple or None
+            (low, high), where either may be None (i.e. default range of
+            variable), or None, if outliers are not removed from observations
+        """
+        if not self.remove_outliers or self.obs_keep_outliers:
+            return None
+        oor = self.var_ref_outlier_ranges
+        if isinstance(oor, dict) and obs_var in oor:
+            low, high = oor[obs_var]
+            return (low, high)
+        return (None, None)
+
+    def _read_ungridded_obs(self, obs_reader, obs_var, ropts):
+        """Read and filter observation variable (helper method)
+
+        Uses :attr:`OBS_MEMCACHE` if :attr:`obs_use_memcache` is True.
+        Outliers are removed before the data is cached (if applicable, cf.
+        :func:`_get_obs_outlier_range`), so the cached object does not need
+        to be copied or modified during colocation.
+
+        Parameters
+        ----------
+        obs_reader : ReadUngridded
+            reading class for observation data
+        obs_var : str
+            observation variable
+        ropts : dict
+            additional reading options
+
+        Returns
+        -------
+        UngriddedData
+            loaded (and filtered) observation data
+        """
+        if 'obs_filters' in self:
+            remaining_filters = self._eval_obs_filters()
+        else:
+            remaining_filters = None
+        outlier_range = self._get_obs_outlier_range(obs_var)
+        key = None
+        if self.obs_use_memcache:
+            key = OBS_MEMCACHE.make_key(self.obs_id, obs_var,
+                                        data_dir=self.obs_data_dir,
+                                        only_cached=self._obs_cache_only,
+                                        read_opts=ropts,
+                                        filters=remaining_filters,
+                                        outlier_range=outlier_range)
+            obs_data = OBS_MEMCACHE.get(key)
+            if obs_data is not None:
+                print_log.info('Using {} / {} data from memory cache'
+                               .format(self.obs_id, obs_var))
+                return obs_data
+
+        obs_data = obs_reader.read(vars_to_retrieve=obs_var,
+                                   only_cached=self._obs_cache_only,
+                                   **ropts)
+        if remaining_filters is not None:
+            obs_data = obs_data.apply_filters(**remaining_filters)
+        if outlier_range is not None:
+            low, high = outlier_range
+            obs_data.remove_outliers(obs_var, inplace=True, low=low,
+                                     high=high)
+        if key is not None:
+            OBS_MEMCACHE.put(key, obs_data)
+        return obs_data
+
+    @property
+    def manifest(self):
+        """Fingerprint manifest of colocated data files of current model"""
+        return FingerprintManifest(os.path.join(self.basedir_coldata,
+                                                'manifest', self.model_id))
+
+    def _ungridded_obs_info(self, obs_reader):
+        """Get information about ungridded obs database for fingerprints
+
+        Parameters
+        ----------
+        obs_reader : ReadUngridded
+            reading class for observation data
+
+        Returns
+        -------
+        dict or None
+            cache header information of observation dataset (cf.
+            :func:`CacheHandlerUngridded.cache_meta_info`) or None, if it
+            cannot be retrieved (e.g. for auxiliary datasets that are
+            computed from other datasets).
+        """
+        try:
+            reader = obs_reader.get_reader(self.obs_id)
+            data_dir = obs_reader._get_data_dir(self.obs_id)
+            if data_dir is not None:
+                reader._dataset_path = data_dir
+            info = CacheHandlerUngridded(reader).cache_meta_info()
+            info['data_dir'] = reader.DATASET_PATH
+        except Exception as e:
+            const.logger.info('Failed to retrieve fingerprint information '
+                              'for {}. Reason: {}'.format(self.obs_id,
+                                                          repr(e)))
+            return None
+        return info
+
+    def _coldata_fingerprint_info(self, model_data, model_var, obs_var,
+                                  obs_info):
+        """Get information about inputs of colocated data file
+
+        Parameters
+        ----------
+        model_data : GriddedData
+            model data
+        model_var : str
+            model variable
+        obs_var : str
+            observation variable
+        obs_info : dict or list, optional
+            information about observation data (e.g. output from
+            :func:`_ungridded_obs_info`)
+
+        Returns
+        -------
+        dict or None
+            information used to compute the fingerprint of the colocated data
+            file or None if the inputs cannot be identified (in which case
+            existing colocated data files are always considered outdated).
+        """
+        if not obs_info or len(model_data.from_files) == 0:
+            return None
+        from pyaerocom import __version__
+        return dict(pyaerocom_version=__version__,
+                    model_var=model_var,
+                    obs_var=obs_var,
+                    model_files=files_info(model_data.from_files),
+                    obs=obs_info,
+                    settings=self.fingerprint_settings())
+
+    def _check_reanalyse(self, savename, fingerprint_info):
+        """Check if existing colocated data file is supposed to be recomputed
+
+        Parameters
+        ----------
+        savename : str
+            name of existing colocated data file
+        fingerprint_info : dict, optional
+            output from :func:`_coldata_fingerprint_info`
+
+        Returns
+        -------
+        bool
+            True, if the file is supposed to be recomputed, else False
+        """
+        if self.reanalyse_existing:
+            return True
+        elif self.reanalyse_changed:
+            fingerprint = None
+            if fingerprint_info is not None:
+                fingerprint = make_fingerprint(fingerprint_info)
+            if not self.manifest.is_current(savename, fingerprint):
+                print_log.info('Inputs of {} changed'.format(savename))
+                return True
+        return False
+
     def _run_gridded_ungridded(self, var_name=None):
         """Analysis method for gridded vs. ungridded data"""
         print_log.info('PREPARING colocation of {} vs. {}'
@@ -777,6 +1013,10 @@ class Colocator(ColocationSetup):
 
         start, stop = start_stop(self.start, self.stop)
 
+        obs_info = None
+        if self.save_coldata and self.reanalyse_changed:
+            obs_info = self._ungridded_obs_info(obs_reader)
+
         for model_var, obs_var in var_matches.items():
 
             # ToDo: consider removing outliers already here.
@@ -829,6 +1069,7 @@ class Colocator(ColocationSetup):
                 ts_type = ts_type_src
 
             really_do_reanalysis = True
+            fingerprint_info = None
             if self.save_coldata:
                 really_do_reanalysis = False
                 savename = self._coldata_savename(model_data, start, stop,
@@ -838,8 +1079,11 @@ class Colocator(ColocationSetup):
                                                          savename)
 
                 out_dir = chk_make_subdir(self.basedir_coldata, self.model_id)
+                if self.reanalyse_changed:
+                    fingerprint_info = self._coldata_fingerprint_info(
+                        model_data, model_var, obs_var, obs_info)
                 if file_exists:
-                    if not self.reanalyse_existing:
+                    if not self._check_reanalyse(savename, fingerprint_info):
                         if self._log:
                             self._write_log('SKIP: {}\n'
                                             .format(savename))
@@ -861,17 +1105,10 @@ class Colocator(ColocationSetup):
                 #not already exist.
                 #This part of the method has been changed by @hansbrenna to work better with
                 #large observational data sets. Only one variable is loaded into
-                # the UngriddedData object at a time. Currently the variable is
-                #re-read a lot of times, which is a weakness.
-                obs_data = obs_reader.read(
-                    vars_to_retrieve=obs_var,
-                    only_cached=self._obs_cache_only,
-                    **ropts)
-
-                        # ToDo: consider removing outliers already here.
-                if 'obs_filters' in self:
-                    remaining_filters = self._eval_obs_filters()
-                    obs_data = obs_data.apply_filters(**remaining_filters)
+                # the UngriddedData object at a time. Loaded data is kept in
+                # an in-memory cache, so it is not re-read for other model
+                # variables or models.
+                obs_data = self._read_ungridded_obs(obs_reader, obs_var, ropts)
 
             try:
                 try:
@@ -901,15 +1138,18 @@ class Colocator(ColocationSetup):
                         min_num_obs=self.min_num_obs,
                         colocate_time=self.colocate_time,
                         var_keep_outliers=self.model_keep_outliers,
-                        var_ref_keep_outliers=self.obs_keep_outliers,
+                        # outliers were removed on read, if applicable
+                        var_ref_keep_outliers=True,
                         use_climatology_ref=self.obs_use_climatology,
-                        resample_how=rshow)
+                        resample_how=rshow,
+                        num_proc=self.num_proc,
+                        use_array_engine=self.use_array_engine)
 
                 if self.model_to_stp:
                     coldata = correct_model_stp_coldata(coldata)
                 if self.save_coldata:
                     self._save_coldata(coldata, savename, out_dir, model_var,
-                                       model_data, obs_var)
+                                       model_data, obs_var, fingerprint_info)
                 data_objs[model_var] = coldata
             except Exception:
                 msg = ('Colocation between model {} / {} and obs {} / {} '
@@ -1034,8 +1274,13 @@ class Colocator(ColocationSetup):
 
                 file_exists = self._check_coldata_exists(self.model_id,
                                                           savename)
+                fingerprint_info = None
+                if self.reanalyse_changed:
+                    obs_info = files_info(obs_data.from_files)
+                    fingerprint_info = self._coldata_fingerprint_info(
+                        model_data, model_var, obs_var, obs_info)
                 if file_exists:
-                    if not self.reanalyse_existing:
+                    if not self._check_reanalyse(savename, fingerprint_info):
                         if self._log:
                             self._write_log('SKIP: {}\n'.format(savename))
                             print_log.info('Skip {} (file already '
@@ -1069,7 +1314,7 @@ class Colocator(ColocationSetup):
                         resample_how=rshow)
                 if self.save_coldata:
                     self._save_coldata(coldata, savename, out_dir, model_var,
-                                       model_data, obs_var)
+                                       model_data, obs_var, fingerprint_info)
                     #coldata.to_netcdf(out_dir, savename=savename)
                 if self._log:
                     self._write_log('WRITE: {}\n'.format(savename))
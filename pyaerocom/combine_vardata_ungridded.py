@@ -5,7 +5,7 @@ from pyaerocom import const
 from pyaerocom.exceptions import DataUnitError
 from pyaerocom.obs_io import ObsVarCombi
 from pyaerocom._lowlevel_helpers import invalid_input_err_str
-from pyaerocom.geodesy import find_coord_indices_within_distance
+from pyaerocom.geodesy import SpatialIndex
 from pyaerocom.stationdata import StationData
 from pyaerocom.helpers import sort_ts_types
 from pyaerocom.colocation import _colocate_site_data_helper
@@ -31,30 +31,36 @@ def _check_input_data_ids_and_vars(data_ids_and_vars):
 def _map_same_stations(stats_short, stats_long, match_stats_how,
                        match_stats_tol_km):
 
-    long_coords = list(zip(stats_long['latitude'], stats_long['longitude']))
-
     # index matches and corresponding station name matches
     _index_short = []
     _index_long = []
     _statnames_short = []
     _statnames_long = []
 
-    long_sitenames = np.asarray(stats_long['station_name'])
+    if match_stats_how == 'station_name':
+        long_index = {}
+        for j, name in enumerate(stats_long['station_name']):
+            if not name in long_index:
+                long_index[name] = []
+            long_index[name].append(j)
+        empty = np.asarray([], dtype=int)
+    elif len(stats_short['stats']) > 0 and len(stats_long['stats']) > 0:
+        # search all sites in long at once, using a spatial index
+        all_matches = SpatialIndex(
+            stats_long['latitude'],
+            stats_long['longitude']).query_radius(stats_short['latitude'],
+                                                  stats_short['longitude'],
+                                                  radius=match_stats_tol_km)
+    else:
+        all_matches = [[]] * len(stats_short['stats'])
 
     for i, stat in enumerate(stats_short['stats']):
         statname = stat.station_name
-        lat0, lon0 = stats_short['latitude'][i], stats_short['longitude'][i]
 
         if match_stats_how == 'station_name':
-            # np.where returns tuple, first index contains array with index
-            # matches
-            index_matches = np.where(long_sitenames==statname)[0]
+            index_matches = np.asarray(long_index.get(statname, empty))
         else:
-            index_matches = find_coord_indices_within_distance(
-                latref=lat0,
-                lonref=lon0,
-                latlons=long_coords,
-                radius=match_stats_tol_km)
+            index_matches = all_matches[i]
 
         # init which default index to use
         use_index = 0
@@ -476,6 +482,7 @@ if __name__=='__main__':
     import pyaerocom as pya
     from numpy import testing as npt
     from pyaerocom.conftest import TEST_PATHS
+    from pyaerocom.ungriddeddata import _index_to_arr
 
 
     # Tests based on whole datasets
@@ -588,9 +595,9 @@ if __name__=='__main__':
         assert 'ang4487aer' in meta['var_info']
         assert 'od500aer' in meta['var_info']
 
-        od550aer = data._data[data.meta_idx[key]['od550aer'][0], data._DATAINDEX]
-        od500aer = data._data[data.meta_idx[key]['od500aer'][0], data._DATAINDEX]
-        ang4487aer = data._data[data.meta_idx[key]['ang4487aer'][0], data._DATAINDEX]
+        od550aer = data._data[_index_to_arr(data.meta_idx[key]['od550aer'])[0], data._DATAINDEX]
+        od500aer = data._data[_index_to_arr(data.meta_idx[key]['od500aer'])[0], data._DATAINDEX]
+        ang4487aer = data._data[_index_to_arr(data.meta_idx[key]['ang4487aer'])[0], data._DATAINDEX]
 
         test_vals.append(od500aer)
         test_vals_computed.append(od550aer * (500/550)**(-ang4487aer))
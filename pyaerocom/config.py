@@ -186,6 +186,35 @@ class Config(object):
 
     RM_CACHE_OUTDATED = True
 
+    #: Maximum size (in GB) of in-memory cache for loaded observation data
+    #: objects, shared within one python process (cf.
+    #: :class:`pyaerocom.io.cache_ungridded_memory.UngriddedMemoryCache`)
+    OBS_MEMCACHE_MAX_GB = 2
+
+    #: Processing mode for lazy loaded (not yet realised) gridded data (cf.
+    #: :attr:`pyaerocom.griddeddata.GriddedData.lazy_mode`). If True, lazy
+    #: data arrays are kept lazy (dask) in all operations that support it,
+    #: if False, they are realised as needed. If None, data arrays are kept
+    #: lazy if their size exceeds :attr:`GRIDDED_LAZY_MIN_GB`.
+    GRIDDED_LAZY_MODE = None
+
+    #: Minimum size (in GB) of gridded data arrays that are processed lazily
+    #: if :attr:`GRIDDED_LAZY_MODE` is None
+    GRIDDED_LAZY_MIN_GB = 4
+
+    #: Target size (in MB) of chunks of lazy gridded data arrays (cf.
+    #: :func:`pyaerocom.griddeddata.GriddedData.rechunk_time`)
+    GRIDDED_LAZY_CHUNK_MB = 256
+
+    #: Maximum number of source / target grid combinations for which area
+    #: weighted regridding weights are kept in memory (cf.
+    #: :class:`pyaerocom.regrid_cache.RegridWeightsCache`)
+    REGRID_CACHE_MAX_NUM = 20
+
+    #: If True, area weighted regridding weights are also cached on disk
+    #: (in :attr:`CACHEDIR`)
+    REGRID_CACHE_DISK = False
+
     #: Name of the file containing the revision string of an obs data network
     REVISION_FILE = 'Revision.txt'
 
@@ -28,18 +28,24 @@ def calc_latlon_dists(latref, lonref, latlons):
 
     Returns
     -------
-    list
-        list of computed geographic distances to input reference coordinate
+    ndarray
+        computed geographic distances to input reference coordinate
         for all (lat, lon) coords in `latlons`
 
     """
-    return [haversine(latref, lonref,c[0],c[1]) for c in latlons]
+    latlons = np.asarray(latlons, dtype=float).reshape(-1, 2)
+    return haversine(latref, lonref, latlons[:, 0], latlons[:, 1])
 
 def find_coord_indices_within_distance(latref, lonref, latlons,
                                        radius=1):
     """
     Find indices of coordinates that match input coordinate
 
+    Note
+    ----
+    If many reference coordinates are to be matched against the same
+    list of coordinates, consider using :class:`SpatialIndex`.
+
     Parameters
     ----------
     latref : float
@@ -61,7 +67,7 @@ def find_coord_indices_within_distance(latref, lonref, latlons,
         closest
 
     """
-    dists = np.asarray(calc_latlon_dists(latref, lonref, latlons))
+    dists = calc_latlon_dists(latref, lonref, latlons)
     within_tol = np.where(dists<radius)[0]
     # the following statement sorts all indices in dists that are within
     # the tolerance radius, so the first entry in the returned aaray is the
@@ -69,6 +75,142 @@ def find_coord_indices_within_distance(latref, lonref, latlons,
     # furthest
     return within_tol[np.argsort(dists[within_tol])]
 
+def latlon_to_unit_xyz(lats, lons):
+    """
+    Convert lat / lon coordinates to cartesian coordinates on unit sphere
+
+    Parameters
+    ----------
+    lats : float or ndarray
+        latitudes in decimal degrees
+    lons : float or ndarray
+        longitudes in decimal degrees
+
+    Returns
+    -------
+    ndarray
+        array of shape (N, 3) containing x, y, z coordinates
+    """
+    lats = np.radians(np.atleast_1d(np.asarray(lats, dtype=float)))
+    lons = np.radians(np.atleast_1d(np.asarray(lons, dtype=float)))
+    coslat = np.cos(lats)
+    return np.stack([coslat * np.cos(lons),
+                     coslat * np.sin(lons),
+                     np.sin(lats)], axis=-1)
+
+class SpatialIndex(object):
+    """Spatial index for fast distance queries of lat / lon coordinates
+
+    The coordinates are converted to cartesian coordinates on the unit
+    sphere and stored in a KD-tree (:class:`scipy.spatial.cKDTree`), so
+    that the index can be built once and then be queried for many
+    reference coordinates. Distances are great-circle distances, consistent
+    with :func:`haversine`.
+
+    Parameters
+    ----------
+    lats : list or ndarray
+        latitudes of indexed coordinates in decimal degrees
+    lons : list or ndarray
+        longitudes of indexed coordinates in decimal degrees
+    earth_radius : float
+        average earth radius in km, defaults to 6371.0
+
+    Example
+    -------
+    >>> idx = SpatialIndex([0, 0, 10], [15, 16, 15])
+    >>> idx.query_radius(0, 15.1, radius=50)
+    array([0])
+    """
+    def __init__(self, lats, lons, earth_radius=6371.0):
+        from scipy.spatial import cKDTree
+        self.lats = np.atleast_1d(np.asarray(lats, dtype=float))
+        self.lons = np.atleast_1d(np.asarray(lons, dtype=float))
+        if not self.lats.shape == self.lons.shape:
+            raise ValueError('Input lats and lons need to have the same shape')
+        self.earth_radius = earth_radius
+        self._tree = cKDTree(latlon_to_unit_xyz(self.lats, self.lons))
+
+    def __len__(self):
+        return len(self.lats)
+
+    def _dist_to_chord(self, dist):
+        """Convert great-circle distance in km to chord length on unit sphere"""
+        angle = np.clip(np.asarray(dist, dtype=float) / self.earth_radius,
+                        0, np.pi)
+        return 2 * np.sin(angle / 2)
+
+    def _chord_to_dist(self, chord):
+        """Convert chord length on unit sphere to great-circle distance in km"""
+        chord = np.clip(np.asarray(chord, dtype=float), 0, 2)
+        return 2 * self.earth_radius * np.arcsin(chord / 2)
+
+    def query_radius(self, lat, lon, radius=1):
+        """Find indexed coordinates within a radius around input coordinate(s)
+
+        Parameters
+        ----------
+        lat : float or ndarray
+            latitude(s) of reference coordinate(s) in decimal degrees
+        lon : float or ndarray
+            longitude(s) of reference coordinate(s) in decimal degrees
+        radius : float
+            maximum distance in km (exclusive, as in
+            :func:`find_coord_indices_within_distance`). Defaults to 1.
+
+        Returns
+        -------
+        ndarray or list
+            indices of indexed coordinates that are within the radius,
+            sorted by distance (closest first). If input coordinates are
+            arrays, a list with one index array per input coordinate is
+            returned.
+        """
+        scalar = np.ndim(lat) == 0 and np.ndim(lon) == 0
+        lats = np.atleast_1d(np.asarray(lat, dtype=float))
+        lons = np.atleast_1d(np.asarray(lon, dtype=float))
+        # slightly increase search radius to account for floating point
+        # differences, candidates are filtered using haversine below
+        chord = self._dist_to_chord(radius) * (1 + 1e-9) + 1e-12
+        candidates = self._tree.query_ball_point(latlon_to_unit_xyz(lats, lons),
+                                                 chord)
+        result = []
+        for i, cand in enumerate(candidates):
+            cand = np.sort(np.asarray(cand, dtype=int))
+            dists = haversine(lats[i], lons[i], self.lats[cand],
+                              self.lons[cand], self.earth_radius)
+            within_tol = np.where(dists < radius)[0]
+            result.append(cand[within_tol[np.argsort(dists[within_tol],
+                                                     kind='stable')]])
+        if scalar:
+            return result[0]
+        return result
+
+    def query_nearest(self, lat, lon, k=1):
+        """Find nearest indexed coordinate(s) to input coordinate(s)
+
+        Parameters
+        ----------
+        lat : float or ndarray
+            latitude(s) of reference coordinate(s) in decimal degrees
+        lon : float or ndarray
+            longitude(s) of reference coordinate(s) in decimal degrees
+        k : int
+            number of nearest neighbours to be retrieved. Defaults to 1.
+
+        Returns
+        -------
+        ndarray
+            great-circle distances in km to nearest neighbour(s)
+        ndarray
+            indices of nearest neighbour(s)
+        """
+        chords, idx = self._tree.query(latlon_to_unit_xyz(lat, lon), k=k)
+        dists = self._chord_to_dist(chords)
+        if np.ndim(lat) == 0 and np.ndim(lon) == 0:
+            return dists[0], idx[0]
+        return dists, idx
+
 def get_country_info_coords(coords):
     """
     Get country information for input lat/lon coordinates
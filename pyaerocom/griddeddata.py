@@ -4,6 +4,7 @@ from collections import OrderedDict as od
 
 import os
 
+import dask.array as da
 import iris
 from iris.analysis.cartography import area_weights
 from iris.analysis import MEAN
@@ -16,6 +17,7 @@ from pyaerocom import const, logger, print_log
 from pyaerocom.helpers_landsea_masks import load_region_mask_iris
 from pyaerocom.tstype import TsType
 from pyaerocom.exceptions import (CoordinateError,
+                                  DataCoverageError,
                                   DataDimensionError,
                                   DataExtractionError,
                                   DimensionOrderError,
@@ -40,9 +42,11 @@ from pyaerocom.helpers import (get_time_rng_constraint,
                                check_coord_circular,
                                extract_latlon_dataarray)
 
-from pyaerocom.mathutils import closest_index, exponent
+from pyaerocom.mathutils import (closest_index, closest_indices_sorted,
+                                  exponent)
 from pyaerocom.stationdata import StationData
 from pyaerocom.region import Region
+from pyaerocom.regrid_cache import REGRID_CACHE
 from pyaerocom.vert_coords import AltitudeAccess
 
 class GriddedData(object):
@@ -84,6 +88,12 @@ class GriddedData(object):
     SUPPORTED_VERT_SCHEMES = ['mean', 'max', 'min', 'surface', 'altitude',
                               'profile']
 
+    #: Cache for nearest grid cell indices of station coordinates (shared
+    #: by all instances, so it can be reused for different variables on the
+    #: same grid, see :func:`nearest_latlon_index`)
+    _NEAREST_INDEX_CACHE = od()
+    _NEAREST_INDEX_CACHE_MAXSIZE = 20
+
     _META_ADD = od(from_files         = [],
                    data_id            = "n/d",
                    var_name_read      = "n/d",
@@ -272,9 +282,10 @@ class GriddedData(object):
 
     @data.setter
     def data(self, array):
-        if not isinstance(array, np.ndarray):
-            raise ValueError('Cannot set data array: need numpy.ndarray')
-        elif not array.shape == self.grid.data.shape:
+        if not isinstance(array, (np.ndarray, da.Array)):
+            raise ValueError('Cannot set data array: need numpy.ndarray or '
+                             'lazy (dask) array')
+        elif not array.shape == self.grid.shape:
             raise DataDimensionError('Cannot assign dataarray: shape mismatch. '
                                      'Got: {}, Need: {}'
                                      .format(array.shape,self.grid.shape))
@@ -343,6 +354,62 @@ class GriddedData(object):
         """List of file paths from which this data object was created"""
         return self.metadata['from_files']
 
+    @property
+    def is_lazy(self):
+        """Boolean specifying whether data is lazy loaded (not realised)"""
+        return self.grid.has_lazy_data()
+
+    @property
+    def lazy_mode(self):
+        """Boolean specifying whether data is supposed to be kept lazy
+
+        If True, operations that support it (e.g. :func:`remove_outliers`,
+        :func:`resample_time`, :func:`crop`, collapsing of the vertical
+        dimension and gridded / gridded colocation) keep the data as lazy
+        (dask) array, which is only computed when the final result is
+        accessed or written. Depends on
+        :attr:`pyaerocom.const.GRIDDED_LAZY_MODE` and, if that is None, on
+        the size of the data array (cf.
+        :attr:`pyaerocom.const.GRIDDED_LAZY_MIN_GB`). Always False, if the
+        data is already realised.
+        """
+        if not self.is_lazy:
+            return False
+        mode = const.GRIDDED_LAZY_MODE
+        if mode is None:
+            return self._size_GB > const.GRIDDED_LAZY_MIN_GB
+        return bool(mode)
+
+    def rechunk_time(self, chunk_mb=None):
+        """Rechunk lazy data array along time dimension
+
+        The chunks span the full extent of all other dimensions and as many
+        time stamps as fit into the chunk size. Does nothing if the data is
+        already realised.
+
+        Parameters
+        ----------
+        chunk_mb : float, optional
+            target size of chunks in MB. If None,
+            :attr:`pyaerocom.const.GRIDDED_LAZY_CHUNK_MB` is used.
+
+        Returns
+        -------
+        GriddedData
+            this object (modified in place)
+        """
+        if not self.is_lazy or not self.has_time_dim:
+            return self
+        if chunk_mb is None:
+            chunk_mb = const.GRIDDED_LAZY_CHUNK_MB
+        tidx = self.dimcoord_names.index('time')
+        step_mb = (self._size_GB * 1e3) / self.shape[tidx]
+        num = int(max(1, chunk_mb // step_mb)) if step_mb > 0 else 1
+        chunks = {i : -1 for i in range(self.ndim)}
+        chunks[tidx] = min(num, self.shape[tidx])
+        self.grid.data = self.grid.lazy_data().rechunk(chunks)
+        return self
+
     @property
     def is_masked(self):
         """Flag specifying whether data is masked or not
@@ -1010,6 +1077,129 @@ class GriddedData(object):
                                       vert_scheme=vert_scheme,
                                       add_meta=add_meta)
 
+    def nearest_latlon_index(self, latitude, longitude, check_domain=True):
+        """Find indices of nearest grid cells for input coordinates
+
+        The indices are computed via binary search on the grid coordinates,
+        taking into account circular longitudes (if the longitude dimension
+        spans the whole globe). Results are cached and can be reused for
+        all data objects that have the same grid (e.g. different variables
+        of one model).
+
+        Parameters
+        ----------
+        latitude : list or ndarray
+            latitudes of input coordinates
+        longitude : list or ndarray
+            longitudes of input coordinates
+        check_domain : bool
+            if True, input coordinates that are outside of the lat / lon
+            domain of this object are ignored (cf.
+            :func:`pyaerocom.helpers.extract_latlon_dataarray`).
+
+        Raises
+        ------
+        DataCoverageError
+            if `check_domain` is True and none of the input coordinates is
+            within the domain of this object
+
+        Returns
+        -------
+        ndarray
+            indices of input coordinates that are within the domain
+        ndarray
+            corresponding latitude indices
+        ndarray
+            corresponding longitude indices
+        """
+        lats = np.atleast_1d(np.asarray(latitude, dtype=float))
+        lons = np.atleast_1d(np.asarray(longitude, dtype=float))
+        if not len(lats) == len(lons):
+            raise ValueError('Input latitude and longitude need to have the '
+                             'same length')
+        grid_lats = self.latitude.points
+        grid_lons = self.longitude.points
+        try:
+            circular = self.check_lon_circular()
+        except ValueError:
+            circular = False
+        key = (grid_lats.tobytes(), grid_lons.tobytes(), lats.tobytes(),
+               lons.tobytes(), circular, check_domain)
+        cache = self._NEAREST_INDEX_CACHE
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        valid = np.ones(len(lats), dtype=bool)
+        if check_domain:
+            valid &= ((lats >= grid_lats.min()) & (lats <= grid_lats.max()))
+            if not circular:
+                valid &= ((lons >= grid_lons.min()) &
+                          (lons <= grid_lons.max()))
+            if not valid.any():
+                raise DataCoverageError('Coordinates not found in '
+                                        'GriddedData domain')
+        stat_idx = np.where(valid)[0]
+        lat_idx = closest_indices_sorted(grid_lats, lats[stat_idx])
+        lon_idx = closest_indices_sorted(grid_lons, lons[stat_idx],
+                                         modulus=360 if circular else None)
+        result = (stat_idx, lat_idx, lon_idx)
+        cache[key] = result
+        if len(cache) > self._NEAREST_INDEX_CACHE_MAXSIZE:
+            cache.popitem(last=False)
+        return result
+
+    def extract_nearest_latlon_arr(self, latitude, longitude,
+                                   check_domain=True):
+        """Extract data at nearest grid cells for input coordinates
+
+        Requires 3D data with dimensions time, latitude, longitude. The
+        data at all input coordinates is extracted using a single indexing
+        operation (cf. :func:`nearest_latlon_index`). In :attr:`lazy_mode`,
+        only the required grid cells are computed from the lazy data array.
+
+        Parameters
+        ----------
+        latitude : list or ndarray
+            latitudes of input coordinates
+        longitude : list or ndarray
+            longitudes of input coordinates
+        check_domain : bool
+            if True, input coordinates that are outside of the lat / lon
+            domain of this object are ignored.
+
+        Returns
+        -------
+        ndarray
+            2D array with shape (time, number of coordinates within domain),
+            masked values are set to NaN
+        ndarray
+            indices of input coordinates corresponding to the 2nd dimension
+            of the returned data array
+        """
+        if not self.ndim == 3:
+            raise DataDimensionError('Can only extract data at nearest grid '
+                                     'cells from 3D data (time, latitude, '
+                                     'longitude)')
+        try:
+            self.check_dimcoords_tseries()
+        except DimensionOrderError:
+            self.reorder_dimensions_tseries()
+        stat_idx, lat_idx, lon_idx = self.nearest_latlon_index(latitude,
+                                                               longitude,
+                                                               check_domain)
+        if self.lazy_mode:
+            # avoid realisation of full array: index flattened lat / lon
+            # dimension of dask array, which only loads required chunks
+            lazy = self.grid.core_data()
+            nt, nlat, nlon = lazy.shape
+            flat_idx = np.asarray(lat_idx) * nlon + np.asarray(lon_idx)
+            arr = lazy.reshape(nt, nlat * nlon)[:, flat_idx].compute()
+        else:
+            arr = self.grid.data[:, lat_idx, lon_idx]
+        if np.ma.isMaskedArray(arr):
+            arr = arr.astype(float).filled(np.nan)
+        return arr, stat_idx
+
     def _to_time_series_xarray(self, scheme='nearest',
                                add_meta=None, ts_type=None, **coords):
 
@@ -1018,8 +1208,6 @@ class GriddedData(object):
         except DimensionOrderError:
             self.reorder_dimensions_tseries()
 
-        arr = self.to_xarray()
-
         if not len(coords) == 2:
             raise NotImplementedError('Please provide only latitude / longitude '
                                       'sampling points as input')
@@ -1034,11 +1222,23 @@ class GriddedData(object):
                 lon = vals
         if lat is None or lon is None:
             raise ValueError('Please provide latitude and longitude coords')
-        subset = extract_latlon_dataarray(arr, lat, lon, method=scheme,
-                                          new_index_name='latlon')
+        if scheme == 'nearest':
+            data_np, stat_idx = self.extract_nearest_latlon_arr(lat, lon)
+            _, lat_idx, lon_idx = self.nearest_latlon_index(lat, lon)
+            lats = self.latitude.points[lat_idx]
+            lons = self.longitude.points[lon_idx]
+        else:
+            subset = extract_latlon_dataarray(self.to_xarray(), lat, lon,
+                                              method=scheme,
+                                              new_index_name='latlon')
+            lat_id = subset.attrs['lat_dimname']
+            lon_id = subset.attrs['lon_dimname']
+            subset = subset.compute()
+            data_np = subset.data
+            lats = subset[lat_id].data
+            lons = subset[lon_id].data
+            stat_idx = np.arange(subset.shape[-1])
 
-        lat_id = subset.attrs['lat_dimname']
-        lon_id = subset.attrs['lon_dimname']
         var = self.var_name
         times = self.time_stamps()
 
@@ -1054,11 +1254,7 @@ class GriddedData(object):
                     meta_glob[meta_key] = meta_val
 
         result = []
-        subset = subset.compute()
-        data_np = subset.data
-        lats = subset[lat_id].data
-        lons = subset[lon_id].data
-        for sidx in range(subset.shape[-1]):
+        for sidx in range(data_np.shape[-1]):
 
             data = StationData(latitude=lats[sidx],
                                longitude=lons[sidx],
@@ -1071,7 +1267,7 @@ class GriddedData(object):
 
             data[var] = pd.Series(vals, index=times)
             for meta_key, meta_val in meta_iter.items():
-                data[meta_key] = meta_val[sidx]
+                data[meta_key] = meta_val[stat_idx[sidx]]
             for meta_key, meta_val in meta_glob.items():
                 data[meta_key] = meta_val
 
@@ -1440,12 +1636,16 @@ class GriddedData(object):
             logger.info('Setting {} outlier upper lim: {:.2f}'
                         .format(self.var_name, high))
         obj = self if inplace else self.copy()
-        obj._ensure_is_masked_array()
+        if obj.lazy_mode:
+            obj.grid.data = da.ma.masked_outside(obj.grid.lazy_data(),
+                                                 low, high)
+        else:
+            obj._ensure_is_masked_array()
 
-        data = obj.grid.data
+            data = obj.grid.data
 
-        mask = np.logical_or(data<low, data>high)
-        obj.grid.data[mask] = np.ma.masked
+            mask = np.logical_or(data<low, data>high)
+            obj.grid.data[mask] = np.ma.masked
         obj.metadata['outliers_removed'] = True
         return obj
 
@@ -2076,7 +2276,9 @@ class GriddedData(object):
             longitude resolution in degrees (is only used if input arg `other`
             is None)
         scheme : str
-            regridding scheme (e.g. linear, neirest, areaweighted)
+            regridding scheme (e.g. linear, neirest, areaweighted). Area
+            weighted regridding between longitude / latitude grids uses
+            cached regridding weights (cf. :mod:`pyaerocom.regrid_cache`).
 
         Returns
         -------
@@ -2108,7 +2310,12 @@ class GriddedData(object):
         self.check_lon_circular()
         other.check_lon_circular()
 
-        data_rg = self.grid.regrid(other.grid, scheme)
+        if (isinstance(scheme, iris.analysis.AreaWeighted) and
+                REGRID_CACHE.can_regrid(self.grid, other.grid)):
+            data_rg = REGRID_CACHE.regrid(self.grid, other.grid,
+                                          mdtol=scheme.mdtol)
+        else:
+            data_rg = self.grid.regrid(other.grid, scheme)
         suppl = od(**self.metadata)
         suppl['regridded'] = True
         data_out = GriddedData(data_rg, **suppl)
@@ -2145,11 +2352,19 @@ class GriddedData(object):
         Returns
         -------
         GriddedData
-            collapsed data object
+            collapsed data object. In :attr:`lazy_mode`, the data of the
+            collapsed object is lazy, too, if the aggregator supports lazy
+            aggregation (e.g. collapsing of vertical dimension using mean).
         """
         if isinstance(aggregator, str):
             aggregator = str_to_iris(aggregator)
+        lazy = self.lazy_mode
         collapsed = self.grid.collapsed(coords, aggregator, **kwargs)
+        if lazy and not collapsed.has_lazy_data():
+            const.print_log.warning('Data of {} was realised when collapsing '
+                                    '{} (aggregator {} does not support lazy '
+                                    'data)'.format(self.var_name, coords,
+                                                   aggregator.name()))
         return GriddedData(collapsed, **self.cube.attributes)
 
     def extract(self, constraint, inplace=False):
@@ -2360,13 +2575,13 @@ class GriddedData(object):
 
     @property
     def _size_GB(self):
-        """Size of original data files from which this object is created
+        """Size of (realised) data array in GB
 
-        These method is intended to be used for operations that actually
-        require the *realisation* of the (lazy loaded) data.
+        Computed from shape and data type, i.e. without realising lazy
+        loaded data.
         """
-        raise NotImplementedError
-        return sum([os.path.getsize(f) for f in self.from_files]) / 10**9
+        return (np.prod(self.shape, dtype=float) *
+                np.dtype(self.grid.dtype).itemsize / 10**9)
 
     def __getattr__(self, attr):
         return self[attr]
@@ -1009,7 +1009,10 @@ def resample_time_dataarray(arr, freq, how='mean', min_num_obs=None):
     arr = aggfun(dim='time')
 
     if invalid is not None:
-        arr.data[invalid.data] = np.nan
+        if isinstance(arr.data, np.ndarray):
+            arr.data[invalid.data] = np.nan
+        else: # lazy (dask) array, does not support item assignment
+            arr = arr.where(~invalid)
     return arr
 
 def same_meta_dict(meta1, meta2, ignore_keys=['PI'],
@@ -11,6 +11,7 @@ data classes (i.e. :class:`GriddedData`, :class:`UngriddedData`,
 :class:`ColocatedData`).
 """
 
+from collections import OrderedDict as od
 import os
 import glob
 import requests
@@ -21,8 +22,12 @@ import xarray as xr
 
 from pyaerocom import const
 from pyaerocom.helpers import numpy_to_cube
+from pyaerocom.mathutils import closest_indices_sorted
 from pyaerocom.exceptions import DataRetrievalError
 
+#: Process-wide cache of loaded HTAP masks (cf. :func:`load_region_mask_arr`)
+_MASK_ARR_CACHE = {}
+
 def available_htap_masks():
     """
     List of HTAP mask names
@@ -212,6 +217,93 @@ def get_mask_value(lat, lon, mask):
                          .format(type(mask)))
     return float(mask.sel(lat=lat, long=lon, method='nearest'))
 
+def load_region_mask_arr(region_id):
+    """Load boolean mask of HTAP region as numpy arrays
+
+    The masks are loaded only once per process and kept in memory, see
+    :func:`clear_region_mask_cache`.
+
+    Parameters
+    ----------
+    region_id : str
+        ID of HTAP region
+
+    Returns
+    -------
+    tuple
+        3-element tuple containing latitudes and longitudes of mask grid and
+        2D boolean mask array (latitude, longitude) that is True for grid
+        points in the region
+    """
+    if not region_id in _MASK_ARR_CACHE:
+        mask = load_region_mask_xr(region_id).transpose('lat', 'long')
+        _MASK_ARR_CACHE[region_id] = (mask.lat.values.astype(float),
+                                      mask.long.values.astype(float),
+                                      mask.values >= 1)
+    return _MASK_ARR_CACHE[region_id]
+
+def clear_region_mask_cache():
+    """Remove all HTAP masks loaded via :func:`load_region_mask_arr`"""
+    _MASK_ARR_CACHE.clear()
+
+def check_coords_in_region_mask(lats, lons, region_id):
+    """Check which input coordinates are in HTAP region mask
+
+    Vectorised version of :func:`get_mask_value` for many coordinates. The
+    mask is only loaded once (cf. :func:`load_region_mask_arr`) and the
+    neirest neighbour grid indices of all coordinates are computed at once
+    using binary search.
+
+    Parameters
+    ----------
+    lats : ndarray
+        latitudes of coordinates
+    lons : ndarray
+        longitudes of coordinates
+    region_id : str
+        ID of HTAP region
+
+    Returns
+    -------
+    ndarray
+        boolean array that is True for coordinates in region mask
+    """
+    lats = np.atleast_1d(np.asarray(lats, dtype=float))
+    lons = np.atleast_1d(np.asarray(lons, dtype=float))
+    if not lats.shape == lons.shape:
+        raise ValueError('Shape mismatch between input latitudes and '
+                         'longitudes')
+    mask_lats, mask_lons, mask = load_region_mask_arr(region_id)
+    lat_idx = closest_indices_sorted(mask_lats, lats)
+    lon_idx = closest_indices_sorted(mask_lons, lons)
+    return mask[lat_idx, lon_idx]
+
+def get_htap_regions_coords(lats, lons, *region_ids):
+    """Check which of the input coordinates are in HTAP regions
+
+    Parameters
+    ----------
+    lats : ndarray
+        latitudes of coordinates
+    lons : ndarray
+        longitudes of coordinates
+    *region_ids
+        IDs of HTAP regions. If none are provided, all available HTAP
+        regions are checked.
+
+    Returns
+    -------
+    OrderedDict
+        keys are region IDs, values are boolean arrays that are True for
+        coordinates in the corresponding region mask
+    """
+    if len(region_ids) == 0:
+        region_ids = available_htap_masks()
+    result = od()
+    for region_id in region_ids:
+        result[region_id] = check_coords_in_region_mask(lats, lons, region_id)
+    return result
+
 def check_all_htap_available():
     """
     Check for missing HTAP masks on local computer and download
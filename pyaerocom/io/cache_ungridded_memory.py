@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+In-memory cache for loaded observation data objects
+
+Can be used to keep loaded (and filtered) :class:`UngriddedData` objects in
+memory during a python session, e.g. when colocating the same observation
+variable with many models (cf. :class:`pyaerocom.colocation_auto.Colocator`).
+The cache is bounded by the size of the data arrays of the cached objects
+and removes the least recently used objects first.
+"""
+from collections import OrderedDict as od
+import json
+
+from pyaerocom import const
+
+class UngriddedMemoryCache(object):
+    """Size bounded LRU cache for :class:`UngriddedData` objects
+
+    Note
+    ----
+    Cached objects are returned as is (not as copies), so they should not be
+    modified in place.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        maximum size of all cached objects in bytes. If None, the global
+        setting :attr:`pyaerocom.const.OBS_MEMCACHE_MAX_GB` is used.
+
+    Attributes
+    ----------
+    hits : int
+        number of successful cache lookups
+    misses : int
+        number of unsuccessful cache lookups
+    evictions : int
+        number of objects that have been removed from the cache to make
+        space for new ones
+    """
+    def __init__(self, max_bytes=None):
+        self._max_bytes = max_bytes
+        self._entries = od()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_bytes(self):
+        """Maximum size of all cached objects in bytes"""
+        if self._max_bytes is None:
+            return int(const.OBS_MEMCACHE_MAX_GB * 1e9)
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, val):
+        self._max_bytes = val
+        self._evict(0)
+
+    @property
+    def size_bytes(self):
+        """Current size of all cached objects in bytes"""
+        return sum([size for (_, size) in self._entries.values()])
+
+    @property
+    def stats(self):
+        """Dictionary containing cache statistics"""
+        return dict(hits=self.hits,
+                    misses=self.misses,
+                    evictions=self.evictions,
+                    num_entries=len(self),
+                    size_bytes=self.size_bytes,
+                    max_bytes=self.max_bytes)
+
+    @staticmethod
+    def make_key(obs_id, var_name, **kwargs):
+        """Create cache key
+
+        Parameters
+        ----------
+        obs_id : str
+            ID of observation network
+        var_name : str
+            variable name
+        **kwargs
+            any further settings that affect the data object (e.g. reading
+            options, filters). Must be JSON serialisable (other values are
+            converted to str).
+
+        Returns
+        -------
+        tuple
+            cache key
+        """
+        return (obs_id, var_name, json.dumps(kwargs, sort_keys=True,
+                                             default=str))
+
+    @staticmethod
+    def sizeof(data):
+        """Size of data array of input :class:`UngriddedData` in bytes"""
+        return data._data.nbytes
+
+    def get(self, key):
+        """Get cached object
+
+        Parameters
+        ----------
+        key : tuple
+            cache key (cf. :func:`make_key`)
+
+        Returns
+        -------
+        UngriddedData or None
+            cached object or None, if it is not in the cache
+        """
+        if not key in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key][0]
+
+    def put(self, key, data):
+        """Add object to cache
+
+        Least recently used objects are removed if required. Objects that
+        are larger than :attr:`max_bytes` are not cached.
+
+        Parameters
+        ----------
+        key : tuple
+            cache key (cf. :func:`make_key`)
+        data : UngriddedData
+            data object
+
+        Returns
+        -------
+        bool
+            True if object was added to the cache, else False
+        """
+        size = self.sizeof(data)
+        if key in self._entries:
+            del self._entries[key]
+        if size > self.max_bytes:
+            const.logger.info('Object {} is too large for observation memory '
+                              'cache ({} bytes)'.format(key, size))
+            return False
+        self._evict(size)
+        self._entries[key] = (data, size)
+        return True
+
+    def _evict(self, size):
+        """Remove least recently used objects until input size fits"""
+        current = self.size_bytes
+        while len(self._entries) > 0 and current + size > self.max_bytes:
+            _, (_, removed) = self._entries.popitem(last=False)
+            current -= removed
+            self.evictions += 1
+
+    def clear(self):
+        """Remove all objects from cache and reset statistics"""
+        self._entries = od()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __str__(self):
+        s = 'UngriddedMemoryCache\n'
+        for key, val in self.stats.items():
+            s += '{}: {}\n'.format(key, val)
+        return s
+
+#: Cache instance that is shared within the current process
+OBS_MEMCACHE = UngriddedMemoryCache()
@@ -3,7 +3,8 @@
 """
 Caching class for reading and writing of ungridded data Cache objects
 """
-import glob, os, pickle
+import glob, json, os, pickle, shutil
+import numpy as np
 
 from pyaerocom import const
 from pyaerocom.ungriddeddata import UngriddedData
@@ -17,9 +18,21 @@ class CacheHandlerUngridded(object):
 
     Cache filename mask is
 
-    <dataset_to_read>_<var>.pkl
+    <dataset_to_read>_<var>.<ext>
 
-    e.g. EBASMC_scatc550aer.pkl
+    e.g. EBASMC_scatc550aer.npcache
+
+    Two cache formats are supported (cf. :attr:`CACHE_FORMATS`):
+
+    - *columnar* (default, extension .npcache): a directory containing the
+      cache header as JSON (``head.json``), the data array of the
+      :class:`UngriddedData` object as uncompressed numpy file (``data.npy``)
+      and all remaining attributes (e.g. metadata) as pickled sidecar
+      (``meta.pkl``). The data array is memory-mapped when the cache is
+      loaded, so that only the rows that are actually accessed are read from
+      disk.
+    - *pkl* (extension .pkl): the cache header and the whole
+      :class:`UngriddedData` object pickled into one file.
 
     Attributes
     ----------
@@ -28,8 +41,33 @@ class CacheHandlerUngridded(object):
     loaded_data : dict
         dictionary containing successfully loaded instances of single variable
         :class:`UngriddedData` objects (keys are variable names)
+    cache_format : str
+        format used for writing new cache files (and for locating cache files
+        if only a variable name is provided)
     """
-    __version__ = '1.11'
+    __version__ = '1.12'
+
+    #: Supported cache formats and corresponding file extensions
+    CACHE_FORMATS = {'columnar' : '.npcache',
+                     'pkl'      : '.pkl'}
+
+    #: Default cache format
+    CACHE_FORMAT = 'columnar'
+
+    #: Mode used for memory-mapping of the data array of columnar cache
+    #: files (copy-on-write, i.e. in-place changes of the loaded data object
+    #: are not written back to the cache file)
+    MMAP_MODE = 'c'
+
+    #: File names of the individual parts of columnar cache directories
+    _COLUMNAR_HEAD_FILE = 'head.json'
+    _COLUMNAR_DATA_FILE = 'data.npy'
+    _COLUMNAR_META_FILE = 'meta.pkl'
+
+    #: Attributes of UngriddedData that are stored in the columnar sidecar
+    #: file (in addition to the column index)
+    _COLUMNAR_META_ATTRS = ['metadata', 'meta_idx', 'var_idx',
+                            'data_revision', 'filter_hist']
     #: Directory of cache files
     try:
         CACHE_DIR = const.CACHEDIR
@@ -46,7 +84,7 @@ class CacheHandlerUngridded(object):
                        'ungridded_data_version',
                        'cacher_version']
 
-    def __init__(self, reader=None, cache_dir=None,
+    def __init__(self, reader=None, cache_dir=None, cache_format=None,
                  **kwargs):
         self._reader = None
         if reader is not None:
@@ -55,6 +93,14 @@ class CacheHandlerUngridded(object):
         self.loaded_data = {}
         self._cache_dir = cache_dir
 
+        if cache_format is None:
+            cache_format = self.CACHE_FORMAT
+        elif not cache_format in self.CACHE_FORMATS:
+            raise ValueError('Invalid input for cache_format: {}. Choose from '
+                             '{}'.format(cache_format,
+                                         list(self.CACHE_FORMATS)))
+        self.cache_format = cache_format
+
     @property
     def reader(self):
         """Instance of reader class"""
@@ -117,10 +163,21 @@ class CacheHandlerUngridded(object):
         Returns
         -------
         str
-            file name of pickle file
+            file name of cache file (extension depends on
+            :attr:`cache_format`)
         """
         name = '_'.join([self.dataset_to_read, var_name])
-        return name + '.pkl'
+        return name + self.CACHE_FORMATS[self.cache_format]
+
+    def _is_file_name(self, var_or_file_name):
+        """Check if input is a cache file name (and not a variable name)"""
+        if not isinstance(var_or_file_name, str):
+            return False
+        return var_or_file_name.endswith(tuple(self.CACHE_FORMATS.values()))
+
+    def _is_columnar(self, file_path):
+        """Check if input cache file path is in columnar format"""
+        return file_path.endswith(self.CACHE_FORMATS['columnar'])
 
     def file_path(self, var_or_file_name, cache_dir=None):
         """File path of cache file
@@ -141,7 +198,7 @@ class CacheHandlerUngridded(object):
         str
             output file path
         """
-        if not var_or_file_name.endswith('.pkl'):
+        if not self._is_file_name(var_or_file_name):
             var_or_file_name = self.default_file_name(var_or_file_name)
         if cache_dir is None:
             cache_dir = self.cache_dir
@@ -151,10 +208,46 @@ class CacheHandlerUngridded(object):
         return os.path.join(cache_dir, var_or_file_name)
 
     def _check_pkl_head_vs_database(self, in_handle):
+        head = pickle.load(in_handle)
+        return self._check_head_vs_database(head)
+
+    def read_columnar_head(self, file_path):
+        """Read header of columnar cache file
+
+        Only the (small) JSON header file is read, the data payload is not
+        touched.
+
+        Parameters
+        ----------
+        file_path : str
+            path of columnar cache directory
+
+        Returns
+        -------
+        dict
+            cache header (cf. :attr:`CACHE_HEAD_KEYS`)
+        """
+        with open(os.path.join(file_path, self._COLUMNAR_HEAD_FILE)) as f:
+            return json.load(f)
+
+    def _check_head_len(self, head):
+        """Check that cache header contains all keys of current version
+
+        Raises
+        ------
+        CacheReadError
+            if number of header entries does not match
+            :attr:`CACHE_HEAD_KEYS`
+        """
+        if not len(head) == len(self.CACHE_HEAD_KEYS):
+            raise CacheReadError('Invalid cache header: expected {} entries, '
+                                 'got {}'.format(len(self.CACHE_HEAD_KEYS),
+                                                 len(head)))
+
+    def _check_head_vs_database(self, head):
 
         current = self.cache_meta_info()
 
-        head = pickle.load(in_handle)
         if not isinstance(head, dict):
             raise CacheReadError('Invalid cache file')
         for k, v in head.items():
@@ -240,17 +333,56 @@ class CacheHandlerUngridded(object):
             const.logger.warning(repr(e))
             return False
 
-        if not os.path.isfile(fp):
+        if not os.path.exists(fp):
             const.logger.info('Cache file does not exist: {}'
                               .format(fp))
             return False
 
+        if self._is_columnar(fp):
+            data = self._check_and_load_columnar(fp, force_use_outdated)
+        else:
+            data = self._check_and_load_pkl(fp, force_use_outdated)
+        if data is None:
+            return False
+
+        if not isinstance(data, UngriddedData):
+            raise TypeError('Unexpected data type stored in cache file, need '
+                            'instance of UngriddedData, got {}'
+                            .format(type(data)))
+
+        self.loaded_data[var_or_file_name] = data
+        const.logger.info('Successfully loaded cache file {}'
+                          .format(fp))
+        return True
+
+    def _handle_invalid_cache(self, fp, delete_existing):
+        # TODO: Should we delete the cache file if it is outdated ???
+        const.logger.info('Aborting reading cache file {}. Aerocom database '
+                          'or pyaerocom version has changed compared to '
+                          'cached version'
+                          .format(fp))
+        if delete_existing: #something was wrong
+            const.print_log.info('Deleting outdated cache file: {}'
+                                 .format(fp))
+            self._remove_cache_file(fp)
+
+    def _remove_cache_file(self, fp):
+        if os.path.isdir(fp):
+            shutil.rmtree(fp)
+        else:
+            os.remove(fp)
+
+    def _check_and_load_pkl(self, fp, force_use_outdated):
+        """Check header of pickled cache file and load data (or None)"""
         delete_existing = const.RM_CACHE_OUTDATED if not force_use_outdated else False
 
         in_handle = open(fp, 'rb')
         if force_use_outdated:
-            last_meta = pickle.load(in_handle)
-            assert len(last_meta) == len(self.CACHE_HEAD_KEYS)
+            try:
+                self._check_head_len(pickle.load(in_handle))
+            except Exception:
+                in_handle.close()
+                raise
             ok = True
         else:
             try:
@@ -262,41 +394,64 @@ class CacheHandlerUngridded(object):
                                  'be removed and data reloaded'
                                  'Error: {}'.format(fp, repr(e)))
         if not ok:
-            # TODO: Should we delete the cache file if it is outdated ???
-            const.logger.info('Aborting reading cache file {}. Aerocom database '
-                              'or pyaerocom version has changed compared to '
-                              'cached version'
-                              .format(fp))
             in_handle.close()
-            if delete_existing: #something was wrong
-                const.print_log.info('Deleting outdated cache file: {}'
-                                     .format(fp))
-                os.remove(fp)
-            return False
+            self._handle_invalid_cache(fp, delete_existing)
+            return None
 
         # everything is okay
-        data = pickle.load(in_handle)
-        if not isinstance(data, UngriddedData):
-            raise TypeError('Unexpected data type stored in cache file, need '
-                            'instance of UngriddedData, got {}'
-                            .format(type(data)))
+        try:
+            data = pickle.load(in_handle)
+        finally:
+            in_handle.close()
+        return data
 
-        self.loaded_data[var_or_file_name] = data
-        const.logger.info('Successfully loaded cache file {}'
-                          .format(fp))
-        return True
+    def _check_and_load_columnar(self, fp, force_use_outdated):
+        """Check header of columnar cache file and load data (or None)
+
+        The data array is memory-mapped (cf. :attr:`MMAP_MODE`).
+        """
+        delete_existing = const.RM_CACHE_OUTDATED if not force_use_outdated else False
+        try:
+            head = self.read_columnar_head(fp)
+            if force_use_outdated:
+                self._check_head_len(head)
+                ok = True
+            else:
+                ok = self._check_head_vs_database(head)
+        except Exception as e:
+            ok = False
+            delete_existing = True
+            const.logger.exception('File error in cached data file {}. File will '
+                                   'be removed and data reloaded'
+                                   'Error: {}'.format(fp, repr(e)))
+        if not ok:
+            self._handle_invalid_cache(fp, delete_existing)
+            return None
+
+        with open(os.path.join(fp, self._COLUMNAR_META_FILE), 'rb') as f:
+            meta = pickle.load(f)
+
+        data = UngriddedData(num_points=0)
+        data._chunksize = UngriddedData._CHUNKSIZE
+        data._index = meta['index']
+        for attr in self._COLUMNAR_META_ATTRS:
+            setattr(data, attr, meta[attr])
+        data._data = np.load(os.path.join(fp, self._COLUMNAR_DATA_FILE),
+                             mmap_mode=self.MMAP_MODE)
+        return data
 
     def delete_all_cache_files(self):
         """
-        Deletes all pickled data objects in cache directory
+        Deletes all cached data objects in cache directory
 
         If not set differently, the cache directory is the pyaerocom default,
         accessible via :attr:`pyaerocom.const.CACHEDIR`.
 
         """
-        for fp in glob.glob('{}/*.pkl'.format(self.cache_dir)):
-            os.remove(fp)
-            const.print_log.info('Deleted {}'.format(fp))
+        for ext in self.CACHE_FORMATS.values():
+            for fp in glob.glob('{}/*{}'.format(self.cache_dir, ext)):
+                self._remove_cache_file(fp)
+                const.print_log.info('Deleted {}'.format(fp))
 
     def write(self, data, var_or_file_name=None, cache_dir=None):
         """Write single-variable instance of UngriddedData to cache
@@ -325,7 +480,7 @@ class CacheHandlerUngridded(object):
             raise TypeError('Invalid input, need instance of UngriddedData, '
                             'got {}'.format(type(data)))
 
-        if not var_or_file_name.endswith('.pkl'):
+        if not self._is_file_name(var_or_file_name):
             var_name = var_or_file_name
             if len(data.contains_datasets) > 1:
                 raise CacheWriteError('Input UngriddedData object contains '
@@ -341,6 +496,7 @@ class CacheHandlerUngridded(object):
                                           .format(self.reader.data_id,
                                                   data.contains_vars))
                 var_name = data.contains_vars[0]
+                var_or_file_name = var_name
 
             elif not var_name in data.contains_vars:
                 raise CacheWriteError('Cannot write cache file: variable {} does '
@@ -352,6 +508,14 @@ class CacheHandlerUngridded(object):
 
         fp = self.file_path(var_or_file_name, cache_dir=cache_dir)
         const.logger.info('Writing cache file: {}'.format(fp))
+        if self._is_columnar(fp):
+            self._write_columnar(data, meta, fp)
+        else:
+            self._write_pkl(data, meta, fp)
+        const.logger.info('Wrote: {}'.format(fp))
+        return fp
+
+    def _write_pkl(self, data, meta, fp):
         success = True
         # OutHandle = gzip.open(c__cache_file, 'wb') # takes too much time
         out_handle = open(fp, 'wb')
@@ -370,8 +534,34 @@ class CacheHandlerUngridded(object):
             out_handle.close()
             if not success:
                 os.remove(fp)
-        const.logger.info('Wrote: {}'.format(fp))
-        return fp
+
+    def _write_columnar(self, data, meta, fp):
+        if os.path.exists(fp):
+            self._remove_cache_file(fp)
+        os.mkdir(fp)
+        success = True
+        try:
+            np.save(os.path.join(fp, self._COLUMNAR_DATA_FILE),
+                    np.ascontiguousarray(data._data))
+
+            sidecar = {'index' : data._index}
+            for attr in self._COLUMNAR_META_ATTRS:
+                sidecar[attr] = getattr(data, attr)
+            with open(os.path.join(fp, self._COLUMNAR_META_FILE), 'wb') as f:
+                pickle.dump(sidecar, f, pickle.HIGHEST_PROTOCOL)
+
+            # header is written last, incomplete cache directories are thus
+            # detected as invalid when reading
+            with open(os.path.join(fp, self._COLUMNAR_HEAD_FILE), 'w') as f:
+                json.dump(meta, f)
+
+        except Exception as e:
+            from pyaerocom import print_log
+            print_log.exception('Failed to write cache: {}'.format(repr(e)))
+            success=False
+        finally:
+            if not success:
+                shutil.rmtree(fp)
 
     def __str__(self):
         return 'pyaerocom.CacheHandlerUngridded\nDefault cache dir: {}'.format(self.cache_dir)
@@ -759,100 +759,84 @@ class EbasNasaAmesFile(NasaAmesHeader):
         """
         const.logger.info("Reading NASA Ames file:\n{}".format(nasa_ames_file))
         lc = 0 #line counter
-        dc = 0 #data block line counter
         mc = 0 #meta block counter
         END_VAR_DEF = np.nan #will be set (info stored in header)
         IN_DATA = False
-        data = []
-        _insert_invalid = None
+        data_lines = []
         self.file = nasa_ames_file
-        for line in open(nasa_ames_file):
-            #print(lc, _NUM_FIXLINES, line)
-            if IN_DATA: #in data block (end of file)
-                if dc == 0:
-                    const.logger.debug(line)
-                try:
-                    data.append(tuple([float(x.strip()) for x in line.strip().split()]))
-                    #data.append([float(x.strip()) for x in line.strip().split()])
-                except Exception as e:
-                    data.append(_insert_invalid)
-                    const.logger.warning("Failed to read data row {}. "
-                                   "Error msg: {}".format(dc, repr(e)))
-                dc += 1
-            elif lc < self._NUM_FIXLINES: #in header section (before column definitions)
-                try:
-                    val = self._H_FIXLINES_CONV[lc](line)
-                    attr = self._H_FIXLINES_YIELD[lc]
-                    if isinstance(attr, list):
-                        for i, attr_id in enumerate(attr):
-                            self[attr_id] = val[i]
-                    else:
-                        self[attr] = val
-                except Exception as e:
-                    msg = ("Failed to read header row {}.\n{}\n"
-                           "Error msg: {}".format(lc, line, repr(e)))
-                    if lc in self._HEAD_ROWS_MANDATORY:
-                        raise NasaAmesReadError("Fatal: {}".format(msg))
-                    else:
-                        const.logger.warning(msg)
-            else: # behind header section and before data definition (contains column defs and meta info)
-                if mc == 0: # still in column definition
-                    END_VAR_DEF = self._NUM_FIXLINES + self.num_cols_dependent - 1
-                    NUM_HEAD_LINES = self.num_head_lines
-                    try:
-                        self.var_defs.append(self._read_vardef_line(line))
-                    except Exception as e:
-                        const.logger.warning(repr(e))
-
-                elif lc < END_VAR_DEF:
-                    self.var_defs.append(self._read_vardef_line(line))
-
-                elif lc == NUM_HEAD_LINES - 1:
-                    IN_DATA = True
-                    self._data_header = h = [x.strip() for x in line.split()]
-                    #append information of first two columns to variable
-                    #definition array.
-                    self._var_defs.insert(0, EbasColDef(name=h[0],
-                                                        is_flag=False,
-                                                        is_var=False,
-                                                        unit=self.time_unit))
-                    self._var_defs.insert(1, EbasColDef(name=h[1],
-                                                        is_flag=False,
-                                                        is_var=False,
-                                                        unit=self.time_unit))
-                    if only_head:
-                        return
-                    const.logger.debug("REACHED DATA BLOCK")
-                    _insert_invalid = tuple([np.nan]*self.col_num)
-
-                #elif lc > self._NUM_FIXLINES + 3:
-                elif lc >= END_VAR_DEF + 2:
+        with open(nasa_ames_file) as f:
+            for line in f:
+                #print(lc, _NUM_FIXLINES, line)
+                if lc < self._NUM_FIXLINES: #in header section (before column definitions)
                     try:
-                        name, val = line.split(":")
-                        key = name.strip().lower().replace(" ", "_")
-                        self.meta[key] = val.strip()
+                        val = self._H_FIXLINES_CONV[lc](line)
+                        attr = self._H_FIXLINES_YIELD[lc]
+                        if isinstance(attr, list):
+                            for i, attr_id in enumerate(attr):
+                                self[attr_id] = val[i]
+                        else:
+                            self[attr] = val
                     except Exception as e:
-                        const.logger.warning("Failed to read line no. {}.\n{}\n"
-                              "Error msg: {}\n".format(lc, line, repr(e)))
-                else:
-                    const.logger.debug("Ignoring line no. {}: {}".format(lc, line))
-                mc += 1
-            lc += 1
+                        msg = ("Failed to read header row {}.\n{}\n"
+                               "Error msg: {}".format(lc, line, repr(e)))
+                        if lc in self._HEAD_ROWS_MANDATORY:
+                            raise NasaAmesReadError("Fatal: {}".format(msg))
+                        else:
+                            const.logger.warning(msg)
+                else: # behind header section and before data definition (contains column defs and meta info)
+                    if mc == 0: # still in column definition
+                        END_VAR_DEF = self._NUM_FIXLINES + self.num_cols_dependent - 1
+                        NUM_HEAD_LINES = self.num_head_lines
+                        try:
+                            self.var_defs.append(self._read_vardef_line(line))
+                        except Exception as e:
+                            const.logger.warning(repr(e))
+
+                    elif lc < END_VAR_DEF:
+                        self.var_defs.append(self._read_vardef_line(line))
 
-        data = np.asarray(data)
+                    elif lc == NUM_HEAD_LINES - 1:
+                        IN_DATA = True
+                        self._data_header = h = [x.strip() for x in line.split()]
+                        #append information of first two columns to variable
+                        #definition array.
+                        self._var_defs.insert(0, EbasColDef(name=h[0],
+                                                            is_flag=False,
+                                                            is_var=False,
+                                                            unit=self.time_unit))
+                        self._var_defs.insert(1, EbasColDef(name=h[1],
+                                                            is_flag=False,
+                                                            is_var=False,
+                                                            unit=self.time_unit))
+                        if only_head:
+                            return
+                        const.logger.debug("REACHED DATA BLOCK")
+                        break
+
+                    #elif lc > self._NUM_FIXLINES + 3:
+                    elif lc >= END_VAR_DEF + 2:
+                        try:
+                            name, val = line.split(":")
+                            key = name.strip().lower().replace(" ", "_")
+                            self.meta[key] = val.strip()
+                        except Exception as e:
+                            const.logger.warning("Failed to read line no. {}.\n{}\n"
+                                  "Error msg: {}\n".format(lc, line, repr(e)))
+                    else:
+                        const.logger.debug("Ignoring line no. {}: {}".format(lc, line))
+                    mc += 1
+                lc += 1
+            if IN_DATA:
+                # remainder of file is data block
+                data_lines = f.read().splitlines()
+
+        data = self._read_data_block(data_lines)
 
         data[:, 1:] = data[:, 1:] * np.asarray(self.mul_factors)
 
-        self._data = data
         if replace_invalid_nan:
-            dep_dat = data[:, 1:]
-            for i, val in enumerate(np.floor(self.vals_invalid)):
-                col = dep_dat[:, i]
-                cond = np.floor(col) == val
-                col[cond] = np.nan
-                dep_dat[:, i] = col
-
-            data[:, 1:] = dep_dat
+            self._replace_invalid_nan(data)
+
         self._data = data
 
         if convert_timestamps:
@@ -864,6 +848,80 @@ class EbasNasaAmesFile(NasaAmesHeader):
         if quality_check:
             self._quality_check()
 
+    def _replace_invalid_nan(self, data):
+        """Replace invalid values in dependent columns of data (in place)
+
+        The invalid value of each dependent column is specified in the file
+        header (:attr:`vals_invalid`).
+        """
+        vals_invalid = np.floor(self.vals_invalid)
+        # view into data, dependent columns that have invalid value assigned
+        dep_dat = data[:, 1:len(vals_invalid) + 1]
+        dep_dat[np.floor(dep_dat) == vals_invalid] = np.nan
+        return data
+
+    def _read_data_block(self, lines):
+        """Convert lines of data block into 2D numpy array
+
+        All values are converted at once, which is much faster than a
+        row-wise conversion. If this fails (e.g. due to corrupt rows that
+        contain invalid entries) or if any row does not have the expected
+        number of columns, the data block is converted row by row, using
+        :func:`_read_data_block_rowwise`.
+
+        Parameters
+        ----------
+        lines : list
+            lines of data block
+
+        Returns
+        -------
+        ndarray
+            2D array containing data table (rows are time stamps, columns
+            correspond to :attr:`var_defs`)
+        """
+        # ignore trailing empty lines
+        while len(lines) > 0 and not lines[-1].strip():
+            lines = lines[:-1]
+        num_rows, num_cols = len(lines), self.col_num
+        if num_rows > 0:
+            const.logger.debug(lines[0])
+        rows = [line.split() for line in lines]
+        row_lens = np.fromiter((len(row) for row in rows), dtype=int,
+                               count=num_rows)
+        # check each row, the total number of values may match even if
+        # rows are ragged (e.g. one short and one long row)
+        if np.all(row_lens == num_cols):
+            try:
+                vals = np.array([x for row in rows for x in row],
+                                dtype=float)
+                return vals.reshape(num_rows, num_cols)
+            except ValueError:
+                pass
+        const.logger.warning('Failed to convert data block of {} at once, '
+                             'converting row by row'.format(self.file))
+        return self._read_data_block_rowwise(lines)
+
+    def _read_data_block_rowwise(self, lines):
+        """Convert lines of data block into 2D numpy array row by row
+
+        Rows that cannot be converted are filled with NaN.
+        """
+        _insert_invalid = tuple([np.nan]*self.col_num)
+        data = []
+        for dc, line in enumerate(lines):
+            try:
+                row = tuple([float(x.strip()) for x in line.strip().split()])
+                if not len(row) == self.col_num:
+                    raise ValueError('Expected {} values, got {}'
+                                     .format(self.col_num, len(row)))
+                data.append(row)
+            except Exception as e:
+                data.append(_insert_invalid)
+                const.logger.warning("Failed to read data row {}. "
+                               "Error msg: {}".format(dc, repr(e)))
+        return np.asarray(data).reshape(len(data), self.col_num)
+
     def _read_vardef_line(self, line_from_file):
         """Import variable definition line from NASA Ames file"""
         spl = [x.strip() for x in line_from_file.split(",")]
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Manifest of input fingerprints of computed output files
+
+Can be used to decide whether an existing output file (e.g. a colocated data
+file or the json files computed from it) needs to be recomputed, because the
+inputs it was computed from have changed since (cf.
+:attr:`pyaerocom.colocation_auto.ColocationSetup.reanalyse_changed`).
+"""
+import hashlib
+import inspect
+import json
+import os
+
+from pyaerocom import const
+
+def _code_bytes(co):
+    """Bytes representation of code object (incl. nested code objects)"""
+    parts = [co.co_code, repr(co.co_names).encode('utf-8')]
+    for const in co.co_consts:
+        if inspect.iscode(const):
+            parts.append(_code_bytes(const))
+        elif isinstance(const, frozenset):
+            # order of set items depends on hash seed
+            parts.append(repr(sorted(repr(x) for x in const)).encode('utf-8'))
+        else:
+            parts.append(repr(const).encode('utf-8'))
+    return b'|'.join(parts)
+
+def _callable_code_hash(obj):
+    """Hash of bytecode (or source) of callable, None if unavailable"""
+    func = getattr(obj, '__func__', obj)
+    if hasattr(func, '__code__'):
+        code = _code_bytes(func.__code__)
+    else:
+        try:
+            code = inspect.getsource(obj).encode('utf-8')
+        except (OSError, TypeError):
+            return None
+    return hashlib.sha1(code).hexdigest()
+
+def _json_default(obj):
+    """Convert objects that are not JSON serialisable for fingerprinting"""
+    if callable(obj):
+        # str representation of functions contains the memory address and
+        # the name is not unique (e.g. for lambdas), so the code is included
+        name = '{}.{}'.format(getattr(obj, '__module__', None),
+                              getattr(obj, '__qualname__', repr(obj)))
+        code_hash = _callable_code_hash(obj)
+        if code_hash is None:
+            return name
+        return '{}:{}'.format(name, code_hash)
+    return str(obj)
+
+def make_fingerprint(info):
+    """Compute fingerprint of input information
+
+    Parameters
+    ----------
+    info : dict
+        information about inputs of an output file (e.g. input files and
+        processing settings). Values that are not JSON serialisable are
+        converted to str.
+
+    Returns
+    -------
+    str
+        fingerprint (SHA1 hex digest)
+    """
+    s = json.dumps(info, sort_keys=True, default=_json_default)
+    return hashlib.sha1(s.encode('utf-8')).hexdigest()
+
+def files_info(files):
+    """Get information about input files that is used for fingerprinting
+
+    Parameters
+    ----------
+    files : list
+        list of file paths
+
+    Returns
+    -------
+    list
+        list containing file path, modification time and size of each input
+        file (sorted by path). Time and size are None for files that do not
+        exist.
+    """
+    info = []
+    for fp in sorted(files):
+        try:
+            stat = os.stat(fp)
+            info.append([fp, stat.st_mtime, stat.st_size])
+        except OSError:
+            info.append([fp, None, None])
+    return info
+
+class FingerprintManifest(object):
+    """Directory based manifest of fingerprints of output files
+
+    Each output file is represented by one small json file in the manifest
+    directory, so that entries of different output files can be written
+    independently (e.g. from different processes).
+
+    Parameters
+    ----------
+    manifest_dir : str
+        directory of manifest (is created when the first entry is written)
+    """
+    def __init__(self, manifest_dir):
+        self.manifest_dir = manifest_dir
+
+    def _entry_path(self, name):
+        return os.path.join(self.manifest_dir, '{}.json'.format(name))
+
+    def get(self, name):
+        """Get manifest entry of output file
+
+        Parameters
+        ----------
+        name : str
+            name of output file
+
+        Returns
+        -------
+        dict or None
+            entry containing `fingerprint` and `info` or None if no (valid)
+            entry exists.
+        """
+        fp = self._entry_path(name)
+        if not os.path.exists(fp):
+            return None
+        try:
+            with open(fp, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            const.print_log.warning('Ignoring invalid manifest entry {}. '
+                                    'Reason: {}'.format(fp, repr(e)))
+            return None
+
+    def is_current(self, name, fingerprint):
+        """Check if output file was computed from inputs with fingerprint
+
+        Parameters
+        ----------
+        name : str
+            name of output file
+        fingerprint : str, optional
+            fingerprint of current inputs. If None (i.e. unknown), the output
+            is considered outdated.
+
+        Returns
+        -------
+        bool
+            True if the registered fingerprint of the output file matches
+            the input fingerprint, else False
+        """
+        if fingerprint is None:
+            return False
+        entry = self.get(name)
+        if entry is None:
+            return False
+        return entry['fingerprint'] == fingerprint
+
+    def set(self, name, fingerprint, info=None):
+        """Register fingerprint of output file
+
+        Parameters
+        ----------
+        name : str
+            name of output file
+        fingerprint : str, optional
+            fingerprint of inputs. If None, the entry is removed.
+        info : dict, optional
+            information that was used to compute the fingerprint (stored for
+            reference)
+        """
+        if fingerprint is None:
+            self.remove(name)
+            return
+        entry = dict(fingerprint=fingerprint, info=info)
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        fp = self._entry_path(name)
+        tmp = '{}.{}.tmp'.format(fp, os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump(entry, f, default=_json_default)
+        os.replace(tmp, fp)
+
+    def remove(self, name):
+        """Remove entry of output file (if it exists)"""
+        fp = self._entry_path(name)
+        if os.path.exists(fp):
+            os.remove(fp)
+
+    def clear(self):
+        """Remove all entries"""
+        if not os.path.exists(self.manifest_dir):
+            return
+        for fname in os.listdir(self.manifest_dir):
+            if fname.endswith('.json'):
+                os.remove(os.path.join(self.manifest_dir, fname))
+
+    def __contains__(self, name):
+        return os.path.exists(self._entry_path(name))
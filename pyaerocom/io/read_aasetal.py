@@ -313,7 +313,7 @@ class ReadAasEtal(ReadUngriddedBase):
                     data_obj._data[start:stop, data_obj._DATAINDEX] = values
                     data_obj._data[start:stop, data_obj._VARINDEX] = var_idx
 
-                    meta_idx[meta_key][var] = np.arange(start, stop)
+                    meta_idx[meta_key][var] = slice(start, stop)
 
                 meta_key += 1
                 idx += totnum
@@ -2621,100 +2621,57 @@ class ReadL2Data(ReadL2DataBase):
             temp = 'Error: Unknown grid: {}'.format(gridtype)
             self.logger.error(temp)
             return
-        lat_verbose_flag = False
 
         if engine == 'python':
             grid_heights=grid_heights_low[:-1] + (grid_heights_low[1:]-grid_heights_low[:-1])/2
-            data_for_gridding, gridded_var_data = \
+            grid_lats = self.SUPPORTED_GRIDS[gridtype]['grid_lats']
+            grid_lons = self.SUPPORTED_GRIDS[gridtype]['grid_lons']
+            gridded_var_data = \
                 self._to_grid_grid_init(gridtype=gridtype, vars=vars ,levels=grid_heights,
+                                        latitudes=grid_lats, longitudes=grid_lons,
                                         init_time=np.mean(_data[:,self._TIMEINDEX]))
+            data_for_gridding = {}
 
             gridded_var_data[self._ALTBOUNDSNAME] = np.transpose(np.array(
                 [grid_heights_low[0:len(grid_heights)], grid_heights_high[0:len(grid_heights)]]))
-            grid_lats = self.SUPPORTED_GRIDS[gridtype]['grid_lats']
-            grid_lons = self.SUPPORTED_GRIDS[gridtype]['grid_lons']
-            grid_dist_lat = self.SUPPORTED_GRIDS[gridtype]['grid_dist_lat']
-            grid_dist_lon = self.SUPPORTED_GRIDS[gridtype]['grid_dist_lon']
+            shape = (grid_lats.size, grid_lons.size, len(grid_heights))
 
             start_time = time.perf_counter()
             matching_points = 0
             neg_points = 0
-            # predefine the output data dict
-            # data_for_gridding = {}
-            matched_heights = 0
-            matched_longitudes = 0
-            matched_latitudes = 0
-            match_lon_data = []
-            match_lat_data = []
-
-            for height_idx, grid_height in enumerate(grid_heights_low):
-                diff_height = _data[:,self._ALTITUDEINDEX] - grid_height
-                max_allowed_height_dist = grid_heights_high[height_idx] - grid_height
-                # height_match_indexes = np.squeeze(np.where(diff_height <= max_allowed_height_dist))
-                height_match_indexes = np.where((diff_height <= max_allowed_height_dist) & (diff_height > 0.))[0]
-                matched_heights += height_match_indexes.size
-                if height_match_indexes.size < self.MIN_VAL_NO_FOR_GRIDDING:
-                    continue
-                print('height: {}, matched indexes: {}'.format(grid_height, height_match_indexes.size))
-                # data_temp = _data[height_match_indexes,:]
-                for lat_idx, grid_lat in enumerate(grid_lats):
-                    diff_lat = np.absolute((_data[height_match_indexes,self._LATINDEX] - grid_lat))
-                    lat_match_indexes = np.where(diff_lat <= (grid_dist_lat/2.))[0]
-                    matched_latitudes += lat_match_indexes.size
-                    if lat_verbose_flag:
-                        print('lat: {}, matched indexes: {}'.format(grid_lat, lat_match_indexes.size))
-                    if lat_match_indexes.size < self.MIN_VAL_NO_FOR_GRIDDING:
-                        continue
-                    # simplify code for readability
-                    match_indexes = height_match_indexes[lat_match_indexes]
-                    match_lat_data.extend(_data[match_indexes,self._LATINDEX])
 
-                    for lon_idx, grid_lon in enumerate(grid_lons):
-                        # diff_lon = np.absolute((_data[match_indexes, self._LONINDEX] - grid_lon))
-                        # lon_match_indexes = np.squeeze(np.where(diff_lon <= (grid_dist_lon/2.)))
-                        # lon_match_indexes = np.where(diff_lon <= (grid_dist_lon/2.))[0]
-
-                        lon_match_indexes = np.where((_data[match_indexes, self._LONINDEX] > (grid_lon - grid_dist_lon/2.))
-                                                      & (_data[match_indexes, self._LONINDEX] <= (grid_lon + grid_dist_lon/2.)))[0]
-
-                        matched_longitudes += lon_match_indexes.size
-                        if lon_match_indexes.size < self.MIN_VAL_NO_FOR_GRIDDING:
-                            continue
-                        match_indexes = match_indexes[lon_match_indexes]
-                        # print('lon {}, matched {}'.format(grid_lon, _data[match_indexes, self._LONINDEX]))
-                        match_lon_data.extend(_data[match_indexes, self._LONINDEX])
-
-                        for var in vars:
-                            less_than_zero_indexes = np.where(_data[match_indexes,self.INDEX_DICT[var]] > 0.)[0]
-                            neg_points += (match_indexes.size - less_than_zero_indexes.size)
-                            if less_than_zero_indexes.size < self.MIN_VAL_NO_FOR_GRIDDING:
-                                continue
+            # compute the grid cell of all pixels at once
+            # height levels are defined as grid_heights_low < height <= grid_heights_high
+            heights = _data[:, self._ALTITUDEINDEX]
+            height_idx = np.searchsorted(grid_heights_low[:shape[2]], heights, side='left') - 1
+            height_ok = height_idx >= 0
+            height_ok[height_ok] = heights[height_ok] <= grid_heights_high[height_idx[height_ok]]
+            lat_idx, lon_idx = self._grid_indexes(_data[:, self._LATINDEX], _data[:, self._LONINDEX],
+                                                  gridtype=gridtype)
+            cell_idx = np.where(height_ok & (lat_idx >= 0),
+                                (lat_idx * shape[1] + lon_idx) * shape[2] + height_idx, -1)
+            matched_heights = height_ok.sum()
+            matched_latitudes = (height_ok & (lat_idx >= 0)).sum()
+            matched_longitudes = (cell_idx >= 0).sum()
 
-                            if return_data_for_gridding:
-                                data_for_gridding[var][grid_lat][grid_lon][height_idx] = \
-                                    np.array(_data[self._LONGITUDENAME].data[match_indexes[less_than_zero_indexes]])
-
-                            if less_than_zero_indexes.size == 1:
-                                try:
-                                    gridded_var_data[var]['mean'][lat_idx, lon_idx, height_idx] = \
-                                        _data[match_indexes[less_than_zero_indexes], self.INDEX_DICT[var]]
-                                    gridded_var_data[var]['stddev'][lat_idx, lon_idx, height_idx] = 0.
-                                    gridded_var_data[var]['numobs'][lat_idx, lon_idx, height_idx] = 1.
-                                    matching_points += 1
-                                except ValueError:
-                                    pass
-                            else:
-                                try:
-                                    gridded_var_data[var]['mean'][lat_idx, lon_idx, height_idx] = \
-                                        np.nanmean(_data[match_indexes[less_than_zero_indexes], self.INDEX_DICT[var]])
-                                    gridded_var_data[var]['stddev'][lat_idx, lon_idx, height_idx] = \
-                                        np.nanstd(_data[match_indexes[less_than_zero_indexes], self.INDEX_DICT[var]])
-                                    gridded_var_data[var]['numobs'][lat_idx, lon_idx, height_idx] = \
-                                        _data[match_indexes[less_than_zero_indexes], self.INDEX_DICT[var]].size
-                                    matching_points = matching_points + \
-                                                      _data[match_indexes[less_than_zero_indexes], self.INDEX_DICT[var]].size
-                                except IndexError:
-                                    continue
+            for var in vars:
+                values = _data[:, self.INDEX_DICT[var]]
+                # only positive values are gridded
+                with np.errstate(invalid='ignore'):
+                    positive = values > 0.
+                mean, stddev, val_no, pixel_no = \
+                    self._bin_stats(cell_idx, values, shape[0] * shape[1] * shape[2], valid=positive)
+                neg_points += (pixel_no - val_no).sum()
+                matched = ((pixel_no >= self.MIN_VAL_NO_FOR_GRIDDING) &
+                           (val_no >= max(self.MIN_VAL_NO_FOR_GRIDDING, 1))).reshape(shape)
+                gridded_var_data[var]['mean'][matched] = mean.reshape(shape)[matched]
+                gridded_var_data[var]['stddev'][matched] = stddev.reshape(shape)[matched]
+                gridded_var_data[var]['numobs'][matched] = val_no.reshape(shape)[matched]
+                matching_points = matching_points + val_no.reshape(shape)[matched].sum()
+
+                if return_data_for_gridding:
+                    data_for_gridding[var] = self._bin_data_dict(np.where(positive, cell_idx, -1), values,
+                                                                 (grid_lats, grid_lons, np.arange(shape[2])))
 
             end_time = time.perf_counter()
             elapsed_sec = end_time - start_time
@@ -2791,10 +2748,11 @@ class ReadL2Data(ReadL2DataBase):
                                            self.SUPPORTED_GRIDS[gridtype]['grid_lons'].size,
                                            levelno), np.nan)
                 # organise the data in a nested python dict like dict_data[level][grid_lat][grid_lon]=np.ndarray
-                for grid_lat in self.SUPPORTED_GRIDS[gridtype]['grid_lats']:
-                    grid_data_prot[grid_lat] = {}
-                    for grid_lon in self.SUPPORTED_GRIDS[gridtype]['grid_lons']:
-                        grid_data_prot[grid_lat][grid_lon] = {}
+                if return_gridding_data_struct:
+                    for grid_lat in self.SUPPORTED_GRIDS[gridtype]['grid_lats']:
+                        grid_data_prot[grid_lat] = {}
+                        for grid_lon in self.SUPPORTED_GRIDS[gridtype]['grid_lons']:
+                            grid_data_prot[grid_lat][grid_lon] = {}
 
                 pass
             else:
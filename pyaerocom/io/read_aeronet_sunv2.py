@@ -31,7 +31,6 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
 # MA 02110-1301, USA
 
-import numpy as np
 import pandas as pd
 from collections import OrderedDict as od
 import re
@@ -165,10 +164,6 @@ class ReadAeronetSunV2(ReadAeronetBase):
         data_out = StationData()
         data_out.data_id = self.data_id
 
-        #create empty array for all variables that are supposed to be read
-        for var in vars_to_read:
-            data_out[var] = []
-
         # Iterate over the lines of the file
         self.logger.info("Reading file {}".format(filename))
         with open(filename, 'rt') as in_file:
@@ -193,29 +188,14 @@ class ReadAeronetSunV2(ReadAeronetBase):
             #data_out.data_header =
             in_file.readline().strip()
 
-            for line in in_file:
-                # process line
-                dummy_arr = line.split(self.COL_DELIM)
-
-                day, month, year = dummy_arr[self.col_index['date']].split(':')
-
-                datestring = '-'.join([year, month, day])
-                datestring = 'T'.join([datestring, dummy_arr[self.col_index['time']]])
-                # NOTE JGLISS: parsing timezone offset was removed on 22/2/19
-                # since it is deprecated in recent numpy versions, for details
-                # see https://www.numpy.org/devdocs/reference/arrays.datetime.html#changes-with-numpy-1-11
-                #datestring = '+'.join([datestring, '00:00'])
-
-                data_out['dtime'].append(np.datetime64(datestring))
+            vars_available = {var : self.col_index[var] for var in vars_to_read}
+            # read data table column-wise
+            table = self._read_data_table(in_file, vars_available,
+                                          filename=filename)
 
-                for var in vars_to_read:
-                    val = float(dummy_arr[self.col_index[var]])
-                    if val == self.NAN_VAL:
-                        val = np.nan
-                    data_out[var].append(val)
-        data_out['dtime'] = np.asarray(data_out['dtime'])
+        data_out['dtime'] = table['dtime']
         for var in vars_to_read:
-            data_out[var] = np.asarray(data_out[var])
+            data_out[var] = table[var]
 
         data_out = self.compute_additional_vars(data_out, vars_to_compute)
 
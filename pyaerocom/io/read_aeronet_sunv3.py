@@ -155,9 +155,6 @@ class ReadAeronetSunV3(ReadAeronetBase):
         #create empty data object (is dictionary with extended functionality)
         data_out = StationData()
         data_out.data_id = self.data_id
-        # create empty arrays for meta information
-        for item in self.META_NAMES_FILE:
-            data_out[item] = []
 
         # Iterate over the lines of the file
         self.logger.info("Reading file {}".format(filename))
@@ -187,15 +184,10 @@ class ReadAeronetSunV3(ReadAeronetBase):
                                        use_all_possible=read_all_possible)
             col_index = self.col_index
 
-            # create empty arrays for all variables that are supposed to be read
-            # from file
-            for var in vars_to_read:
-                data_out[var] = []
             # dependent on the station, some of the required input variables
             # may not be provided in the data file. These will be ignored
-            # in the following list that iterates over all data rows and will
-            # be filled below, with vectors containing NaNs after the file
-            # reading loop
+            # when reading the data table and will be filled below, with
+            # vectors containing NaNs
             vars_available = {}
             for var in vars_to_read:
                 if var in col_index:
@@ -203,59 +195,19 @@ class ReadAeronetSunV3(ReadAeronetBase):
                 else:
                     self.logger.warning("Variable {} not available in file {}"
                                         .format(var, os.path.basename(filename)))
-            pl = None
-            for i, line in enumerate(in_file):
-                # process line
-                dummy_arr = line.split(self.COL_DELIM)
-
-                if pl is not None and len(dummy_arr) != len(pl):
-                    const.print_log.exception('Data line {} in {} is corrupt, '
-                                              'skipping...'.format(i, filename))
-                    continue
-                # copy the meta data (array of type string)
-                for var in self.META_NAMES_FILE:
-                    try:
-                        val = dummy_arr[col_index[var]]
-                    except IndexError as e:
-                        const.print_log.exception(repr(e))
-
-                    try:
-                        # e.g. lon, lat, altitude
-                        val = float(val)
-                    except Exception:
-                        pass
-                    data_out[var].append(val)
-
-                # This uses the numpy datestring64 functions that e.g. also
-                # support Months as a time step for timedelta
-                # Build a proper ISO 8601 UTC date string
-                day, month, year = dummy_arr[col_index['date']].split(':')
-                datestring = '-'.join([year, month, day])
-                datestring = 'T'.join([datestring, dummy_arr[col_index['time']]])
-                # NOTE JGLISS: parsing timezone offset was removed on 22/2/19
-                # since it is deprecated in recent numpy versions, for details
-                # see https://www.numpy.org/devdocs/reference/arrays.datetime.html#changes-with-numpy-1-11
-                # datestring = '+'.join([datestring, '00:00'])
-
-                data_out['dtime'].append(np.datetime64(datestring))
-
-                # TODO: remove elif if ensured that it works
-                for var, idx in vars_available.items():
-                    val = np.float_(dummy_arr[idx])
-                    if val == self.NAN_VAL:
-                        val = np.nan
-                    data_out[var].append(val)
-
-                pl = dummy_arr
-        # convert all lists to numpy arrays
-        data_out['dtime'] = np.asarray(data_out['dtime'])
+            # read data table column-wise
+            table = self._read_data_table(in_file, vars_available,
+                                          meta_names=list(self.META_NAMES_FILE),
+                                          filename=filename)
+
+        data_out['dtime'] = table['dtime']
 
         for item in self.META_NAMES_FILE:
-            data_out[item] = np.asarray(data_out[item])
+            data_out[item] = table[item]
 
         for var in vars_to_read:
             if var in vars_available:
-                array = np.asarray(data_out[var])
+                array = table[var]
             else:
                 array = np.zeros(len(data_out['dtime'])) * np.nan
             data_out[var] = array
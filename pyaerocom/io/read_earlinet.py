@@ -39,7 +39,7 @@ from pyaerocom.io.readungriddedbase import ReadUngriddedBase
 from pyaerocom.stationdata import StationData
 from pyaerocom.vertical_profile import VerticalProfile
 from pyaerocom.variable import Variable
-from pyaerocom.ungriddeddata import UngriddedData
+from pyaerocom.ungriddeddata import UngriddedData, _index_compress
 
 # TODO: Check station names -> they are NOT UNIQUE (e.g. Potenza...) -> maybe
 # use station_id instead... would require more flexible iterator in
@@ -580,6 +580,11 @@ class ReadEarlinet(ReadUngriddedBase):
         # shorten data_obj._data to the right number of points
         data_obj._data = data_obj._data[:idx]
 
+        # store contiguous row index ranges as slices
+        for meta_key, var_indices in meta_idx.items():
+            for var, indices in var_indices.items():
+                var_indices[var] = _index_compress(indices)
+
         self.data = data_obj
         return data_obj
 
@@ -1153,7 +1153,8 @@ class ReadEbas(ReadUngriddedBase):
         return self._loaded_aerocom_vars[var_name]
 
     def read(self, vars_to_retrieve=None, first_file=None,
-             last_file=None, multiproc=False, files=None, **constraints):
+             last_file=None, multiproc=False, num_proc=None, files=None,
+             **constraints):
         """Method that reads list of files as instance of :class:`UngriddedData`
 
         Parameters
@@ -1167,6 +1168,16 @@ class ReadEbas(ReadUngriddedBase):
         last_file : :obj:`int`, optional
             index of last file in list to read. If None, the very last file
             in the list is used
+        multiproc : bool
+            if True, the files are read in parallel using a pool of processes
+            (cf. :func:`_read_files_multiproc`)
+        num_proc : int, optional
+            number of processes used if `multiproc` is True. If None, the
+            number of available CPUs is used.
+        files : :obj:`list`, optional
+            list of files to be read. If None, the file list is retrieved
+            from the EBAS SQLite database based on input variables and
+            constraints
         **constraints
             further reading constraints deviating from default (default
             info for each AEROCOM variable can be found in `ebas_config.ini <
@@ -1225,12 +1236,64 @@ class ReadEbas(ReadUngriddedBase):
             data = self._read_files(files, vars_to_retrieve,
                                     files_contain, constraints)
         else:
-            raise NotImplementedError('Coming soon...')
-        data.clear_meta_no_data()
+            data = self._read_files_multiproc(files, vars_to_retrieve,
+                                              files_contain, constraints,
+                                              num_proc)
+        if self.merge_meta:
+            data = data.merge_common_meta(ignore_keys=['filename', 'PI'])
 
+        data.clear_meta_no_data()
+        self.data = data
         return data
 
-    def _read_files(self, files, vars_to_retrieve, files_contain, constraints):
+    def _read_files_multiproc(self, files, vars_to_retrieve, files_contain,
+                              constraints, num_proc=None):
+        """Helper that reads list of files in parallel into UngriddedData
+
+        The input file list is split into contiguous chunks (preserving the
+        order of the files), each of which is read into a separate
+        :class:`UngriddedData` object in a worker process (using
+        :func:`_read_files`). The results are then concatenated in order
+        (cf. :func:`UngriddedData.concatenate`), which takes care of
+        renumbering metadata and variable indices.
+
+        Note
+        ----
+        This method is not supposed to be called directly but is used in
+        :func:`read`
+        """
+        import multiprocessing
+        if num_proc is None:
+            num_proc = multiprocessing.cpu_count()
+        num_files = len(files)
+        # use a few more chunks than processes for better load balancing
+        num_chunks = min(num_files, num_proc * 4)
+        if num_proc < 2 or num_chunks < 2:
+            return self._read_files(files, vars_to_retrieve, files_contain,
+                                    constraints)
+
+        args = []
+        for chunk in np.array_split(np.arange(num_files), num_chunks):
+            if len(chunk) == 0:
+                continue
+            start, stop = chunk[0], chunk[-1] + 1
+            args.append((self.data_id, self._dataset_path, self._file_dir,
+                         dict(self.opts), files[start:stop], vars_to_retrieve,
+                         files_contain[start:stop], constraints))
+
+        const.print_log.info('Reading EBAS data ({} files) using {} processes'
+                             .format(num_files, num_proc))
+        with multiprocessing.Pool(processes=num_proc) as pool:
+            results = pool.starmap(_read_files_chunk, args)
+
+        chunks = []
+        for data_chunk, files_failed in results:
+            self.files_failed.extend(files_failed)
+            chunks.append(data_chunk)
+        return UngriddedData.concatenate(chunks)
+
+    def _read_files(self, files, vars_to_retrieve, files_contain, constraints,
+                    show_progress=True):
         """Helper that reads list of files into UngriddedData
 
         Note
@@ -1263,7 +1326,7 @@ class ReadEbas(ReadUngriddedBase):
         # (is used for attr. var_idx in UngriddedData object)
         var_count_glob = -1
         const.print_log.info('Reading EBAS data')
-        for i in tqdm(range(len(files))):
+        for i in tqdm(range(len(files)), disable=not show_progress):
             _file = files[i]
             contains = files_contain[i]
 # =============================================================================
@@ -1366,7 +1429,7 @@ class ReadEbas(ReadUngriddedBase):
                 var_info = station_data['var_info'][var]
                 metadata[meta_key]['var_info'][var] = od()
                 metadata[meta_key]['var_info'][var].update(var_info)
-                meta_idx[meta_key][var] = np.arange(start, stop)
+                meta_idx[meta_key][var] = slice(start, stop)
 
             metadata[meta_key]['variables'] = append_vars
             idx += totnum
@@ -1374,14 +1437,31 @@ class ReadEbas(ReadUngriddedBase):
 
         # shorten data_obj._data to the right number of points
         data_obj._data = data_obj._data[:idx]
-        if self.merge_meta:
-            data_obj = data_obj.merge_common_meta(ignore_keys=['filename',
-                                                               'PI'])
-
-        self.data = data_obj
 
         return data_obj
 
+def _read_files_chunk(data_id, dataset_path, file_dir, opts, files,
+                      vars_to_retrieve, files_contain, constraints):
+    """Read chunk of EBAS files in worker process
+
+    Used in :func:`ReadEbas._read_files_multiproc`. A new reader instance is
+    created from the input settings, which avoids sending the (possibly
+    large) data attributes of the parent reader to the worker.
+
+    Returns
+    -------
+    tuple
+        2-element tuple containing :class:`UngriddedData` object with data
+        from input files and list of files that could not be read
+    """
+    reader = ReadEbas(data_id)
+    reader._dataset_path = dataset_path
+    reader._file_dir = file_dir
+    reader.opts.update(opts)
+    data = reader._read_files(files, vars_to_retrieve, files_contain,
+                              constraints, show_progress=False)
+    return (data, reader.files_failed)
+
 if __name__=="__main__":
 
     r = ReadEbas()
@@ -370,7 +370,7 @@ class ReadGAW(ReadUngriddedBase):
                                ] = values
                 data_obj._data[start:stop, data_obj._VARINDEX
                                ] = var_idx
-                meta_idx[meta_key][var] = np.arange(start, stop)
+                meta_idx[meta_key][var] = slice(start, stop)
 
                 if not var in data_obj.var_idx:
                     data_obj.var_idx[var] = var_idx
@@ -624,7 +624,7 @@ class ReadGhost(ReadUngriddedBase):
 
                     data_obj._data[start:stop, data_obj._VARINDEX] = var_idx
 
-                    meta_idx[meta_key][var_to_write] = np.arange(start, stop)
+                    meta_idx[meta_key][var_to_write] = slice(start, stop)
 
                 idx += totnum
 
@@ -844,6 +844,7 @@ class ReadL2Data(ReadL2DataBase):
 
         import xarray as xr
         import numpy as np
+        import time
 
         if isinstance(data,dict):
             _data = self.to_xarray(data_to_write=data)
@@ -861,48 +862,31 @@ class ReadL2Data(ReadL2DataBase):
 
             grid_lats = self.SUPPORTED_GRIDS[gridtype]['grid_lats']
             grid_lons = self.SUPPORTED_GRIDS[gridtype]['grid_lons']
-            grid_dist_lat = self.SUPPORTED_GRIDS[gridtype]['grid_dist_lat']
-            grid_dist_lon = self.SUPPORTED_GRIDS[gridtype]['grid_dist_lon']
+            shape = (grid_lats.size, grid_lons.size)
 
             start_time = time.perf_counter()
             matching_points = 0
-            # predefine the output data dict
-            # data_for_gridding = {}
-
-            # Loop through the output grid and collect data
-            # store that in data_for_gridding[var]
-            for lat_idx, grid_lat in enumerate(grid_lats):
-                diff_lat = np.absolute((_data[self._LATITUDENAME].data - grid_lat))
-                lat_match_indexes = np.squeeze(np.where(diff_lat <= (grid_dist_lat/2.)))
-                print('lat: {}, matched indexes: {}'.format(grid_lat, lat_match_indexes.size))
-                if lat_match_indexes.size == 0:
-                    continue
-
-                for lon_idx, grid_lon in enumerate(grid_lons):
-                    diff_lon = np.absolute((_data[self._LONGITUDENAME].data[lat_match_indexes] - grid_lon))
-                    lon_match_indexes = np.squeeze(np.where(diff_lon <= (grid_dist_lon/2.)))
-                    if lon_match_indexes.size == 0:
-                        continue
 
-                    for var in vars:
-                        if return_data_for_gridding:
-                            data_for_gridding[var][grid_lat][grid_lon] = \
-                                np.array(_data[self._LONGITUDENAME].data[lat_match_indexes[lon_match_indexes]])
-                            # np.array(data[lat_match_indexes[lon_match_indexes], self.INDEX_DICT[var]])
-
-                        less_than_zero_indexes = np.where(_data[var].data[lat_match_indexes[lon_match_indexes]] > 0.)
-
-                        try:
-                            gridded_var_data[var]['mean'][lat_idx, lon_idx] = \
-                                np.nanmean(_data[var].data[lat_match_indexes[lon_match_indexes[less_than_zero_indexes]]])
-                            gridded_var_data[var]['stddev'][lat_idx, lon_idx] = \
-                                np.nanstd(_data[var].data[lat_match_indexes[lon_match_indexes[less_than_zero_indexes]]])
-                            gridded_var_data[var]['numobs'][lat_idx, lon_idx] = \
-                                _data[var].data[lat_match_indexes[lon_match_indexes]].size
-                            matching_points = matching_points + \
-                                              _data[var].data[lat_match_indexes[lon_match_indexes[less_than_zero_indexes]]].size
-                        except IndexError:
-                            continue
+            # compute the grid cell of all pixels at once
+            lat_idx, lon_idx = self._grid_indexes(_data[self._LATITUDENAME].data,
+                                                  _data[self._LONGITUDENAME].data,
+                                                  gridtype=gridtype)
+            cell_idx = np.where(lat_idx >= 0, lat_idx * shape[1] + lon_idx, -1)
+
+            for var in vars:
+                values = _data[var].data
+                # only positive values are used for mean and stddev
+                with np.errstate(invalid='ignore'):
+                    positive = values > 0.
+                mean, stddev, val_no, pixel_no = \
+                    self._bin_stats(cell_idx, values, shape[0] * shape[1], valid=positive)
+                matched = (pixel_no > 0).reshape(shape)
+                gridded_var_data[var]['mean'][matched] = mean.reshape(shape)[matched]
+                gridded_var_data[var]['stddev'][matched] = stddev.reshape(shape)[matched]
+                gridded_var_data[var]['numobs'][matched] = pixel_no.reshape(shape)[matched]
+                matching_points = matching_points + val_no.sum()
+                if return_data_for_gridding:
+                    data_for_gridding[var] = self._bin_data_dict(cell_idx, values, (grid_lats, grid_lons))
 
             end_time = time.perf_counter()
             elapsed_sec = end_time - start_time
@@ -2,7 +2,10 @@
 # -*- coding: utf-8 -*-
 from collections import OrderedDict as od
 from datetime import datetime
+import csv
+import io
 import numpy as np
+import pandas as pd
 from tqdm import tqdm
 
 from pyaerocom.time_config import TS_TYPES
@@ -19,7 +22,7 @@ class ReadAeronetBase(ReadUngriddedBase):
     Extended abstract base class, derived from low-level base class
     :class:`ReadUngriddedBase` that contains some more functionality.
     """
-    __baseversion__ = '0.12_' + ReadUngriddedBase.__baseversion__
+    __baseversion__ = '0.13_' + ReadUngriddedBase.__baseversion__
 
     #: column delimiter in data block of files
     COL_DELIM = ','
@@ -323,6 +326,96 @@ class ReadAeronetBase(ReadUngriddedBase):
         for col in self._last_col_order:
             print(col)
 
+    def _read_data_table(self, in_file, vars_available, meta_names=None,
+                         filename=None):
+        """Read data table of Aeronet file column-wise
+
+        Reads all remaining lines of the input file handle at once and
+        extracts the required columns (cf. :attr:`col_index`) as numpy arrays,
+        which is much faster than looping over the individual lines.
+
+        Data lines that contain a different number of columns than the first
+        data line are considered corrupt and are skipped.
+
+        Parameters
+        ----------
+        in_file
+            file handle, positioned at the first line of the data table
+        vars_available : dict
+            variable names (keys) and corresponding column indices (values)
+            of variables to be read
+        meta_names : list, optional
+            metadata keys (cf. :attr:`META_NAMES_FILE`) to be read. Values
+            are converted into floating point numbers, if possible.
+        filename : str, optional
+            name of file (only used for logging)
+
+        Returns
+        -------
+        dict
+            dictionary containing numpy arrays of timestamps (key `dtime`),
+            all input metadata keys and variables, in the latter of which
+            the values matching :attr:`NAN_VAL` are replaced by NaN.
+        """
+        if meta_names is None:
+            meta_names = []
+        col_index = self.col_index
+
+        cols = od(date=col_index['date'], time=col_index['time'])
+        for key in meta_names:
+            cols[key] = col_index[key]
+        cols.update(vars_available)
+
+        lines = [line for line in in_file.read().splitlines() if line.strip()]
+        if len(lines) > 0:
+            delim_nums = np.fromiter((line.count(self.COL_DELIM) for line in lines),
+                                     dtype=int, count=len(lines))
+            corrupt = delim_nums != delim_nums[0]
+            if corrupt.any():
+                const.print_log.warning('{} data lines in {} are corrupt, '
+                                        'skipping...'
+                                        .format(corrupt.sum(), filename))
+                lines = [line for line, c in zip(lines, corrupt) if not c]
+
+            # variable columns are parsed as floats directly, all other
+            # columns (date, time, metadata) as strings
+            str_cols = [idx for key, idx in cols.items()
+                        if not key in vars_available]
+            dtypes = {idx : np.float64 for idx in cols.values()}
+            dtypes.update({idx : str for idx in str_cols})
+            table = pd.read_csv(io.StringIO('\n'.join(lines)),
+                                sep=self.COL_DELIM,
+                                header=None,
+                                usecols=sorted(set(cols.values())),
+                                dtype=dtypes,
+                                na_filter=False,
+                                quoting=csv.QUOTE_NONE)
+            cols_out = {key : table[idx].values for key, idx in cols.items()}
+        else:
+            cols_out = {key : np.asarray([], dtype=str) for key in cols}
+
+        out = {}
+        datestrings = np.char.add(np.char.add(cols_out['date'].astype(str),
+                                              ' '),
+                                  cols_out['time'].astype(str))
+        out['dtime'] = pd.to_datetime(datestrings,
+                                      format='%d:%m:%Y %H:%M:%S'
+                                      ).values.astype('datetime64[s]')
+        for key in meta_names:
+            vals = np.asarray(cols_out[key], dtype=str)
+            try:
+                # e.g. lon, lat, altitude
+                vals = vals.astype(np.float64)
+            except ValueError:
+                pass
+            out[key] = vals
+
+        for var in vars_available:
+            vals = np.array(cols_out[var], dtype=np.float64)
+            vals[vals == self.NAN_VAL] = np.nan
+            out[var] = vals
+        return out
+
     def read(self, vars_to_retrieve=None, files=None, first_file=None,
              last_file=None, file_pattern=None, common_meta=None):
         """Method that reads list of files as instance of :class:`UngriddedData`
@@ -452,7 +545,7 @@ class ReadAeronetBase(ReadUngriddedBase):
                 data_obj._data[start:stop, data_obj._DATAINDEX] = values
                 data_obj._data[start:stop, data_obj._VARINDEX] = var_idx
 
-                meta_idx[meta_key][var] = np.arange(start, stop)
+                meta_idx[meta_key][var] = slice(start, stop)
 
                 if var in station_data['var_info']:
                     if 'units' in station_data['var_info'][var]:
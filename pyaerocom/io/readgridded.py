@@ -1892,6 +1892,8 @@ class ReadGridded(object):
                            concatenated=is_concat,
                            **meta)
         data.reader = self
+        if data.lazy_mode:
+            data.rechunk_time()
         # crop cube in time (if applicable)
         if not start == 9999:
             try:
@@ -475,6 +475,158 @@ class ReadL2DataBase(ReadUngriddedBase):
 
     ###################################################################################
 
+    def read_chunks(self, vars_to_retrieve=None, files=None, first_file=None,
+                    last_file=None, file_pattern=None, local_temp_dir=None,
+                    apply_quality_flag=0.0, bbox=None, start=None, stop=None):
+        """Generator that reads files one by one and yields the filtered data of each file
+
+        In contrast to :func:`read`, the data of all files is never held in memory at the
+        same time. Quality, bounding box and time filters are applied to the data of each
+        file (cf. :func:`_filter_chunk`) and archive files are extracted one at a time. The
+        chunks can e.g. be gridded incrementally using :func:`to_grid_chunks`. Files that
+        cannot be read are skipped and listed in :attr:`read_failed`.
+
+        Parameters
+        ----------
+        vars_to_retrieve : :obj:`list` or similar, optional,
+            list containing variable IDs that are supposed to be read. If None,
+            all variables in :attr:`DEFAULT_VARS` are loaded
+        files : :obj:`list`, optional
+            list of files to be read. If None, then the file list is used that
+            is returned on :func:`get_file_list`.
+        first_file : :obj:`int`, optional
+            index of first file in file list to read
+        last_file : :obj:`int`, optional
+            index of last file in list to read
+        file_pattern : str, optional
+            string pattern for file search (cf :func:`get_file_list`)
+        local_temp_dir : str, optional
+            directory archive files are extracted to
+        apply_quality_flag : float
+            minimum quality value of the points to be kept (0: no quality filtering)
+        bbox : list, optional
+            bounding box [lat_min, lat_max, lon_min, lon_max] of the points to be kept
+        start : :obj:`str` or :obj:`datetime64` or similar, optional
+            start time of the points to be kept
+        stop : :obj:`str` or :obj:`datetime64` or similar, optional
+            stop time of the points to be kept
+
+        Yields
+        ------
+        ndarray
+            2d numpy array containing the filtered data of one file
+        """
+
+        import pathlib
+        import tarfile
+        import os
+
+        if local_temp_dir is None:
+            local_temp_dir = self.LOCAL_TMP_DIR
+
+        if vars_to_retrieve is None:
+            vars_to_retrieve = self.DEFAULT_VARS
+        elif isinstance(vars_to_retrieve, str):
+            vars_to_retrieve = [vars_to_retrieve]
+
+        if files is None:
+            if len(self.files) == 0:
+                self.get_file_list(pattern=file_pattern)
+            files = self.files
+
+        if file_pattern is None:
+            if first_file is None:
+                first_file = 0
+            if last_file is None:
+                last_file = len(files)
+
+            files = files[first_file:last_file]
+
+        self.read_failed = []
+
+        for _file in sorted(files):
+            self.logger.info('file: {}'.format(_file))
+            if pathlib.Path(_file).suffix in self.SUPPORTED_ARCHIVE_SUFFIXES:
+                # extract the supported files of the archive one by one
+                try:
+                    tarhandle = tarfile.open(_file)
+                except Exception as e:
+                    self.read_failed.append(_file)
+                    self.logger.exception('Failed to open archive {}. Reason: {}'.format(_file, repr(e)))
+                    continue
+                with tarhandle:
+                    for file_in_tar in sorted(tarhandle.getnames()):
+                        if not pathlib.Path(file_in_tar).suffix in self.SUPPORTED_SUFFIXES:
+                            continue
+                        member = tarhandle.getmember(file_in_tar)
+                        extract_file = os.path.join(local_temp_dir, member.name)
+                        try:
+                            self.logger.info('extracting file {}...'.format(member.name))
+                            tarhandle.extract(member, path=local_temp_dir, set_attrs=False)
+                            file_data = self.read_file(extract_file, vars_to_retrieve=vars_to_retrieve,
+                                                       loglevel=logging.INFO, return_as='numpy')
+                        except Exception as e:
+                            self.read_failed.append('{}/{}'.format(_file, member.name))
+                            self.logger.exception('Failed to read file {} of archive {}. Reason: {}'
+                                                  .format(member.name, _file, repr(e)))
+                            continue
+                        finally:
+                            if os.path.exists(extract_file):
+                                os.remove(extract_file)
+                        yield self._filter_chunk(file_data, apply_quality_flag=apply_quality_flag,
+                                                 bbox=bbox, start=start, stop=stop)
+            else:
+                try:
+                    file_data = self.read_file(_file, vars_to_retrieve=vars_to_retrieve,
+                                               loglevel=logging.INFO, return_as='numpy')
+                except Exception as e:
+                    self.read_failed.append(_file)
+                    self.logger.exception('Failed to read file {}. Reason: {}'.format(_file, repr(e)))
+                    continue
+                yield self._filter_chunk(file_data, apply_quality_flag=apply_quality_flag,
+                                         bbox=bbox, start=start, stop=stop)
+
+    def _filter_chunk(self, data, apply_quality_flag=0.0, bbox=None, start=None, stop=None):
+        """apply quality, bounding box and time filters to 2d numpy array of L2 data
+
+        Parameters
+        ----------
+        data : ndarray
+            2d numpy array as returned by :func:`read_file` (return_as='numpy')
+        apply_quality_flag : float
+            minimum quality value of the points to be kept (0: no quality filtering).
+            Ignored if the data does not contain quality values.
+        bbox : list, optional
+            bounding box [lat_min, lat_max, lon_min, lon_max] of the points to be kept
+        start : :obj:`str` or :obj:`datetime64` or similar, optional
+            start time of the points to be kept
+        stop : :obj:`str` or :obj:`datetime64` or similar, optional
+            stop time of the points to be kept
+
+        Returns
+        -------
+        ndarray
+            filtered data
+        """
+        keep = np.ones(data.shape[0], dtype=bool)
+        with np.errstate(invalid='ignore'):
+            if apply_quality_flag > 0. and self._QANAME in self.INDEX_DICT:
+                keep &= data[:, self.INDEX_DICT[self._QANAME]] >= apply_quality_flag
+            if bbox is not None:
+                lat_min, lat_max, lon_min, lon_max = bbox
+                lats = data[:, self._LATINDEX]
+                lons = data[:, self._LONINDEX]
+                keep &= (lats >= lat_min) & (lats <= lat_max) & (lons >= lon_min) & (lons <= lon_max)
+            # the time is stored as milliseconds since 1970-01-01
+            if start is not None:
+                keep &= data[:, self._TIMEINDEX] >= np.datetime64(start, 'ms').astype(float)
+            if stop is not None:
+                keep &= data[:, self._TIMEINDEX] <= np.datetime64(stop, 'ms').astype(float)
+        self.logger.info('{} of {} points kept after filtering'.format(keep.sum(), data.shape[0]))
+        return data[keep]
+
+    ###################################################################################
+
     def to_netcdf_simple(self, netcdf_filename='/home/jang/tmp/to_netcdf_simple.nc',
                          global_attributes=None, vars_to_write=None,
                          data_to_write=None, gridded=False):
@@ -623,119 +775,267 @@ class ReadL2DataBase(ReadUngriddedBase):
         self.logger.info(temp)
 
     ###################################################################################
+    def _grid_indexes(self, lats, lons, gridtype='1x1'):
+        """compute the indexes of the grid cells the pixels belong to
+
+        Each pixel is assigned to the grid cell of grid `gridtype` (cf. :attr:`SUPPORTED_GRIDS`)
+        that contains its middle point. Longitudes are wrapped to the range [-180, 180).
+
+        Parameters
+        ----------
+        lats : ndarray
+            latitudes of the pixels
+        lons : ndarray
+            longitudes of the pixels
+        gridtype : str
+            name of supported grid
+
+        Returns
+        -------
+        tuple
+            latitude and longitude indexes (int arrays); -1 for pixels outside the grid
+            or with invalid coordinates
+        """
+        grid = self.SUPPORTED_GRIDS[gridtype]
+        lat_no = grid['grid_lats'].size
+        lon_no = grid['grid_lons'].size
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        with np.errstate(invalid='ignore'):
+            lat_idx = np.floor((lats - self.MIN_LAT) / grid['grid_dist_lat'])
+            # pixels at the north pole belong to the northernmost cell
+            lat_idx[lats == self.MAX_LAT] = lat_no - 1
+            lon_idx = np.floor(np.mod(lons - self.MIN_LON, 360.) / grid['grid_dist_lon'])
+            lon_idx = np.clip(lon_idx, 0, lon_no - 1)
+            valid = (lat_idx >= 0) & (lat_idx < lat_no) & np.isfinite(lon_idx)
+        lat_idx = np.where(valid, lat_idx, -1).astype(int)
+        lon_idx = np.where(valid, lon_idx, -1).astype(int)
+        return lat_idx, lon_idx
+
+    @staticmethod
+    def _bin_stats(cell_idx, values, cell_no, valid=None):
+        """compute mean, standard deviation and number of values per grid cell
+
+        Uses binned reductions (np.bincount) over all pixels at once
+
+        Parameters
+        ----------
+        cell_idx : ndarray
+            flat index of the grid cell of each pixel (-1: pixel is ignored)
+        values : ndarray
+            values of the pixels
+        cell_no : int
+            number of grid cells
+        valid : ndarray, optional
+            boolean mask of the values to be used for mean and standard deviation
+            (in addition to not being NaN)
+
+        Returns
+        -------
+        tuple
+            mean, standard deviation (NaN for cells without valid values), number of
+            valid values and number of pixels per grid cell
+        """
+        in_grid = cell_idx >= 0
+        pixel_no = np.bincount(cell_idx[in_grid], minlength=cell_no)
+        use = in_grid & ~np.isnan(values)
+        if valid is not None:
+            use &= valid
+        idx = cell_idx[use]
+        vals = values[use].astype(float)
+        val_no = np.bincount(idx, minlength=cell_no)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.bincount(idx, weights=vals, minlength=cell_no) / val_no
+            var = np.bincount(idx, weights=(vals - mean[idx]) ** 2, minlength=cell_no) / val_no
+        return mean, np.sqrt(var), val_no, pixel_no
+
+    @staticmethod
+    def _bin_data_dict(cell_idx, values, coords):
+        """organise the pixel values in a nested python dict like dict_data[grid_lat][grid_lon]=np.ndarray
+
+        Parameters
+        ----------
+        cell_idx : ndarray
+            flat index of the grid cell of each pixel (-1: pixel is ignored)
+        values : ndarray
+            values of the pixels
+        coords : list
+            list of arrays of coordinate values of the grid dimensions (used as keys)
+
+        Returns
+        -------
+        dict
+            nested dictionary containing the pixel values of all grid cells that contain pixels
+        """
+        shape = tuple(len(c) for c in coords)
+        order = np.argsort(cell_idx, kind='stable')
+        sorted_idx = cell_idx[order]
+        cells, first = np.unique(sorted_idx, return_index=True)
+        groups = np.split(np.asarray(values)[order], first[1:])
+        ret_data = {}
+        for cell, group in zip(cells, groups):
+            if cell < 0:
+                continue
+            sub = ret_data
+            dim_idx = np.unravel_index(cell, shape)
+            for dim, idx in enumerate(dim_idx[:-1]):
+                sub = sub.setdefault(coords[dim][idx], {})
+            sub[coords[-1][dim_idx[-1]]] = group
+        return ret_data
+
     def to_grid(self, data=None, vars=None, gridtype='1x1', engine='python', return_data_for_gridding=False):
         """simple gridding algorithm that only takes the pixel middle points into account
 
-        All the data points in data are considered!
+        All the data points in data are considered! Each pixel is assigned to the grid cell
+        containing its middle point and mean, standard deviation and number of pixels are
+        computed for all grid cells at once using binned reductions.
 
+        Parameters
+        ----------
+        data : UngriddedData, optional
+            data to be gridded; if None, self.data is used
+        vars : list or str
+            variables to be gridded
+        gridtype : str
+            name of supported grid (cf. :attr:`SUPPORTED_GRIDS`)
+        engine : str
+            gridding engine (only python is supported at this point)
+        return_data_for_gridding : bool
+            if True, also return the pixel values of every grid cell as nested
+            dict like data_for_gridding[var][grid_lat][grid_lon]=np.ndarray
+
+        Returns
+        -------
+        dict or tuple
+            gridded data and optionally the data used for gridding
         """
-        import numpy as np
         import time
 
-        _vars = vars.copy()
-        if isinstance(_vars, str):
-            _vars = [_vars]
+        if isinstance(vars, str):
+            _vars = [vars]
+        else:
+            _vars = list(vars)
 
         if data is None:
             data = self.data
         else:
             data = data._data
-        # vars_to_retrieve = self.DEFAULT_VARS
+
+        if gridtype not in self.SUPPORTED_GRIDS:
+            temp = 'Error: Unknown grid: {}'.format(gridtype)
+            self.logger.error(temp)
+            return
 
         if engine == 'python':
             start_time = time.perf_counter()
-            grid_data_prot = {}
-            # define ouput grid
-            if gridtype == '1x1':
-                # global 1x1 degree grid
-                # pass
-                temp = 'starting simple gridding for 1x1 degree grid...'
-                self.logger.info(temp)
-                max_grid_dist_lon = 1.
-                max_grid_dist_lat = 1.
-                grid_lats = np.arange(-89.5, 90.5, max_grid_dist_lat)
-                grid_lons = np.arange(-179.5, 180.5, max_grid_dist_lon)
-
-                grid_array_prot = np.full((grid_lats.size, grid_lons.size), np.nan)
-                # organise the data in a nested python dict like dict_data[grid_lat][grid_lon]=np.ndarray
-                for grid_lat in grid_lats:
-                    grid_data_prot[grid_lat] = {}
-                    for grid_lon in grid_lons:
-                        grid_data_prot[grid_lat] = {}
-
-                end_time = time.perf_counter()
-                elapsed_sec = end_time - start_time
-                temp = 'time for global 1x1 gridding with python data types [s] init: {:.3f}'.format(elapsed_sec)
-                self.logger.info(temp)
+            data_for_gridding, gridded_var_data = \
+                self._to_grid_grid_init(gridtype=gridtype, vars=_vars,
+                                        init_time=np.mean(data[:, self._TIMEINDEX]).astype('datetime64[ms]'))
+            grid_lats = self.SUPPORTED_GRIDS[gridtype]['grid_lats']
+            grid_lons = self.SUPPORTED_GRIDS[gridtype]['grid_lons']
+            shape = (grid_lats.size, grid_lons.size)
+
+            lat_idx, lon_idx = self._grid_indexes(data[:, self._LATINDEX], data[:, self._LONINDEX],
+                                                  gridtype=gridtype)
+            cell_idx = np.where(lat_idx >= 0, lat_idx * shape[1] + lon_idx, -1)
+
+            for var in _vars:
+                values = data[:, self.INDEX_DICT[var]]
+                mean, stddev, _, pixel_no = self._bin_stats(cell_idx, values, shape[0] * shape[1])
+                matched = pixel_no > 0
+                gridded_var_data[var]['mean'][matched.reshape(shape)] = mean[matched]
+                gridded_var_data[var]['stddev'][matched.reshape(shape)] = stddev[matched]
+                gridded_var_data[var]['numobs'][matched.reshape(shape)] = pixel_no[matched]
+                if return_data_for_gridding:
+                    data_for_gridding[var] = self._bin_data_dict(cell_idx, values, (grid_lats, grid_lons))
 
-                # predefine the output data dict
-                data_for_gridding = {}
-                gridded_var_data = {}
-                for var in vars:
-                    data_for_gridding[var] = grid_data_prot.copy()
-                    gridded_var_data['latitude'] = grid_lats
-                    gridded_var_data['longitude'] = grid_lons
-                    gridded_var_data['time'] = np.mean(data[:, self._TIMEINDEX]).astype('datetime64[ms]')
-
-                    gridded_var_data[var] = {}
-                    gridded_var_data[var]['mean'] = grid_array_prot.copy()
-                    gridded_var_data[var]['stddev'] = grid_array_prot.copy()
-                    gridded_var_data[var]['numobs'] = grid_array_prot.copy()
-
-                # Loop through the output grid and collect data
-                # store that in data_for_gridding[var]
-                for lat_idx, grid_lat in enumerate(grid_lats):
-                    diff_lat = np.absolute((data[:, self._LATINDEX] - grid_lat))
-                    lat_match_indexes = np.squeeze(np.where(diff_lat <= max_grid_dist_lat))
-                    if lat_match_indexes.size == 0:
-                        continue
-
-                    for lon_idx, grid_lon in enumerate(grid_lons):
-                        diff_lon = np.absolute((data[lat_match_indexes, self._LONINDEX] - grid_lon))
-                        lon_match_indexes = np.squeeze(np.where(diff_lon <= max_grid_dist_lon))
-                        if lon_match_indexes.size == 0:
-                            continue
+            end_time = time.perf_counter()
+            elapsed_sec = end_time - start_time
+            temp = 'time for global {} gridding with python data types [s]: {:.3f}'.format(gridtype, elapsed_sec)
+            self.logger.info(temp)
+            if return_data_for_gridding:
+                self.logger.info('returning also data_for_gridding...')
+                return gridded_var_data, data_for_gridding
+            else:
+                return gridded_var_data
 
-                        for var in vars:
-                            data_for_gridding[var][grid_lat][grid_lon] = \
-                                np.array(data[lat_match_indexes[lon_match_indexes], self.INDEX_DICT[var]])
-                            gridded_var_data[var]['mean'][lat_idx, lon_idx] = \
-                                np.nanmean(data[lat_match_indexes[lon_match_indexes], self.INDEX_DICT[var]])
-                            gridded_var_data[var]['stddev'][lat_idx, lon_idx] = \
-                                np.nanstd(data[lat_match_indexes[lon_match_indexes], self.INDEX_DICT[var]])
-                            gridded_var_data[var]['numobs'][lat_idx, lon_idx] = \
-                                data[lat_match_indexes[lon_match_indexes], self.INDEX_DICT[var]].size
-
-                # now go through self.data and select the appropriate data points
-                # self.data_for_gridding = data_for_gridding
-                # self.gridded_data = gridded_var_data
-                end_time = time.perf_counter()
-                elapsed_sec = end_time - start_time
-                temp = 'time for global 1x1 gridding with python data types [s]: {:.3f}'.format(elapsed_sec)
-                self.logger.info(temp)
-                if return_data_for_gridding:
-                    self.logger.info('returning also data_for_gridding...')
-                    return gridded_var_data, data_for_gridding
-                else:
-                    return gridded_var_data
+    def to_grid_chunks(self, chunks, vars=None, gridtype='1x1', positive_only=False):
+        """incremental gridding of chunks of L2 data (e.g. as yielded by :func:`read_chunks`)
 
-            elif gridtype == '1x1_emep':
-                # 1 by on degree grid on emep domain
-                pass
+        Only the gridding statistics are kept in memory (cf. :class:`GriddingAccumulator`),
+        so that the amount of data that can be gridded is not limited by the available memory.
+        The results are the same as when gridding all data at once using :func:`to_grid`.
 
-            pass
+        Parameters
+        ----------
+        chunks : iterable
+            iterable of 2d numpy arrays of L2 data
+        vars : list or str
+            variables to be gridded
+        gridtype : str
+            name of supported grid (cf. :attr:`SUPPORTED_GRIDS`)
+        positive_only : bool
+            if True, only positive values are used for mean and standard deviation
+
+        Returns
+        -------
+        dict
+            gridded data
+        """
+        import time
+
+        if isinstance(vars, str):
+            _vars = [vars]
+        else:
+            _vars = list(vars)
+
+        if gridtype not in self.SUPPORTED_GRIDS:
+            temp = 'Error: Unknown grid: {}'.format(gridtype)
+            self.logger.error(temp)
+            return
+
+        start_time = time.perf_counter()
+        grid_lats = self.SUPPORTED_GRIDS[gridtype]['grid_lats']
+        grid_lons = self.SUPPORTED_GRIDS[gridtype]['grid_lons']
+        shape = (grid_lats.size, grid_lons.size)
+        accumulators = {var: GriddingAccumulator(shape) for var in _vars}
+        time_sum = 0.
+        point_no = 0
+        for data in chunks:
+            if data.shape[0] == 0:
+                continue
+            time_sum += np.nansum(data[:, self._TIMEINDEX])
+            point_no += np.isfinite(data[:, self._TIMEINDEX]).sum()
+            lat_idx, lon_idx = self._grid_indexes(data[:, self._LATINDEX], data[:, self._LONINDEX],
+                                                  gridtype=gridtype)
+            cell_idx = np.where(lat_idx >= 0, lat_idx * shape[1] + lon_idx, -1)
+            for var in _vars:
+                values = data[:, self.INDEX_DICT[var]]
+                valid = None
+                if positive_only:
+                    with np.errstate(invalid='ignore'):
+                        valid = values > 0.
+                accumulators[var].add(*self._bin_stats(cell_idx, values, shape[0] * shape[1], valid=valid))
+
+        init_time = None
+        if point_no > 0:
+            init_time = np.array(time_sum / point_no).astype('datetime64[ms]')
+        _, gridded_var_data = self._to_grid_grid_init(gridtype=gridtype, vars=_vars, init_time=init_time)
+        for var in _vars:
+            gridded_var_data[var].update(accumulators[var].result())
 
-        pass
+        end_time = time.perf_counter()
+        elapsed_sec = end_time - start_time
+        temp = 'time for incremental {} gridding of {} points [s]: {:.3f}'.format(gridtype, point_no, elapsed_sec)
+        self.logger.info(temp)
+        return gridded_var_data
 
     ###################################################################################
     def _to_grid_grid_init(self,gridtype='1x1',vars=None,init_time=None):
         """small helper routine to init the grid data struct"""
 
         import numpy as np
-        import time
 
-        start_time = time.perf_counter()
-        grid_data_prot = {}
         gridded_var_data = {}
         data_for_gridding = {}
 
@@ -745,25 +1045,14 @@ class ReadL2DataBase(ReadUngriddedBase):
 
             grid_array_prot = np.full((self.SUPPORTED_GRIDS[gridtype]['grid_lats'].size,
                                        self.SUPPORTED_GRIDS[gridtype]['grid_lons'].size), np.nan)
-            # organise the data in a nested python dict like dict_data[grid_lat][grid_lon]=np.ndarray
-            for grid_lat in self.SUPPORTED_GRIDS[gridtype]['grid_lats']:
-                grid_data_prot[grid_lat] = {}
-                for grid_lon in self.SUPPORTED_GRIDS[gridtype]['grid_lons']:
-                    grid_data_prot[grid_lat][grid_lon] = {}
-
-            pass
         else:
             temp = 'Error: Unknown grid: {}'.format(gridtype)
             return
 
-        end_time = time.perf_counter()
-        elapsed_sec = end_time - start_time
-        temp = 'time for global {} gridding with python data types [s] init: {:.3f}'.format(gridtype, elapsed_sec)
-        self.logger.info(temp)
-
         # predefine the output data dict
+        # data_for_gridding is only filled on request (see to_grid)
         for var in vars:
-            data_for_gridding[var] = grid_data_prot.copy()
+            data_for_gridding[var] = {}
             gridded_var_data['latitude'] = self.SUPPORTED_GRIDS[gridtype]['grid_lats']
             gridded_var_data['longitude'] = self.SUPPORTED_GRIDS[gridtype]['grid_lons']
             gridded_var_data['time'] = init_time
@@ -777,7 +1066,6 @@ class ReadL2DataBase(ReadUngriddedBase):
                gridded_var_data,
 
     ###################################################################################
-
     def select_bbox(self, _data, bbox=None):
         """method to return all points of data laying within a certain latitude and longitude range
 
@@ -946,6 +1234,51 @@ class ReadL2DataBase(ReadUngriddedBase):
 
     ###################################################################################
 
+class GriddingAccumulator(object):
+    """Accumulator of gridding statistics for incremental gridding
+
+    Merges per grid cell mean, standard deviation and numbers of values of chunks of data
+    (cf. :func:`ReadL2DataBase._bin_stats`) using the parallel variance algorithm of Chan et al.
+
+    Parameters
+    ----------
+    shape : tuple
+        shape of the grid
+    """
+    def __init__(self, shape):
+        self.shape = shape
+        size = int(np.prod(shape))
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+        self.val_no = np.zeros(size, dtype=int)
+        self.pixel_no = np.zeros(size, dtype=int)
+
+    def add(self, mean, stddev, val_no, pixel_no):
+        """add statistics of chunk of data (flattened arrays, cf. :func:`ReadL2DataBase._bin_stats`)"""
+        self.pixel_no += pixel_no
+        upd = val_no > 0
+        n_a = self.val_no[upd]
+        n_b = val_no[upd]
+        n = n_a + n_b
+        delta = mean[upd] - self.mean[upd]
+        self.mean[upd] += delta * n_b / n
+        self.m2[upd] += stddev[upd] ** 2 * n_b + delta ** 2 * n_a * n_b / n
+        self.val_no[upd] = n
+
+    def result(self):
+        """get gridded mean, stddev and numobs (NaN for cells without data)"""
+        matched = self.pixel_no > 0
+        has_val = self.val_no > 0
+        mean = np.full(self.mean.shape, np.nan)
+        stddev = np.full(self.mean.shape, np.nan)
+        numobs = np.full(self.mean.shape, np.nan)
+        mean[has_val] = self.mean[has_val]
+        stddev[has_val] = np.sqrt(self.m2[has_val] / self.val_no[has_val])
+        numobs[matched] = self.pixel_no[matched]
+        return {'mean': mean.reshape(self.shape),
+                'stddev': stddev.reshape(self.shape),
+                'numobs': numobs.reshape(self.shape)}
+
 # if __name__=="__main__":
 #     """small test for the sentinel5p reading...
 #     """
@@ -466,12 +466,15 @@ class ReadUngridded(object):
         if len(vars_to_read) == len(vars_available):
             data_out = data_read
         else:
-            data_out = UngriddedData()
-            for var in vars_available:
-                if var in cache.loaded_data:
-                    data_out.append(cache.loaded_data[var])
+            loaded = [cache.loaded_data[var] for var in vars_available
+                      if var in cache.loaded_data]
             if data_read is not None:
-                data_out.append(data_read)
+                loaded.append(data_read)
+            if len(loaded) == 1:
+                # share data array (e.g. memory-mapped cache)
+                data_out = loaded[0]
+            else:
+                data_out = UngriddedData.concatenate(loaded)
 
         if _caching is not None:
             const.CACHING = _caching
@@ -542,19 +545,17 @@ class ReadUngridded(object):
                 var_unit_out=var_unit_out,
                 data_id_out=aux_info['data_id'])
             loaded.append(UngriddedData.from_station_data(merged_stats))
-        first = loaded[0]
         if len(loaded) == 1:
-            return first
-        for data in loaded[1:]:
-            first.append(data)
-        return first
+            return loaded[0]
+        return UngriddedData.concatenate(loaded)
 
     def read(self, datasets_to_read=None, vars_to_retrieve=None,
              only_cached=False, **kwargs):
         """Read observations
 
         Iter over all datasets in :attr:`datasets_to_read`, call
-        :func:`read_dataset` and append to data object
+        :func:`read_dataset` and concatenate the results into one data object
+        (cf. :func:`UngriddedData.concatenate`)
 
         Parameters
         ----------
@@ -582,22 +583,24 @@ class ReadUngridded(object):
         if vars_to_retrieve is not None:
             self.vars_to_retrieve = vars_to_retrieve
 
-        data = UngriddedData()
+        loaded = []
         for ds in self.datasets_to_read:
             read_vars = self._get_vars_to_retrieve(ds)
             self.logger.info('Reading {} data, variables: {}'
                              .format(ds, read_vars))
             if ds in self.post_compute:
-                data.append(self.read_dataset_post(ds, read_vars,
-                                                   only_cached=only_cached,
-                                                   **kwargs))
+                loaded.append(self.read_dataset_post(ds, read_vars,
+                                                     only_cached=only_cached,
+                                                     **kwargs))
             else:
-                data.append(self.read_dataset(ds, read_vars,
-                                              only_cached=only_cached,
-                                              **kwargs))
+                loaded.append(self.read_dataset(ds, read_vars,
+                                                only_cached=only_cached,
+                                                **kwargs))
 
             self.logger.info('Successfully imported {} data'.format(ds))
-        return data
+        if len(loaded) == 1:
+            return loaded[0]
+        return UngriddedData.concatenate(loaded)
 
     @property
     def post_compute(self):
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for in-memory cache of UngriddedData objects
+"""
+import pytest
+from pyaerocom import UngriddedData
+from pyaerocom.io.cache_ungridded_memory import UngriddedMemoryCache
+
+def test_make_key():
+    key0 = UngriddedMemoryCache.make_key('obs', 'od550aer',
+                                         filters=dict(a=1, b=2))
+    key1 = UngriddedMemoryCache.make_key('obs', 'od550aer',
+                                         filters=dict(b=2, a=1))
+    assert key0 == key1
+    assert key0 != UngriddedMemoryCache.make_key('obs', 'od550aer')
+
+def test_lru():
+    data = UngriddedData(num_points=10)
+    size = UngriddedMemoryCache.sizeof(data)
+    cache = UngriddedMemoryCache(max_bytes=2*size)
+
+    assert cache.get('a') is None
+    assert cache.put('a', data)
+    assert cache.put('b', data)
+    assert cache.get('a') is data
+    # b is least recently used
+    assert cache.put('c', data)
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+
+    assert not cache.put('d', UngriddedData(num_points=100))
+    assert cache.stats == dict(hits=1, misses=1, evictions=1, num_entries=2,
+                               size_bytes=2*size, max_bytes=2*size)
+    cache.max_bytes = size
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0
+
+if __name__ == '__main__':
+    import sys
+    pytest.main(sys.argv)
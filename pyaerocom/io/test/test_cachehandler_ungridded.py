@@ -8,6 +8,8 @@ Created on Tue Mar  3 12:58:34 2020
 
 import pytest
 import os
+import numpy as np
+import numpy.testing as npt
 from pyaerocom.conftest import testdata_unavail
 from pyaerocom.io.cachehandler_ungridded import CacheHandlerUngridded
 
@@ -43,6 +45,35 @@ def test_check_and_load_custom(cache_handler, aeronetsunv3lev2_subset,
                       cache_dir=tempdir)
     assert ch.loaded_data[filename].shape == aeronetsunv3lev2_subset.shape
 
+@testdata_unavail
+def test_write_custom_columnar(cache_handler, aeronetsunv3lev2_subset,
+                               tempdir):
+    ch = cache_handler
+    outfile = 'test_manual_caching.npcache'
+    ch.write(aeronetsunv3lev2_subset,
+             var_or_file_name=outfile,
+             cache_dir=tempdir)
+
+    fp = os.path.join(tempdir, outfile)
+    assert os.path.isdir(fp)
+    head = ch.read_columnar_head(fp)
+    assert list(head.keys()) == ch.CACHE_HEAD_KEYS
+
+@testdata_unavail
+@pytest.mark.dependency(depends=['test_write_custom_columnar'])
+def test_check_and_load_custom_columnar(cache_handler, aeronetsunv3lev2_subset,
+                                        tempdir):
+    ch = cache_handler
+
+    filename = 'test_manual_caching.npcache'
+    assert ch.check_and_load(var_or_file_name=filename,
+                             cache_dir=tempdir)
+    reloaded = ch.loaded_data[filename]
+    assert isinstance(reloaded._data, np.memmap)
+    assert reloaded.shape == aeronetsunv3lev2_subset.shape
+    assert reloaded.meta_idx.keys() == aeronetsunv3lev2_subset.meta_idx.keys()
+    npt.assert_array_equal(reloaded._data, aeronetsunv3lev2_subset._data)
+
 @testdata_unavail
 def test_write(cache_handler, aeronetsunv3lev2_subset,
                        aeronet_sun_subset_reader):
@@ -69,6 +100,16 @@ def test_check_and_load(cache_handler, aeronetsunv3lev2_subset,
     assert isinstance(reloaded, UngriddedData)
     assert reloaded.shape == subset.shape
 
+@testdata_unavail
+@pytest.mark.dependency(depends=['test_write'])
+def test_read_dataset_cached_mmap(aeronet_sun_subset_reader):
+    from pyaerocom.io import ReadUngridded
+    data_id = aeronet_sun_subset_reader.data_id
+    data = ReadUngridded().read_dataset(data_id, 'od550aer',
+                                        only_cached=True)
+    # single variable loaded from cache is not copied into memory
+    assert isinstance(data._data, np.memmap)
+
 if __name__ == '__main__':
     import sys
     pytest.main(sys.argv)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for parsing of data blocks in ebas_nasa_ames.py module
+"""
+import pytest
+import numpy as np
+import numpy.testing as npt
+from pyaerocom.io.ebas_nasa_ames import EbasNasaAmesFile
+
+LINES = ['0.000000 0.041667 9.999 0.000',
+         '0.041667 0.083333 1.234 0.247',
+         '0.083333 0.125000 2.500 99.999']
+
+@pytest.fixture(scope='module')
+def nasa_ames():
+    return EbasNasaAmesFile(num_cols_dependent=3,
+                            vals_invalid=[9.999999, 9.999, 99.999])
+
+def test__read_data_block(nasa_ames):
+    data = nasa_ames._read_data_block(LINES + ['', '  '])
+    assert data.shape == (3, 4)
+    npt.assert_allclose(data[1], [0.041667, 0.083333, 1.234, 0.247])
+
+@pytest.mark.parametrize('corrupt', [
+    '0.125000 0.166667 3.a00 0.100', # malformed token
+    '0.125000 0.166667 3.000', # missing column
+    ])
+def test__read_data_block_fallback(nasa_ames, corrupt):
+    lines = LINES[:2] + [corrupt] + LINES[2:]
+    data = nasa_ames._read_data_block(lines)
+    assert data.shape == (4, 4)
+    assert np.isnan(data[2]).all()
+    npt.assert_allclose(data[[0, 1, 3]], nasa_ames._read_data_block(LINES))
+
+def test__read_data_block_ragged(nasa_ames):
+    # total number of values matches, but one row is short, one is long
+    lines = [LINES[0],
+             '0.041667 0.083333 1.234',
+             '0.083333 0.125000 2.500 99.999 0.247']
+    data = nasa_ames._read_data_block(lines)
+    assert data.shape == (3, 4)
+    npt.assert_allclose(data[0], nasa_ames._read_data_block(LINES)[0])
+    assert np.isnan(data[1:]).all()
+
+def test__replace_invalid_nan(nasa_ames):
+    data = nasa_ames._replace_invalid_nan(nasa_ames._read_data_block(LINES))
+    assert np.isnan(data[0, 2])
+    assert np.isnan(data[2, 3])
+    assert np.isnan(data).sum() == 2
+    npt.assert_allclose(data[1], [0.041667, 0.083333, 1.234, 0.247])
+
+if __name__ == '__main__':
+    import sys
+    pytest.main(sys.argv)
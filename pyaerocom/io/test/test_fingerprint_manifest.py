@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for manifest of input fingerprints of output files
+"""
+import os
+import pytest
+from pyaerocom.io.fingerprint_manifest import (FingerprintManifest,
+                                               make_fingerprint, files_info)
+
+def test_make_fingerprint():
+    fp0 = make_fingerprint(dict(a=1, b=[1, 2], fun=make_fingerprint))
+    fp1 = make_fingerprint(dict(b=[1, 2], a=1, fun=make_fingerprint))
+    assert fp0 == fp1
+    assert fp0 != make_fingerprint(dict(a=2, b=[1, 2], fun=make_fingerprint))
+
+def test_make_fingerprint_lambda():
+    funs = dict(a=lambda x: x * 2, b=lambda x: x * 3,
+                c=lambda x: [y for y in x], d=lambda x: [y + 1 for y in x])
+    fps = [make_fingerprint(dict(fun=fun)) for fun in funs.values()]
+    assert len(set(fps)) == len(fps)
+    assert fps[0] == make_fingerprint(dict(fun=lambda x: x * 2))
+
+def test_files_info(tmpdir):
+    fp = os.path.join(str(tmpdir), 'bla.nc')
+    with open(fp, 'w') as f:
+        f.write('bla')
+    missing = os.path.join(str(tmpdir), 'blub.nc')
+    info = files_info([missing, fp])
+    assert info[0][0] == fp
+    assert info[0][2] == 3
+    assert info[1] == [missing, None, None]
+
+def test_manifest(tmpdir):
+    manifest = FingerprintManifest(os.path.join(str(tmpdir), 'manifest'))
+    # directory is only created when the first entry is written
+    assert not os.path.exists(manifest.manifest_dir)
+    name = 'od550aer_REF-obs_MOD-model.nc'
+    fp = make_fingerprint(dict(a=1))
+
+    assert not manifest.is_current(name, fp)
+    manifest.set(name, fp, info=dict(a=1))
+    assert name in manifest
+    assert manifest.get(name) == dict(fingerprint=fp, info=dict(a=1))
+    assert manifest.is_current(name, fp)
+    assert not manifest.is_current(name, make_fingerprint(dict(a=2)))
+    assert not manifest.is_current(name, None)
+
+    manifest.set(name, None)
+    assert not name in manifest
+    manifest.set(name, fp)
+    manifest.clear()
+    assert manifest.get(name) is None
+
+if __name__ == '__main__':
+    import sys
+    pytest.main(sys.argv)
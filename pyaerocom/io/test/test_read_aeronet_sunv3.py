@@ -58,6 +58,33 @@ def test_read_add_common_meta(reader):
                        common_meta={'bla':42})
     assert all('bla' in x for x in data.metadata.values())
 
+AERONET_V3_FILE = """AERONET Version 3;
+Thessaloniki
+Version 3: AOD Level 2.0
+The following data are automatically cloud cleared and quality assured
+Contact: PI=Alkiviadis_Bais; PI Email=abais@auth.gr
+Daily Averages,UNITS can be found at,,, https://aeronet.gsfc.nasa.gov/new_web/units.html
+AERONET_Site,Date(dd:mm:yyyy),Time(hh:mm:ss),Day_of_Year,AOD_440nm,AOD_500nm,AOD_870nm,440-870_Angstrom_Exponent,Data_Quality_Level,AERONET_Instrument_Number,Site_Latitude(Degrees),Site_Longitude(Degrees),Site_Elevation(m)
+Thessaloniki,01:01:2019,12:00:00,1,0.300,0.250,0.100,1.500,lev20,1,40.63,22.96,60.0
+Thessaloniki,02:01:2019,12:00:00,2,-999.,0.200,0.080,1.400,lev20,1,40.63,22.96,60.0
+Thessaloniki,03:01:2019,12:00:00,3,0.100,0.090,lev20,1,40.63,22.96,60.0
+Thessaloniki,04:01:2019,06:30:00,4,0.200,0.180,0.070,-999.,lev20,1,40.63,22.96,60.0
+"""
+
+def test_read_file_corrupt_line(tmpdir):
+    fp = os.path.join(str(tmpdir), 'Thessaloniki.lev20')
+    with open(fp, 'w') as f:
+        f.write(AERONET_V3_FILE)
+    data = ReadAeronetSunV3().read_file(fp, vars_to_retrieve=['od440aer',
+                                                              'ang4487aer'])
+    # third data line has too few columns and is skipped
+    assert data['dtime'].tolist() == [np.datetime64('2019-01-01T12:00:00'),
+                                      np.datetime64('2019-01-02T12:00:00'),
+                                      np.datetime64('2019-01-04T06:30:00')]
+    npt.assert_allclose(data['od440aer'], [0.3, np.nan, 0.2])
+    npt.assert_allclose(data['ang4487aer'], [1.5, 1.4, np.nan])
+    assert data['station_name'].tolist() == ['Thessaloniki'] * 3
+    npt.assert_allclose(data['latitude'], 40.63)
 
 if __name__=="__main__":
     import sys
@@ -373,6 +373,21 @@ class TestReadEBAS(object):
         for key, val in _meta.items():
             assert val == meta[key]
 
+    @pytest.mark.parametrize('vars_to_retrieve', [
+        'sc550aer',
+        ['sc550aer', 'ac550aer', 'concpm10', 'conco3']
+        ])
+    def test_read_multiproc(self, reader, vars_to_retrieve):
+        data = reader.read(vars_to_retrieve)
+        data_mp = reader.read(vars_to_retrieve, multiproc=True, num_proc=2)
+
+        assert data_mp.shape == data.shape
+        assert data_mp.unique_station_names == data.unique_station_names
+        data_mp._check_index()
+        for var in data.contains_vars:
+            npt.assert_allclose(np.nansum(data_mp.all_datapoints_var(var)),
+                                np.nansum(data.all_datapoints_var(var)))
+
 if __name__ == '__main__':
     import os
     import sys
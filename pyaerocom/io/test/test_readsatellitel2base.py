@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for gridding of satellite L2 data in readsatellitel2base.py module
+
+Uses synthetic pixel arrays, the results are checked against a brute force
+computation of the gridding statistics of each grid cell.
+"""
+import pytest
+import numpy as np
+import numpy.testing as npt
+from pyaerocom.io.readsatellitel2base import (ReadL2DataBase,
+                                              GriddingAccumulator)
+from pyaerocom.io.read_sentinel5p_data import ReadL2Data as ReadS5P
+from pyaerocom.io.read_aeolus_l2a_data import ReadL2Data as ReadAeolus
+
+S5P_VAR = 'tcolno2'
+AEOLUS_VAR = 'ec355aer'
+
+@pytest.fixture(scope='module')
+def reader_s5p():
+    return ReadS5P()
+
+@pytest.fixture(scope='module')
+def reader_aeolus():
+    return ReadAeolus()
+
+def _make_pixel_data(reader, var, gridtype, num=2000, cell_num=40, seed=42):
+    """Create synthetic L2 data array of pixels in a few random grid cells
+
+    Pixels are placed well within their grid cell, so that the cell indices
+    used to create them can serve as reference. About 10% of the values
+    are NaN and about 15% are negative.
+    """
+    grid = reader.SUPPORTED_GRIDS[gridtype]
+    rng = np.random.RandomState(seed)
+    cells = rng.randint(0, cell_num, num)
+    lat_idx = rng.randint(0, grid['grid_lats'].size, cell_num)[cells]
+    lon_idx = rng.randint(0, grid['grid_lons'].size, cell_num)[cells]
+    lats = (grid['grid_lats'][lat_idx] +
+            rng.uniform(-0.4, 0.4, num) * grid['grid_dist_lat'])
+    lons = (grid['grid_lons'][lon_idx] +
+            rng.uniform(-0.4, 0.4, num) * grid['grid_dist_lon'])
+    values = rng.normal(1., 1., num)
+    values[rng.uniform(size=num) < 0.1] = np.nan
+
+    data = np.full((num, reader._COLNO), np.nan)
+    data[:, reader._TIMEINDEX] = (
+        np.datetime64('2020-01-01', 'ms').astype(float) +
+        rng.uniform(0, 86400e3, num))
+    data[:, reader._LATINDEX] = lats
+    data[:, reader._LONINDEX] = lons
+    data[:, reader.INDEX_DICT[var]] = values
+    return data, lat_idx, lon_idx
+
+def _brute_force_grid(shape, idx, values, positive_only=False,
+                      numobs_valid=False):
+    """Compute mean, stddev and numobs for each grid cell one by one"""
+    mean = np.full(shape, np.nan)
+    stddev = np.full(shape, np.nan)
+    numobs = np.full(shape, np.nan)
+    for cell in set(zip(*idx)):
+        in_cell = np.ones(len(values), dtype=bool)
+        for dim_idx, i in zip(idx, cell):
+            in_cell &= dim_idx == i
+        vals = values[in_cell]
+        use = vals[~np.isnan(vals)]
+        if positive_only:
+            use = use[use > 0]
+        if numobs_valid:
+            if len(use) > 0:
+                numobs[cell] = len(use)
+        else:
+            numobs[cell] = len(vals)
+        if len(use) > 0:
+            mean[cell] = np.mean(use)
+            stddev[cell] = np.std(use)
+    return mean, stddev, numobs
+
+def _check_gridded(gridded, ref):
+    for key, ref_arr in zip(['mean', 'stddev', 'numobs'], ref):
+        npt.assert_array_equal(np.isnan(gridded[key]), np.isnan(ref_arr))
+        npt.assert_allclose(gridded[key], ref_arr, rtol=1e-10, atol=1e-12)
+
+@pytest.mark.parametrize('gridtype', ['1x1', '0.5x0.5', 'CAMS50'])
+def test__grid_indexes(reader_s5p, gridtype):
+    data, lat_idx, lon_idx = _make_pixel_data(reader_s5p, S5P_VAR, gridtype)
+    _lat_idx, _lon_idx = reader_s5p._grid_indexes(data[:, reader_s5p._LATINDEX],
+                                                  data[:, reader_s5p._LONINDEX],
+                                                  gridtype=gridtype)
+    npt.assert_array_equal(_lat_idx, lat_idx)
+    npt.assert_array_equal(_lon_idx, lon_idx)
+
+def test__grid_indexes_edges(reader_s5p):
+    # poles, dateline, longitudes outside [-180, 180), invalid coordinates
+    lats = np.array([90, -90, 0, 0, 0, 0, 0, np.nan, 0, 91])
+    lons = np.array([0, 0, 180, -180, 179.9, 190, -190, 0, np.nan, 0])
+    lat_idx, lon_idx = reader_s5p._grid_indexes(lats, lons, gridtype='1x1')
+    npt.assert_array_equal(lat_idx, [179, 0, 90, 90, 90, 90, 90, -1, -1, -1])
+    npt.assert_array_equal(lon_idx, [180, 180, 0, 0, 359, 10, 350, -1, -1, -1])
+
+def test__bin_stats():
+    cell_idx = np.array([0, 0, 0, 2, 2, -1, 3])
+    values = np.array([1., 2., np.nan, -1., 3., 100., -2.])
+    mean, stddev, val_no, pixel_no = ReadL2DataBase._bin_stats(cell_idx,
+                                                               values, 4)
+    npt.assert_allclose(mean, [1.5, np.nan, 1., -2.])
+    npt.assert_allclose(stddev, [0.5, np.nan, 2., 0.])
+    npt.assert_array_equal(val_no, [2, 0, 2, 1])
+    npt.assert_array_equal(pixel_no, [3, 0, 2, 1])
+
+    mean, stddev, val_no, pixel_no = ReadL2DataBase._bin_stats(
+        cell_idx, values, 4, valid=values > 0)
+    npt.assert_allclose(mean, [1.5, np.nan, 3., np.nan])
+    npt.assert_allclose(stddev, [0.5, np.nan, 0., np.nan])
+    npt.assert_array_equal(val_no, [2, 0, 1, 0])
+    npt.assert_array_equal(pixel_no, [3, 0, 2, 1])
+
+def test__bin_data_dict():
+    cell_idx = np.array([5, 0, 5, -1, 1])
+    values = np.array([1., 2., 3., 4., 5.])
+    coords = (np.array([10., 20.]), np.array([-1., 0., 1.]))
+    result = ReadL2DataBase._bin_data_dict(cell_idx, values, coords)
+    assert sorted(result) == [10., 20.]
+    assert sorted(result[10.]) == [-1., 0.]
+    assert list(result[20.]) == [1.]
+    npt.assert_array_equal(result[10.][-1.], [2.])
+    npt.assert_array_equal(result[10.][0.], [5.])
+    # order of pixels within a grid cell is preserved
+    npt.assert_array_equal(result[20.][1.], [1., 3.])
+
+@pytest.mark.parametrize('gridtype', ['1x1', '0.5x0.5', 'CAMS50'])
+def test_to_grid(reader_s5p, gridtype):
+    data, lat_idx, lon_idx = _make_pixel_data(reader_s5p, S5P_VAR, gridtype)
+    grid = reader_s5p.SUPPORTED_GRIDS[gridtype]
+    shape = (grid['grid_lats'].size, grid['grid_lons'].size)
+    values = data[:, reader_s5p.INDEX_DICT[S5P_VAR]]
+
+    reader_s5p.data = data
+    gridded, data_for_gridding = ReadL2DataBase.to_grid(
+        reader_s5p, vars=[S5P_VAR], gridtype=gridtype,
+        return_data_for_gridding=True)
+
+    npt.assert_array_equal(gridded['latitude'], grid['grid_lats'])
+    npt.assert_array_equal(gridded['longitude'], grid['grid_lons'])
+    ref = _brute_force_grid(shape, (lat_idx, lon_idx), values)
+    _check_gridded(gridded[S5P_VAR], ref)
+
+    cells = set(zip(lat_idx, lon_idx))
+    grid_data = data_for_gridding[S5P_VAR]
+    assert sum(len(sub) for sub in grid_data.values()) == len(cells)
+    for i, j in cells:
+        vals = grid_data[grid['grid_lats'][i]][grid['grid_lons'][j]]
+        in_cell = (lat_idx == i) & (lon_idx == j)
+        npt.assert_array_equal(vals, values[in_cell])
+
+def test_to_grid_edges(reader_s5p):
+    lats = np.array([90., 89.7, -90., 0.2, 0.5, 0.7])
+    lons = np.array([10.5, 10.5, 0.5, 180., -180., -179.5])
+    values = np.array([1., 3., 2., 4., np.nan, 6.])
+    data = np.full((len(lats), reader_s5p._COLNO), np.nan)
+    data[:, reader_s5p._TIMEINDEX] = np.datetime64('2020-01-01',
+                                                   'ms').astype(float)
+    data[:, reader_s5p._LATINDEX] = lats
+    data[:, reader_s5p._LONINDEX] = lons
+    data[:, reader_s5p.INDEX_DICT[S5P_VAR]] = values
+
+    reader_s5p.data = data
+    gridded = ReadL2DataBase.to_grid(reader_s5p, vars=[S5P_VAR])[S5P_VAR]
+    # north pole
+    assert gridded['numobs'][179, 190] == 2
+    npt.assert_allclose(gridded['mean'][179, 190], 2.)
+    # south pole
+    assert gridded['numobs'][0, 180] == 1
+    # dateline: 180 and -180 are the same grid cell
+    assert gridded['numobs'][90, 0] == 3
+    npt.assert_allclose(gridded['mean'][90, 0], 5.)
+    assert np.nansum(gridded['numobs']) == len(lats)
+
+def test_to_grid_s5p(reader_s5p, monkeypatch):
+    import xarray as xr
+    gridtype = '1x1'
+    data, lat_idx, lon_idx = _make_pixel_data(reader_s5p, S5P_VAR, gridtype)
+    grid = reader_s5p.SUPPORTED_GRIDS[gridtype]
+    shape = (grid['grid_lats'].size, grid['grid_lons'].size)
+    values = data[:, reader_s5p.INDEX_DICT[S5P_VAR]]
+
+    ds = xr.Dataset()
+    ds['time'] = 'point', data[:, reader_s5p._TIMEINDEX].astype('datetime64[ms]')
+    ds['latitude'] = 'point', data[:, reader_s5p._LATINDEX]
+    ds['longitude'] = 'point', data[:, reader_s5p._LONINDEX]
+    ds[S5P_VAR] = 'point', values
+    monkeypatch.setattr(reader_s5p, 'to_xarray',
+                        lambda data_to_write=None, **kwargs: ds)
+
+    gridded, data_for_gridding = reader_s5p.to_grid(
+        data={}, vars=[S5P_VAR], gridtype=gridtype,
+        return_data_for_gridding=True)
+    # mean and stddev only use positive values, numobs is number of pixels
+    ref = _brute_force_grid(shape, (lat_idx, lon_idx), values,
+                            positive_only=True)
+    _check_gridded(gridded[S5P_VAR], ref)
+    assert (sum(len(sub) for sub in data_for_gridding[S5P_VAR].values()) ==
+            len(set(zip(lat_idx, lon_idx))))
+
+def test_to_grid_aeolus(reader_aeolus):
+    gridtype = '1x1'
+    data, lat_idx, lon_idx = _make_pixel_data(reader_aeolus, AEOLUS_VAR,
+                                              gridtype)
+    levelno = 20
+    rng = np.random.RandomState(13)
+    level_idx = rng.randint(0, levelno, len(data))
+    # height levels are 1000 m thick (low < height <= high)
+    data[:, reader_aeolus._ALTITUDEINDEX] = (level_idx * 1000. +
+                                             rng.uniform(1, 999, len(data)))
+    grid = reader_aeolus.SUPPORTED_GRIDS[gridtype]
+    shape = (grid['grid_lats'].size, grid['grid_lons'].size, levelno)
+    values = data[:, reader_aeolus.INDEX_DICT[AEOLUS_VAR]]
+
+    gridded, data_for_gridding = reader_aeolus.to_grid(
+        data=data, vars=[AEOLUS_VAR], gridtype=gridtype, levelno=levelno,
+        return_data_for_gridding=True)
+    # only positive values are gridded and counted in numobs
+    ref = _brute_force_grid(shape, (lat_idx, lon_idx, level_idx), values,
+                            positive_only=True, numobs_valid=True)
+    _check_gridded(gridded[AEOLUS_VAR], ref)
+
+    grid_data = data_for_gridding[AEOLUS_VAR]
+    for i, j, k in set(zip(lat_idx, lon_idx, level_idx)):
+        in_cell = ((lat_idx == i) & (lon_idx == j) & (level_idx == k) &
+                   (values > 0))
+        if not in_cell.any():
+            continue
+        vals = grid_data[grid['grid_lats'][i]][grid['grid_lons'][j]][k]
+        npt.assert_array_equal(vals, values[in_cell])
+
+def test_gridding_accumulator():
+    cell_no = 5
+    cell_idx = np.array([0, 0, 1, 3, -1, 0, 1, 1, 2, 3])
+    values = np.array([1., 2., 4., np.nan, 7., 3., 5., np.nan, -1., 2.])
+    valid = values > 0
+    acc = GriddingAccumulator((cell_no,))
+    for chunk in (slice(0, 4), slice(4, 4), slice(4, None)):
+        acc.add(*ReadL2DataBase._bin_stats(cell_idx[chunk], values[chunk],
+                                           cell_no, valid=valid[chunk]))
+    mean, stddev, _, pixel_no = ReadL2DataBase._bin_stats(cell_idx, values,
+                                                          cell_no,
+                                                          valid=valid)
+    result = acc.result()
+    npt.assert_allclose(result['mean'], mean)
+    npt.assert_allclose(result['stddev'], stddev)
+    npt.assert_allclose(result['numobs'], [3, 3, 1, 2, np.nan])
+
+@pytest.mark.parametrize('gridtype', ['1x1', 'CAMS50'])
+@pytest.mark.parametrize('positive_only', [False, True])
+def test_to_grid_chunks(reader_s5p, gridtype, positive_only):
+    data, lat_idx, lon_idx = _make_pixel_data(reader_s5p, S5P_VAR, gridtype)
+    grid = reader_s5p.SUPPORTED_GRIDS[gridtype]
+    shape = (grid['grid_lats'].size, grid['grid_lons'].size)
+    values = data[:, reader_s5p.INDEX_DICT[S5P_VAR]]
+    # chunks of different size, including an empty one
+    chunks = np.split(data, [300, 300, 1100, 1150])
+
+    gridded = reader_s5p.to_grid_chunks(chunks, vars=S5P_VAR,
+                                        gridtype=gridtype,
+                                        positive_only=positive_only)
+    if positive_only:
+        ref = _brute_force_grid(shape, (lat_idx, lon_idx), values,
+                                positive_only=True)
+        _check_gridded(gridded[S5P_VAR], ref)
+    else:
+        reader_s5p.data = data
+        ref = ReadL2DataBase.to_grid(reader_s5p, vars=[S5P_VAR],
+                                     gridtype=gridtype)
+        _check_gridded(gridded[S5P_VAR], [ref[S5P_VAR][key] for key in
+                                          ['mean', 'stddev', 'numobs']])
+        assert abs(gridded['time'] - ref['time']) <= np.timedelta64(1, 'ms')
+    npt.assert_array_equal(gridded['latitude'], grid['grid_lats'])
+    npt.assert_array_equal(gridded['longitude'], grid['grid_lons'])
+
+def _make_filter_data(reader):
+    data = np.full((4, reader._COLNO), np.nan)
+    data[:, reader._TIMEINDEX] = np.datetime64('2020-01-01', 'ms').astype(
+        float) + np.arange(4) * 86400e3
+    data[:, reader._LATINDEX] = [10., 20., 30., 40.]
+    data[:, reader._LONINDEX] = [-10., 0., 10., 20.]
+    data[:, reader.INDEX_DICT[reader._QANAME]] = [0.9, 0.2, np.nan, 0.75]
+    return data
+
+@pytest.mark.parametrize('kwargs,rows', [
+    (dict(), [0, 1, 2, 3]),
+    (dict(apply_quality_flag=0.75), [0, 3]),
+    (dict(bbox=[15., 35., -5., 15.]), [1, 2]),
+    (dict(start='2020-01-02'), [1, 2, 3]),
+    (dict(stop='2020-01-02'), [0, 1]),
+    (dict(start='2020-01-02', stop='2020-01-03', bbox=[0., 90., 5., 180.]),
+     [2]),
+    (dict(apply_quality_flag=0.5, start='2020-01-05'), []),
+    ])
+def test__filter_chunk(reader_s5p, kwargs, rows):
+    data = _make_filter_data(reader_s5p)
+    filtered = reader_s5p._filter_chunk(data, **kwargs)
+    npt.assert_array_equal(filtered, data[rows])
+
+def test_read_chunks(reader_s5p, monkeypatch):
+    data = _make_filter_data(reader_s5p)
+    file_data = {'b.nc': data[2:], 'a.nc': data[:2]}
+    monkeypatch.setattr(reader_s5p, 'files', list(file_data))
+    monkeypatch.setattr(reader_s5p, 'read_file',
+                        lambda filename, **kwargs: file_data[filename])
+    # files of file list (cf. get_file_list) are read in sorted order
+    chunks = list(reader_s5p.read_chunks(apply_quality_flag=0.5))
+    assert len(chunks) == 2
+    npt.assert_array_equal(chunks[0], data[[0]])
+    npt.assert_array_equal(chunks[1], data[[3]])
+    assert reader_s5p.read_failed == []
+
+def test_read_chunks_failed(reader_s5p, monkeypatch):
+    data = _make_filter_data(reader_s5p)
+    file_data = {'a.nc': data[:2], 'c.nc': data[2:]}
+    def read_file(filename, **kwargs):
+        if not filename in file_data:
+            raise IOError('Corrupt file {}'.format(filename))
+        return file_data[filename]
+    monkeypatch.setattr(reader_s5p, 'read_file', read_file)
+    # failing files are skipped and registered
+    chunks = list(reader_s5p.read_chunks(files=['a.nc', 'b.nc', 'c.nc']))
+    assert len(chunks) == 2
+    npt.assert_array_equal(np.concatenate(chunks), data)
+    assert reader_s5p.read_failed == ['b.nc']
+
+if __name__ == '__main__':
+    import sys
+    pytest.main(sys.argv)
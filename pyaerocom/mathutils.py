@@ -9,6 +9,12 @@ import numpy as np
 from pyaerocom import const, logger
 from scipy.stats import pearsonr, spearmanr, kendalltau
 
+#: Maximum length of time series for which Kendall tau is computed from the
+#: pairwise differences of all stations at once (cf. :func:`_kendall_multi`).
+#: The cost of this grows with the square of the length, so longer series
+#: are processed station by station (O(n log n) each).
+KENDALL_MULTI_MAX_LEN = 250
+
 ### LAMBDA FUNCTIONS
 in_range = lambda x, low, high: low <= x <= high
 
@@ -284,10 +290,261 @@ def calc_statistics(data, ref_data, lowlim=None, highlim=None,
 
     return result
 
+def _rank_avg_ties(vals):
+    """Ranks of values along first axis (ties get average rank)
+
+    NaNs are sorted to the end and get ranks that are not meaningful, i.e.
+    they need to be excluded by the caller.
+    """
+    order = np.argsort(vals, axis=0, kind='mergesort')
+    svals = np.take_along_axis(vals, order, axis=0)
+    n = len(vals)
+    pos = np.arange(n).reshape((n,) + (1,) * (vals.ndim - 1))
+    pos = np.broadcast_to(pos, vals.shape)
+    new_group = np.ones(vals.shape, dtype=bool)
+    new_group[1:] = svals[1:] != svals[:-1]
+    end_group = np.ones(vals.shape, dtype=bool)
+    end_group[:-1] = new_group[1:]
+    first = np.maximum.accumulate(np.where(new_group, pos, 0), axis=0)
+    last = np.minimum.accumulate(np.where(end_group, pos, n - 1)[::-1],
+                                 axis=0)[::-1]
+    ranks = np.empty(vals.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2. + 1, axis=0)
+    return ranks
+
+def _pearson_multi(x, y, valid, num):
+    """Pearson correlation coefficient along first axis of 2D arrays"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xm = np.where(valid, x - np.sum(np.where(valid, x, 0), axis=0) / num,
+                      0)
+        ym = np.where(valid, y - np.sum(np.where(valid, y, 0), axis=0) / num,
+                      0)
+        r = (np.sum(xm * ym, axis=0) /
+             np.sqrt(np.sum(xm**2, axis=0) * np.sum(ym**2, axis=0)))
+    return np.clip(r, -1, 1)
+
+def _kendall_multi(x, y, valid, max_len=None):
+    """Kendall tau-b along first axis of 2D arrays
+
+    For short time series (up to `max_len`), tau is computed from the signs
+    of all pairwise differences, one time lag at a time, such that memory
+    usage scales with the array size. For longer series, this becomes
+    slower than computing tau for each station individually using
+    :func:`scipy.stats.kendalltau` (which is O(n log n)), so the latter is
+    used. If `max_len` is None, :attr:`KENDALL_MULTI_MAX_LEN` is used.
+    """
+    if max_len is None:
+        max_len = KENDALL_MULTI_MAX_LEN
+    if len(x) > max_len:
+        tau = np.full(x.shape[1:], np.nan)
+        for i in range(x.shape[1]):
+            ok = valid[:, i]
+            if ok.sum() > 1:
+                tau[i] = kendalltau(x[ok, i], y[ok, i])[0]
+        return tau
+    num = valid.sum(axis=0).astype(float)
+    con_min_dis = np.zeros(x.shape[1:])
+    xtie = np.zeros(x.shape[1:])
+    ytie = np.zeros(x.shape[1:])
+    for lag in range(1, len(x)):
+        ok = valid[lag:] & valid[:-lag]
+        sx = np.sign(x[lag:] - x[:-lag])
+        sy = np.sign(y[lag:] - y[:-lag])
+        con_min_dis += np.sum(np.where(ok, sx * sy, 0), axis=0)
+        xtie += np.sum(ok & (sx == 0), axis=0)
+        ytie += np.sum(ok & (sy == 0), axis=0)
+    tot = num * (num - 1) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tau = con_min_dis / np.sqrt(tot - xtie) / np.sqrt(tot - ytie)
+    return np.clip(tau, -1, 1)
+
+def calc_statistics_multi(arr, mask=None, lowlim=None, highlim=None,
+                          min_num_valid=1, as_list=False):
+    """Calc statistical properties for many locations at once
+
+    Vectorised version of :func:`calc_statistics` for data of many stations
+    (or grid points), using array operations along the time axis instead of
+    one function call for each station. The results are the same as calling
+    :func:`calc_statistics` for each station individually (with `data` being
+    the model and `ref_data` being the observations).
+
+    Parameters
+    ----------
+    arr : ndarray
+        3D array with shape (2, time, station) (cf.
+        :class:`pyaerocom.ColocatedData`), first index of first dimension
+        containing reference (observation) data, second index containing
+        data (model) to be compared with reference.
+    mask : ndarray, optional
+        boolean array with shape (time, station) specifying points that are
+        supposed to be used (in addition to NaNs, which are always removed).
+    lowlim : float
+        lower end of considered value range (cf. :func:`calc_statistics`)
+    highlim : float
+        upper end of considered value range
+    min_num_valid : int
+        minimum number of valid measurements required to compute statistical
+        parameters.
+    as_list : bool
+        if True, a list with one dictionary per station is returned, each
+        containing the same keys as the output of :func:`calc_statistics`.
+
+    Returns
+    -------
+    dict or list
+        dictionary containing computed statistics (values are arrays with
+        one entry per station, statistics that are not defined for a station
+        are NaN) or list of dictionaries (if `as_list` is True)
+
+    Raises
+    ------
+    ValueError
+        if input array does not have shape (2, time, station) or the shape of
+        the mask does not match
+    """
+    arr = np.asarray(arr, dtype=np.float64)
+    if not arr.ndim == 3 or not len(arr) == 2:
+        raise ValueError('Invalid input. Need 3D array with shape '
+                         '(2, time, station), got {}'.format(arr.shape))
+    ref_data, data = arr[0], arr[1]
+
+    valid = ~np.isnan(ref_data) & ~np.isnan(data)
+    if mask is None:
+        totnum = np.full(ref_data.shape[1:], len(ref_data), dtype=float)
+    else:
+        mask = np.asarray(mask, dtype=bool)
+        if not mask.shape == ref_data.shape:
+            raise ValueError('Shape mismatch between mask {} and data {}'
+                             .format(mask.shape, ref_data.shape))
+        totnum = mask.sum(axis=0).astype(float)
+        valid &= mask
+
+    num_points = valid.sum(axis=0)
+
+    result = {}
+    result['totnum'] = totnum
+    result['num_valid'] = num_points.astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for key, vals in (('refdata', ref_data), ('data', data)):
+            mean = np.sum(np.where(valid, vals, 0), axis=0) / num_points
+            result['{}_mean'.format(key)] = mean
+            result['{}_std'.format(key)] = np.sqrt(
+                np.sum(np.where(valid, (vals - mean)**2, 0), axis=0) /
+                num_points)
+    result['weighted'] = np.zeros(num_points.shape, dtype=bool)
+
+    if lowlim is not None:
+        valid &= (data > lowlim) & (ref_data > lowlim)
+    if highlim is not None:
+        valid &= (data < highlim) & (ref_data < highlim)
+    num = valid.sum(axis=0)
+
+    difference = data - ref_data
+    pos = valid & (data > 0) & (ref_data > 0)
+    num_pos = pos.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result['rms'] = np.sqrt(np.sum(np.where(valid, difference**2, 0),
+                                       axis=0) / num)
+        result['nmb'] = (np.sum(np.where(pos, difference, 0), axis=0) /
+                         np.sum(np.where(pos, ref_data, 0), axis=0))
+        tmp = np.where(pos, difference / (data + ref_data), 0)
+        result['mnmb'] = 2. / num_pos * np.sum(tmp, axis=0)
+        result['fge'] = 2. / num_pos * np.sum(np.abs(tmp), axis=0)
+    for key in ('nmb', 'mnmb', 'fge'):
+        result[key][num_pos == 0] = np.nan
+
+    result['R'] = _pearson_multi(data, ref_data, valid, num)
+    vals = np.where(valid, data, np.nan)
+    refvals = np.where(valid, ref_data, np.nan)
+    result['R_spearman'] = _pearson_multi(_rank_avg_ties(vals),
+                                          _rank_avg_ties(refvals),
+                                          valid, num)
+    result['R_kendall'] = _kendall_multi(data, ref_data, valid)
+    for key in ('R', 'R_spearman', 'R_kendall'):
+        result[key][num_points <= 1] = np.nan
+
+    result['num_neg_data'] = np.sum(valid & (data <= 0), axis=0)
+    result['num_neg_refdata'] = np.sum(valid & (ref_data <= 0), axis=0)
+
+    insufficient = num_points < min_num_valid
+    for key in ('rms', 'nmb', 'mnmb', 'fge', 'R', 'R_spearman', 'R_kendall'):
+        result[key][insufficient] = np.nan
+
+    if not as_list:
+        return result
+    return _unpack_statistics_multi(result, num_points, min_num_valid)
+
+def _unpack_statistics_multi(result, num_points, min_num_valid):
+    """Convert output of :func:`calc_statistics_multi` into list of dicts
+
+    The keys of each dictionary are the same as returned by
+    :func:`calc_statistics` for the corresponding station.
+    """
+    insuff_keys = ['totnum', 'num_valid', 'refdata_mean', 'refdata_std',
+                   'data_mean', 'data_std', 'weighted', 'rms', 'nmb', 'mnmb',
+                   'fge', 'R', 'R_spearman']
+    corr_keys = ['R', 'R_spearman', 'R_kendall']
+    other_keys = [k for k in result if not k in corr_keys]
+    stats = []
+    for i, num in enumerate(num_points):
+        if num < min_num_valid:
+            keys = insuff_keys
+        elif num > 1:
+            keys = result
+        else:
+            keys = other_keys
+        stats.append({k : result[k][i] for k in keys})
+    return stats
+
 def closest_index(num_array, value):
     """Returns index in number array that is closest to input value"""
     return np.argmin(np.abs(np.asarray(num_array) - value))
 
+def closest_indices_sorted(num_array, values, modulus=None):
+    """Find indices of closest entries in sorted number array
+
+    Vectorised version of :func:`closest_index` for monotonic input arrays
+    (e.g. grid coordinates), using binary search. If two entries are equally
+    close to an input value, the larger one is used.
+
+    Parameters
+    ----------
+    num_array : ndarray
+        1D array sorted in ascending or descending order
+    values : float or ndarray
+        values for which the closest indices are to be found
+    modulus : float, optional
+        modulus of circular coordinates (e.g. 360 for longitudes that span
+        the whole globe). If provided, distances are computed across the
+        boundary of the coordinate array, and input values are mapped into
+        the range of the coordinate array.
+
+    Returns
+    -------
+    ndarray
+        indices of closest entries in `num_array` for each input value
+    """
+    num_array = np.asarray(num_array, dtype=float)
+    values = np.atleast_1d(np.asarray(values, dtype=float))
+    num = len(num_array)
+    if num == 1:
+        return np.zeros(len(values), dtype=int)
+    reverse = num_array[0] > num_array[-1]
+    if reverse:
+        num_array = num_array[::-1]
+    if modulus is not None:
+        values = (values - num_array[0]) % modulus + num_array[0]
+        num_array = np.append(num_array, num_array[0] + modulus)
+    right = np.clip(np.searchsorted(num_array, values), 1, len(num_array) - 1)
+    left = right - 1
+    idx = np.where(values - num_array[left] < num_array[right] - values,
+                   left, right)
+    if modulus is not None:
+        idx[idx == num] = 0
+    if reverse:
+        idx = num - 1 - idx
+    return idx
+
 def numbers_in_str(input_string):
     """This method finds all numbers in a string
 
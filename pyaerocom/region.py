@@ -177,6 +177,30 @@ class Region(BrowseDict):
         lon_ok = self.lon_range[0] <= lon <= self.lon_range[1]
         return lat_ok * lon_ok
 
+    def contains_coordinates(self, lats, lons):
+        """Check which of the input lat/lon coordinates are in this region
+
+        Vectorised version of :func:`contains_coordinate`.
+
+        Parameters
+        ----------
+        lats : ndarray
+            latitudes of coordinates
+        lons : ndarray
+            longitudes of coordinates
+
+        Returns
+        -------
+        ndarray
+            boolean array that is True for coordinates contained in this
+            region
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        lat_ok = (lats >= self.lat_range[0]) & (lats <= self.lat_range[1])
+        lon_ok = (lons >= self.lon_range[0]) & (lons <= self.lon_range[1])
+        return lat_ok & lon_ok
+
     def plot(self, ax=None):
         """
 
@@ -382,6 +406,113 @@ def find_closest_region_coord(lat, lon, default_regs=None, **add_regions):
                 best=rname
         return best
 
+def _get_rect_regions(default_regs=None, **add_regions):
+    """Rectangular regions considered in :func:`get_regions_coords`"""
+    if default_regs is None:
+        default_regs = get_all_default_regions(use_all_in_ini=False)
+    regs = od(default_regs)
+    for an, ar in add_regions.items():
+        if isinstance(ar, Region):
+            if not ar.is_htap:
+                regs[an] = ar
+    regs.pop('WORLD', None)
+    return regs
+
+def _regions_coords_matrix(lats, lons, regs):
+    """Boolean matrix (region, coordinate) of region memberships"""
+    lats = np.atleast_1d(np.asarray(lats, dtype=float))
+    lons = np.atleast_1d(np.asarray(lons, dtype=float))
+    if not lats.shape == lons.shape:
+        raise ValueError('Shape mismatch between input latitudes and '
+                         'longitudes')
+    contained = np.zeros((len(regs), len(lats)), dtype=bool)
+    for i, reg in enumerate(regs.values()):
+        contained[i] = reg.contains_coordinates(lats, lons)
+    return contained
+
+def get_regions_coords(lats, lons, default_regs=None, **add_regions):
+    """Get all regions that contain input coordinates
+
+    Vectorised version of :func:`get_regions_coord` for many coordinates.
+
+    Note
+    ----
+    HTAP regions are not considered here, see
+    :func:`pyaerocom.helpers_landsea_masks.get_htap_regions_coords`.
+
+    Parameters
+    ----------
+    lats : ndarray
+        latitudes of coordinates
+    lons : ndarray
+        longitudes of coordinates
+    default_regs : dict, optional
+        default regions to be considered. If None,
+        :func:`get_all_default_regions` is used.
+    **add_regions
+        additional regions other than default regions, that are supposed to
+        be considered
+
+    Returns
+    -------
+    list
+        list containing the list of regions that contain each coordinate
+    """
+    regs = _get_rect_regions(default_regs, **add_regions)
+    contained = _regions_coords_matrix(lats, lons, regs)
+    names = np.asarray(list(regs), dtype=object)
+    result = []
+    for col in contained.T:
+        found = names[col].tolist()
+        result.append(found if len(found) > 0 else ['WORLD'])
+    return result
+
+def find_closest_region_coords(lats, lons, default_regs=None, **add_regions):
+    """Find regions that have their center closest to input coordinates
+
+    Vectorised version of :func:`find_closest_region_coord` for many
+    coordinates.
+
+    Note
+    ----
+    The distances of coordinates that are contained in multiple regions to
+    the region centers are computed using the haversine formula.
+
+    Parameters
+    ----------
+    lats : ndarray
+        latitudes of coordinates
+    lons : ndarray
+        longitudes of coordinates
+    default_regs : dict, optional
+        default regions to be considered. If None,
+        :func:`get_all_default_regions` is used.
+    **add_regions
+        additional regions other than default regions, that are supposed to
+        be considered
+
+    Returns
+    -------
+    list
+        names of square regions (one for each coordinate)
+    """
+    from pyaerocom.geodesy import haversine
+    lats = np.atleast_1d(np.asarray(lats, dtype=float))
+    lons = np.atleast_1d(np.asarray(lons, dtype=float))
+    regs = _get_rect_regions(default_regs, **add_regions)
+    contained = _regions_coords_matrix(lats, lons, regs)
+    names = np.asarray(list(regs) + ['WORLD'], dtype=object)
+    if len(regs) == 0:
+        return names[np.zeros(len(lats), dtype=int)].tolist()
+    dists = np.empty(contained.shape)
+    for i, reg in enumerate(regs.values()):
+        latc, lonc = reg.center_coordinate
+        dists[i] = haversine(latc, lonc, lats, lons)
+    dists[~contained] = np.inf
+    idx = np.argmin(dists, axis=0)
+    idx[~contained.any(axis=0)] = len(regs)
+    return names[idx].tolist()
+
 def valid_default_region(name):
     """Boolean specifying whether input region is valid or not"""
     if isinstance(name, str):
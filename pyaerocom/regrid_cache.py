@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Area weighted regridding using cached regridding weights
+
+Area weighted regridding between rectilinear longitude / latitude grids is
+separable, i.e. the overlap area of a source and a target grid cell is the
+product of the overlap in longitude and the overlap in (sine of) latitude.
+The regridding weights can thus be represented by 2 small overlap matrices
+(one for each axis) that only depend on the source and target grid and are
+applied to all other dimensions (e.g. all time stamps) at once via matrix
+products. The weights of recently used grid combinations are kept in memory
+(and optionally on disk, cf. :attr:`pyaerocom.const.REGRID_CACHE_DISK`), so
+that regridding many variables from the same source grid onto the same
+target grid only computes them once.
+"""
+from collections import OrderedDict as od
+import hashlib
+import os
+
+import iris
+import numpy as np
+
+from pyaerocom import const
+
+def _lat_overlap_weights(src_bounds, tgt_bounds):
+    """Overlap of latitude cells in units of sine of latitude
+
+    Parameters
+    ----------
+    src_bounds : ndarray
+        latitude bounds of source grid in degrees (shape (N, 2))
+    tgt_bounds : ndarray
+        latitude bounds of target grid in degrees (shape (M, 2))
+
+    Returns
+    -------
+    ndarray
+        overlap matrix (shape (M, N))
+    """
+    src = np.sin(np.deg2rad(np.clip(np.sort(src_bounds, axis=1), -90, 90)))
+    tgt = np.sin(np.deg2rad(np.clip(np.sort(tgt_bounds, axis=1), -90, 90)))
+    low = np.maximum(tgt[:, 0][:, np.newaxis], src[:, 0][np.newaxis, :])
+    high = np.minimum(tgt[:, 1][:, np.newaxis], src[:, 1][np.newaxis, :])
+    return np.clip(high - low, 0, None)
+
+def _lon_overlap_weights(src_bounds, tgt_bounds):
+    """Overlap of longitude cells in degrees
+
+    Considers longitude periodicity, i.e. source and target grid may use
+    different longitude conventions (e.g. 0 <= lon <= 360 and
+    -180 <= lon <= 180).
+
+    Parameters
+    ----------
+    src_bounds : ndarray
+        longitude bounds of source grid in degrees (shape (N, 2))
+    tgt_bounds : ndarray
+        longitude bounds of target grid in degrees (shape (M, 2))
+
+    Returns
+    -------
+    ndarray
+        overlap matrix (shape (M, N))
+    """
+    src = np.sort(src_bounds, axis=1)
+    tgt = np.sort(tgt_bounds, axis=1)
+    weights = np.zeros((len(tgt), len(src)))
+    for shift in (-360, 0, 360):
+        low = np.maximum(tgt[:, 0][:, np.newaxis],
+                         src[:, 0][np.newaxis, :] + shift)
+        high = np.minimum(tgt[:, 1][:, np.newaxis],
+                          src[:, 1][np.newaxis, :] + shift)
+        weights += np.clip(high - low, 0, None)
+    return weights
+
+def _make_regridded_cube(cube, target, data):
+    """Create regridded cube from source cube, target grid and data
+
+    Coordinates that span the longitude or latitude dimension of the source
+    cube (other than the dimension coordinates themselves) are dropped.
+    """
+    lat_dim = cube.coord_dims('latitude')[0]
+    lon_dim = cube.coord_dims('longitude')[0]
+    dim_coords = []
+    for coord in cube.dim_coords:
+        dim = cube.coord_dims(coord)[0]
+        if dim == lat_dim:
+            coord = target.coord('latitude')
+        elif dim == lon_dim:
+            coord = target.coord('longitude')
+        dim_coords.append((coord.copy(), dim))
+    aux_coords = []
+    for coord in cube.aux_coords:
+        dims = cube.coord_dims(coord)
+        if not lat_dim in dims and not lon_dim in dims:
+            aux_coords.append((coord.copy(), dims))
+    out = iris.cube.Cube(data, dim_coords_and_dims=dim_coords,
+                         aux_coords_and_dims=aux_coords)
+    out.metadata = cube.metadata
+    return out
+
+class RegridWeightsCache(object):
+    """Size bounded LRU cache for area weighted regridding weights
+
+    Parameters
+    ----------
+    max_num : int, optional
+        maximum number of cached grid combinations. If None, the global
+        setting :attr:`pyaerocom.const.REGRID_CACHE_MAX_NUM` is used.
+    use_disk : bool, optional
+        if True, weights are also stored in and loaded from the pyaerocom
+        cache directory (:attr:`pyaerocom.const.CACHEDIR`). If None, the
+        global setting :attr:`pyaerocom.const.REGRID_CACHE_DISK` is used.
+
+    Attributes
+    ----------
+    hits : int
+        number of successful cache lookups (memory and disk)
+    misses : int
+        number of computations of weights
+    """
+    SUBDIR = 'regrid_weights'
+
+    def __init__(self, max_num=None, use_disk=None):
+        self._max_num = max_num
+        self._use_disk = use_disk
+        self._entries = od()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_num(self):
+        """Maximum number of cached grid combinations"""
+        if self._max_num is None:
+            return const.REGRID_CACHE_MAX_NUM
+        return self._max_num
+
+    @property
+    def use_disk(self):
+        """Boolean specifying whether weights are cached on disk"""
+        if self._use_disk is None:
+            return const.REGRID_CACHE_DISK
+        return self._use_disk
+
+    @property
+    def cache_dir(self):
+        """Directory of weight files (or None, if unavailable)"""
+        basedir = const.CACHEDIR
+        if basedir is None:
+            return None
+        cache_dir = os.path.join(basedir, self.SUBDIR)
+        os.makedirs(cache_dir, exist_ok=True)
+        return cache_dir
+
+    @staticmethod
+    def can_regrid(cube, target):
+        """Check if input cubes are supported
+
+        Requires 1D longitude and latitude dimension coordinates with bounds
+        in units of degrees and the same coordinate system in both cubes.
+
+        Parameters
+        ----------
+        cube : iris.cube.Cube
+            source cube
+        target : iris.cube.Cube
+            cube specifying target grid
+
+        Returns
+        -------
+        bool
+            True, if cached regridding can be applied, else False
+        """
+        for c in (cube, target):
+            for name in ('latitude', 'longitude'):
+                try:
+                    coord = c.coord(name, dim_coords=True)
+                except iris.exceptions.CoordinateNotFoundError:
+                    return False
+                if not coord.has_bounds() or not coord.units == 'degrees':
+                    return False
+        for name in ('latitude', 'longitude'):
+            if not (cube.coord(name).coord_system ==
+                    target.coord(name).coord_system):
+                return False
+        return True
+
+    @staticmethod
+    def make_key(cube, target):
+        """Create cache key from longitude and latitude bounds of cubes"""
+        h = hashlib.sha1()
+        for c in (cube, target):
+            for name in ('latitude', 'longitude'):
+                bounds = np.asarray(c.coord(name).bounds, dtype=float)
+                h.update(str(bounds.shape).encode('utf-8'))
+                h.update(np.round(bounds, 8).tobytes())
+        return h.hexdigest()
+
+    def _load_disk(self, key):
+        cache_dir = self.cache_dir if self.use_disk else None
+        if cache_dir is None:
+            return None
+        fp = os.path.join(cache_dir, '{}.npz'.format(key))
+        if not os.path.exists(fp):
+            return None
+        try:
+            with np.load(fp) as f:
+                return (f['lat'], f['lon'])
+        except Exception as e:
+            const.print_log.warning('Ignoring invalid regrid weights file {}. '
+                                    'Reason: {}'.format(fp, repr(e)))
+            return None
+
+    def _save_disk(self, key, weights):
+        cache_dir = self.cache_dir if self.use_disk else None
+        if cache_dir is None:
+            return
+        fp = os.path.join(cache_dir, '{}.npz'.format(key))
+        tmp = '{}.{}.tmp.npz'.format(fp[:-4], os.getpid())
+        np.savez(tmp, lat=weights[0], lon=weights[1])
+        os.replace(tmp, fp)
+
+    def get_weights(self, cube, target):
+        """Get regridding weights for input grids
+
+        Parameters
+        ----------
+        cube : iris.cube.Cube
+            source cube
+        target : iris.cube.Cube
+            cube specifying target grid
+
+        Returns
+        -------
+        tuple
+            2-element tuple containing latitude and longitude overlap
+            matrices (shapes (M_lat, N_lat) and (M_lon, N_lon))
+        """
+        key = self.make_key(cube, target)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        weights = self._load_disk(key)
+        if weights is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            weights = (_lat_overlap_weights(cube.coord('latitude').bounds,
+                                            target.coord('latitude').bounds),
+                       _lon_overlap_weights(cube.coord('longitude').bounds,
+                                            target.coord('longitude').bounds))
+            self._save_disk(key, weights)
+        self._entries[key] = weights
+        while len(self._entries) > max(self.max_num, 1):
+            self._entries.popitem(last=False)
+        return weights
+
+    def regrid(self, cube, target, mdtol=0):
+        """Area weighted regridding of cube onto grid of target cube
+
+        Equivalent to :class:`iris.analysis.AreaWeighted` regridding, but
+        reuses cached weights.
+
+        Parameters
+        ----------
+        cube : iris.cube.Cube
+            source cube
+        target : iris.cube.Cube
+            cube specifying target grid
+        mdtol : float
+            tolerance of missing data. Target cells are masked if the
+            (area) fraction of masked source data exceeds this value.
+
+        Returns
+        -------
+        iris.cube.Cube
+            regridded cube
+        """
+        wlat, wlon = self.get_weights(cube, target)
+        lat_dim = cube.coord_dims('latitude')[0]
+        lon_dim = cube.coord_dims('longitude')[0]
+
+        data = cube.data
+        dtype = data.dtype
+        if not np.issubdtype(dtype, np.floating):
+            dtype = np.float64
+        mask = np.moveaxis(np.ma.getmaskarray(data), (lat_dim, lon_dim),
+                           (-2, -1))
+        vals = np.moveaxis(np.ma.getdata(data), (lat_dim, lon_dim),
+                           (-2, -1)).astype(float)
+        nans = np.isnan(vals)
+        if nans.any():
+            vals[nans] = 0
+
+        num = np.matmul(np.matmul(wlat, np.where(mask, 0, vals)), wlon.T)
+        total = np.outer(wlat.sum(axis=1), wlon.sum(axis=1))
+        wmasked = np.matmul(np.matmul(wlat, mask.astype(float)), wlon.T)
+        wvalid = total - wmasked
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out = num / wvalid
+            out_mask = (total == 0) | (wmasked / total > mdtol)
+        if nans.any():
+            nan_contrib = np.matmul(np.matmul(wlat, nans.astype(float)),
+                                    wlon.T)
+            out[nan_contrib > 0] = np.nan
+        out_mask = np.moveaxis(np.broadcast_to(out_mask, out.shape),
+                               (-2, -1), (lat_dim, lon_dim))
+        out = np.moveaxis(out, (-2, -1), (lat_dim, lon_dim)).astype(dtype)
+        if np.ma.isMaskedArray(data) or out_mask.any():
+            out = np.ma.masked_array(out, mask=out_mask)
+        return _make_regridded_cube(cube, target, out)
+
+    def clear(self):
+        """Remove all weights from (memory) cache and reset statistics"""
+        self._entries = od()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+#: Cache instance that is shared within the current process
+REGRID_CACHE = RegridWeightsCache()
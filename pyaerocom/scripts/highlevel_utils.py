@@ -14,13 +14,14 @@ import glob, os
 
 def clear_cache():
     """
-    Delete all *.pkl files in cache directory
+    Delete all cache files in cache directory
     """
     ch = CacheHandlerUngridded()
     ch.delete_all_cache_files()
 
     for f in glob.glob('{}/*'.format(const.CACHEDIR)):
-        os.remove(f)
+        if os.path.isfile(f):
+            os.remove(f)
 
 def browse_database(search_str_or_pattern):
     """
@@ -15,6 +15,7 @@ from cf_units import Unit
 from pyaerocom.conftest import (TEST_RTOL, testdata_unavail)
 from pyaerocom.colocation import (_regrid_gridded,
                                   _colocate_site_data_helper,
+                                  _resample_arr,
                                   colocate_gridded_ungridded,
                                   colocate_gridded_gridded)
 from pyaerocom.colocateddata import ColocatedData
@@ -44,6 +45,25 @@ def test__colocate_site_data_helper(aeronetsunv3lev2_subset):
                  0.07752743643132792]
     npt.assert_allclose(means, should_be, rtol=1e-5)
 
+def test__resample_arr():
+    idx = pd.date_range('2010-01-01', '2010-03-31 23:00', freq='H')
+    vals = np.arange(len(idx), dtype=float)
+    vals[::3] = np.nan
+    times = np.concatenate([idx.values, idx.values[:100]])
+    groups = np.concatenate([np.zeros(len(idx), dtype=int),
+                             np.ones(100, dtype=int)])
+    steps = [('daily', 12, 'mean'), ('monthly', 7, 'mean')]
+    groups, periods, result = _resample_arr(groups, times,
+                                            np.concatenate([vals, vals[:100]]),
+                                            steps)
+    daily = pd.Series(vals, idx).resample('D').agg(['mean', 'count'])
+    daily.loc[daily['count'] < 12, 'mean'] = np.nan
+    monthly = daily['mean'].resample('MS').mean()
+
+    npt.assert_array_equal(groups, [0, 0, 0, 1])
+    npt.assert_allclose(result[:3], monthly.values)
+    assert np.isnan(result[3])
+
 def test_colocate_gridded_ungridded_new_var(data_tm5, aeronetsunv3lev2_subset):
     data = data_tm5.copy()
     data.var_name='Blaaa'
@@ -56,6 +76,16 @@ def test_colocate_gridded_ungridded_new_var(data_tm5, aeronetsunv3lev2_subset):
 @pytest.mark.parametrize('addargs,ts_type,shape,obsmean,modmean',[
     (dict(),
      'monthly', (2,12,8), 0.315930,0.275671),
+    (dict(num_proc=2),
+     'monthly', (2,12,8), 0.315930,0.275671),
+    (dict(use_array_engine=True),
+     'monthly', (2,12,8), 0.315930,0.275671),
+    (dict(use_array_engine=True,
+          var_ref_outlier_ranges={'od550aer':[0.1,0.5]},
+          var_outlier_ranges={'od550aer':[0.1,0.2]}),
+     'monthly', (2,12,8), 0.227333,0.275671),
+    (dict(use_array_engine=True, apply_time_resampling_constraints=False),
+     'monthly', (2,12,8), 0.316924,0.275671),
     (dict(var_ref_outlier_ranges={'od550aer':[0.1,0.5]},
           var_outlier_ranges={'od550aer':[0.1,0.2]}),
      'monthly', (2,12,8), 0.227333,0.275671),
@@ -134,6 +164,25 @@ def test_colocate_gridded_gridded_same(data_tm5):
     assert stats['R'] == 1
     assert stats['R_spearman'] == 1
 
+@testdata_unavail
+@pytest.mark.parametrize('filter_name,start,stop', [
+    ('EUROPE-wMOUNTAINS', None, None),
+    ('WORLD-wMOUNTAINS', '2010-03-01', '2010-05-31'),
+    ('EUROPE-wMOUNTAINS', '2010-03-01', '2010-05-31'),
+    ])
+def test_colocate_gridded_gridded_precrop(data_tm5, filter_name, start,
+                                          stop):
+    data = data_tm5.regrid(lat_res_deg=5, lon_res_deg=5)
+    coldata = colocate_gridded_gridded(data, data_tm5,
+                                       filter_name=filter_name,
+                                       start=start, stop=stop)
+    # colocate global data and crop afterwards
+    coldata_all = colocate_gridded_gridded(data, data_tm5)
+    sub = coldata_all.data.sel(latitude=coldata.data.latitude,
+                               longitude=coldata.data.longitude,
+                               time=coldata.data.time)
+    npt.assert_allclose(coldata.data.values, sub.values)
+
 @testdata_unavail
 def test_read_emep_colocate_emep_tm5(data_tm5, path_emep):
     filepath = path_emep['monthly']
@@ -27,6 +27,35 @@ def test_get_country_info_coords(coords, countries):
 def test_haversine():
     npt.assert_allclose(geodesy.haversine(0, 15, 0, 16), 111.2, atol=0.1)
 
+def test_calc_latlon_dists():
+    dists = geodesy.calc_latlon_dists(0, 15, [(0, 16), (0, 15), (1, 15)])
+    npt.assert_allclose(dists, [111.2, 0, 111.2], atol=0.1)
+
+@pytest.mark.parametrize('lat,lon,radius,result', [
+    (0, 15.1, 50, [0]),
+    (0, 15.6, 100, [1, 0]),
+    (0, 15.5, 10, []),
+    ([0, 10], [15.1, 15], 50, [[0], [2]])
+    ])
+def test_spatial_index_query_radius(lat, lon, radius, result):
+    idx = geodesy.SpatialIndex([0, 0, 10], [15, 16, 15])
+    val = idx.query_radius(lat, lon, radius)
+    if isinstance(lat, list):
+        for i, res in enumerate(result):
+            npt.assert_array_equal(val[i], res)
+    else:
+        npt.assert_array_equal(val, result)
+        latlons = list(zip(idx.lats, idx.lons))
+        npt.assert_array_equal(
+            geodesy.find_coord_indices_within_distance(lat, lon, latlons,
+                                                       radius), result)
+
+def test_spatial_index_query_nearest():
+    idx = geodesy.SpatialIndex([0, 0, 10], [15, 16, 15])
+    dist, i = idx.query_nearest(0, 15.9)
+    assert i == 1
+    npt.assert_allclose(dist, geodesy.haversine(0, 15.9, 0, 16))
+
 def test_is_within_radius_km():
     assert geodesy.is_within_radius_km(0, 15, 0, 16, 1000, 111.2)
 
@@ -10,7 +10,8 @@ import pytest
 import os
 import numpy.testing as npt
 from datetime import datetime
-from pyaerocom.conftest import TEST_RTOL, testdata_unavail
+from pyaerocom.conftest import (TEST_RTOL, TESTDATADIR, CHECK_PATHS,
+                                 testdata_unavail)
 from pyaerocom import GriddedData
 
 TESTLATS =  [-10, 20]
@@ -112,6 +113,74 @@ def test_to_time_series(data_tm5):
     npt.assert_array_equal(lons_actual, lonsm)
     npt.assert_allclose(means_actual, [0.101353, 0.270886], rtol=TEST_RTOL)
 
+@testdata_unavail
+def test_nearest_latlon_index(data_tm5):
+    stat_idx, lat_idx, lon_idx = data_tm5.nearest_latlon_index(TESTLATS,
+                                                               TESTLONS)
+    npt.assert_array_equal(stat_idx, [0, 1])
+    npt.assert_array_equal(data_tm5.latitude.points[lat_idx], [-9, 21])
+    npt.assert_array_equal(data_tm5.longitude.points[lon_idx], [-118.5, 70.5])
+
+    arr, _ = data_tm5.extract_nearest_latlon_arr(TESTLATS, TESTLONS)
+    assert arr.shape == (12, 2)
+    npt.assert_allclose(arr.mean(axis=0), [0.101353, 0.270886],
+                        rtol=TEST_RTOL)
+
+@testdata_unavail
+def test_extract_nearest_latlon_arr_lazy(data_tm5):
+    from pyaerocom import const
+    data = GriddedData(TESTDATADIR.joinpath(CHECK_PATHS['tm5aod']))
+    mode = const.GRIDDED_LAZY_MODE
+    try:
+        const.GRIDDED_LAZY_MODE = True
+        assert data.lazy_mode
+        arr, stat_idx = data.extract_nearest_latlon_arr(TESTLATS, TESTLONS)
+        assert data.is_lazy
+    finally:
+        const.GRIDDED_LAZY_MODE = mode
+    arr_ref, stat_idx_ref = data_tm5.extract_nearest_latlon_arr(TESTLATS,
+                                                                TESTLONS)
+    npt.assert_array_equal(stat_idx, stat_idx_ref)
+    npt.assert_allclose(arr, arr_ref, rtol=TEST_RTOL)
+
+def _make_lazy_4d(shape=(4, 3, 4, 5)):
+    import iris
+    import numpy as np
+    import dask.array as da
+    from iris.coords import DimCoord
+    from cf_units import Unit
+    time = DimCoord(np.arange(shape[0]), var_name='time',
+                    standard_name='time',
+                    units=Unit('days since 2010-01-01', calendar='gregorian'))
+    lat = DimCoord(np.linspace(-45, 45, shape[1]), var_name='lat',
+                   standard_name='latitude', units='degrees')
+    lon = DimCoord(np.linspace(-90, 90, shape[2]), var_name='lon',
+                   standard_name='longitude', units='degrees')
+    lev = DimCoord(np.arange(shape[3]), var_name='lev',
+                   long_name='model level number', units='1')
+    arr = np.random.RandomState(42).uniform(size=shape)
+    cube = iris.cube.Cube(da.from_array(arr, chunks=(2,) + shape[1:]),
+                          var_name='od550aer', units='1',
+                          dim_coords_and_dims=[(time, 0), (lat, 1),
+                                               (lon, 2), (lev, 3)])
+    return GriddedData(cube), arr
+
+def test_collapse_vertical_lazy():
+    from pyaerocom import const
+    data, arr = _make_lazy_4d()
+    mode = const.GRIDDED_LAZY_MODE
+    try:
+        const.GRIDDED_LAZY_MODE = True
+        assert data.lazy_mode
+        collapsed = data._apply_vert_scheme(sample_points=[],
+                                            vert_scheme='mean')
+        assert collapsed.is_lazy
+        assert data.is_lazy
+    finally:
+        const.GRIDDED_LAZY_MODE = mode
+    assert collapsed.shape == arr.shape[:3]
+    npt.assert_allclose(collapsed.grid.data, arr.mean(axis=3), rtol=1e-10)
+
 @testdata_unavail
 def test_change_baseyear(data_tm5):
     cp = data_tm5.copy()
@@ -127,6 +196,31 @@ def test_change_baseyear(data_tm5):
 def test_mean(data_tm5,kwargs,result):
     npt.assert_allclose(data_tm5.mean(**kwargs), result)
 
+@testdata_unavail
+def test_size_GB(data_tm5):
+    itemsize = data_tm5.grid.dtype.itemsize
+    npt.assert_allclose(data_tm5._size_GB, 12*90*120*itemsize/1e9)
+
+@testdata_unavail
+def test_lazy_mode():
+    from pyaerocom import const
+    data = GriddedData(TESTDATADIR.joinpath(CHECK_PATHS['tm5aod']))
+    mode = const.GRIDDED_LAZY_MODE
+    try:
+        assert data.is_lazy
+        const.GRIDDED_LAZY_MODE = None
+        assert not data.lazy_mode
+        const.GRIDDED_LAZY_MODE = True
+        assert data.lazy_mode
+        data.rechunk_time(chunk_mb=data._size_GB*1e3/2.9)
+        assert data.grid.lazy_data().chunks == ((4, 4, 4), (90,), (120,))
+        data.remove_outliers(0, 1, inplace=True)
+        assert data.is_lazy
+        assert data.grid.data.max() <= 1
+        assert not data.lazy_mode
+    finally:
+        const.GRIDDED_LAZY_MODE = mode
+
 if __name__=="__main__":
     import sys
     pytest.main(sys.argv)
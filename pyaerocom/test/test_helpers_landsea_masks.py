@@ -54,6 +54,21 @@ def test_get_mask_value():
     assert lsm.get_mask_value(50, 5, mask)
     assert not lsm.get_mask_value(50, 15, mask)
 
+def test_check_coords_in_region_mask():
+    lats, lons = [50, 50, 45.03, -10], [5, 15, 1.97, 170]
+    mask = lsm.load_region_mask_xr('WEUROPE')
+    desired = [lsm.get_mask_value(lat, lon, mask) >= 1
+               for lat, lon in zip(lats, lons)]
+    lsm.clear_region_mask_cache()
+    assert lsm.check_coords_in_region_mask(lats, lons,
+                                           'WEUROPE').tolist() == desired
+    assert 'WEUROPE' in lsm._MASK_ARR_CACHE
+
+def test_get_htap_regions_coords():
+    result = lsm.get_htap_regions_coords([50, 50], [5, 15], 'WEUROPE')
+    assert list(result) == ['WEUROPE']
+    assert result['WEUROPE'].tolist() == [True, False]
+
 def test_check_all_htap_available():
     should_be =['EAShtap.0.1x0.1deg.nc', 'EEUROPEhtap.0.1x0.1deg.nc',
                 'EURhtap.0.1x0.1deg.nc', 'LANDhtap.0.1x0.1deg.nc',
@@ -4,6 +4,7 @@
 Tests for _lowlevel_helpers.py module of pyaerocom
 """
 import pytest
+import numpy as np
 import numpy.testing as npt
 import pyaerocom.mathutils as mu
 
@@ -27,6 +28,49 @@ def test_vmrx_to_concx(inputval, p, T, vmr_unit, mmol_var,
                            to_unit)
     npt.assert_allclose(val, desired, rtol=1e-4)
 
+@pytest.mark.parametrize('num_array, values, modulus, desired', [
+    ([0, 1, 2, 3], [-1, 0.4, 0.5, 2.6, 10], None, [0, 0, 1, 3, 3]),
+    ([3, 2, 1, 0], [-1, 0.4, 0.5, 2.6, 10], None, [3, 3, 2, 0, 0]),
+    ([-180, -90, 0, 90], [170, -170, 359, 100], 360, [0, 0, 2, 3]),
+    ])
+def test_closest_indices_sorted(num_array, values, modulus, desired):
+    val = mu.closest_indices_sorted(num_array, values, modulus)
+    npt.assert_array_equal(val, desired)
+
+@pytest.mark.parametrize('lowlim, highlim', [
+    (None, None), (0, None), (None, 2)
+    ])
+def test_calc_statistics_multi(lowlim, highlim):
+    rng = np.random.RandomState(42)
+    arr = rng.normal(1, 1, (2, 30, 5)).round(1)
+    arr[rng.rand(*arr.shape) < 0.3] = np.nan
+    arr[:, :, 3] = np.nan
+    arr[:, 1:, 4] = np.nan
+    result = mu.calc_statistics_multi(arr, lowlim=lowlim, highlim=highlim,
+                                      min_num_valid=2, as_list=True)
+    for i, stats in enumerate(result):
+        desired = mu.calc_statistics(arr[1, :, i], arr[0, :, i],
+                                     lowlim=lowlim, highlim=highlim,
+                                     min_num_valid=2)
+        assert sorted(stats) == sorted(desired)
+        for key, val in desired.items():
+            npt.assert_allclose(stats[key], val, rtol=1e-10)
+
+def test__kendall_multi_long_series():
+    rng = np.random.RandomState(42)
+    num = mu.KENDALL_MULTI_MAX_LEN + 50
+    x = rng.normal(1, 1, (num, 4)).round(1)
+    y = (x + rng.normal(0, 1, x.shape)).round(1)
+    valid = rng.rand(*x.shape) > 0.2
+    valid[:, 3] = False
+    valid[0, 3] = True
+    # long series are computed station by station
+    result = mu._kendall_multi(x, y, valid)
+    npt.assert_allclose(result, mu._kendall_multi(x, y, valid,
+                                                  max_len=num),
+                        rtol=1e-10)
+    assert np.isnan(result[3])
+
 if __name__ == '__main__':
     import sys
     pytest.main(sys.argv)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for region.py module of pyaerocom
+"""
+import pytest
+import numpy as np
+from pyaerocom import region
+
+LATS = [50, 30, 22, -30, 0, 85]
+LONS = [10, 110, 80, 140, -30, 0]
+
+def test_contains_coordinates():
+    reg = region.Region('EUROPE')
+    desired = [reg.contains_coordinate(lat, lon)
+               for lat, lon in zip(LATS, LONS)]
+    assert reg.contains_coordinates(LATS, LONS).tolist() == desired
+
+def test_get_regions_coords():
+    result = region.get_regions_coords(LATS, LONS)
+    for lat, lon, regs in zip(LATS, LONS, result):
+        assert regs == region.get_regions_coord(lat, lon)
+
+def test_find_closest_region_coords():
+    result = region.find_closest_region_coords(np.asarray(LATS),
+                                               np.asarray(LONS))
+    for lat, lon, reg in zip(LATS, LONS, result):
+        assert reg == region.find_closest_region_coord(lat, lon)
+
+if __name__ == '__main__':
+    import sys
+    pytest.main(sys.argv)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for area weighted regridding using cached weights
+"""
+import pytest
+import numpy as np
+import numpy.testing as npt
+import iris
+from pyaerocom.conftest import testdata_unavail
+from pyaerocom.helpers import make_dummy_cube_latlon
+from pyaerocom.regrid_cache import (RegridWeightsCache,
+                                    _lat_overlap_weights,
+                                    _lon_overlap_weights)
+
+def test__lat_overlap_weights():
+    src = np.array([[-90, 0], [0, 90]])
+    tgt = np.array([[-90, 90]])
+    npt.assert_allclose(_lat_overlap_weights(src, tgt), [[1, 1]])
+
+def test__lon_overlap_weights():
+    # source in 0 <= lon <= 360, target in -180 <= lon <= 180
+    src = np.array([[0, 180], [180, 360]])
+    tgt = np.array([[-180, -90], [-90, 0], [0, 180]])
+    npt.assert_allclose(_lon_overlap_weights(src, tgt),
+                        [[0, 90], [0, 90], [180, 0]])
+
+@testdata_unavail
+@pytest.mark.parametrize('res_deg', [5, 1])
+def test_regrid(data_tm5, res_deg):
+    cube = data_tm5.grid.copy()
+    cube.data = np.ma.masked_greater(cube.data, 0.5)
+    target = make_dummy_cube_latlon(lat_res_deg=res_deg,
+                                    lon_res_deg=res_deg)
+    for c in (cube, target):
+        for name in ('latitude', 'longitude'):
+            if not c.coord(name).has_bounds():
+                c.coord(name).guess_bounds()
+    cache = RegridWeightsCache(max_num=1, use_disk=False)
+    assert cache.can_regrid(cube, target)
+    result = cache.regrid(cube, target)
+    expected = cube.regrid(target, iris.analysis.AreaWeighted())
+    assert result.shape == expected.shape
+    npt.assert_array_equal(np.ma.getmaskarray(result.data),
+                           np.ma.getmaskarray(expected.data))
+    npt.assert_allclose(result.data.filled(np.nan),
+                        expected.data.filled(np.nan), rtol=1e-5)
+    cache.regrid(cube, target)
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+
+if __name__ == '__main__':
+    import sys
+    pytest.main(sys.argv)
@@ -10,8 +10,10 @@ import numpy.testing as npt
 import os
 import pytest
 from pyaerocom import UngriddedData
+from pyaerocom.ungriddeddata import (_index_compress, _index_len,
+                                     _index_shift)
 from pyaerocom.conftest import testdata_unavail, rg_unavail
-from pyaerocom.exceptions import DataCoverageError
+from pyaerocom.exceptions import DataCoverageError, StationNotFoundError
 
 @pytest.fixture(scope='module')
 def ungridded_empty():
@@ -67,6 +69,65 @@ def test_coordinate_access():
     npt.assert_array_equal(c['longitude'], lons)
     npt.assert_array_equal(c['altitude'], alts)
 
+def test_meta_lookup():
+    d = UngriddedData()
+    names = ['b', 'a', 'b', 'c']
+    for i, name in enumerate(names):
+        d.metadata[float(i)] = dict(data_id='testcase', station_name=name)
+        d.meta_idx[float(i)] = dict(od550aer=slice(i, i+1))
+
+    assert d.unique_station_names == ['a', 'b', 'c']
+    assert d.nonunique_station_names == ['b']
+    assert d.contains_datasets == ['testcase']
+    assert d.find_station_meta_indices('b', False) == [0.0, 2.0]
+    assert d.find_station_meta_indices('[ab]') == [0.0, 1.0, 2.0]
+    assert d.find_var_meta_indices('od550aer') == [0.0, 1.0, 2.0, 3.0]
+
+    # metadata added directly is recognised
+    d.metadata[4.0] = dict(data_id='testcase', station_name='d')
+    d.meta_idx[4.0] = dict(od550aer=np.arange(4, 5))
+    assert d.unique_station_names == ['a', 'b', 'c', 'd']
+
+    # blocks without data_id are not listed in contains_datasets
+    d.metadata[5.0] = dict(station_name='e')
+    assert d.contains_datasets == ['testcase']
+
+def test_invalidate_meta_lookup():
+    d = UngriddedData()
+    for i, name in enumerate(['a', 'b']):
+        d.metadata[float(i)] = dict(data_id='testcase', station_name=name)
+        d.meta_idx[float(i)] = dict(od550aer=slice(i, i+1))
+    assert d.find_station_meta_indices('a') == [0.0]
+
+    # rename station in place
+    d.metadata[0.0]['station_name'] = 'c'
+    d.metadata[1.0]['data_id'] = 'other'
+    d.invalidate_meta_lookup()
+    assert d.unique_station_names == ['b', 'c']
+    assert d.find_station_meta_indices('c') == [0.0]
+    assert d.contains_datasets == ['testcase', 'other']
+    with pytest.raises(StationNotFoundError):
+        d.find_station_meta_indices('a')
+
+@pytest.mark.parametrize('idx,result,num', [
+    (np.arange(3, 7), slice(3, 7), 4),
+    ([], slice(0, 0), 0),
+    (slice(1, 2), slice(1, 2), 1),
+    (np.asarray([1, 2, 4]), np.asarray([1, 2, 4]), 3),
+    (np.asarray([2, 1, 0]), np.asarray([2, 1, 0]), 3),
+    ])
+def test_index_compress(idx, result, num):
+    val = _index_compress(idx)
+    if isinstance(result, slice):
+        assert val == result
+    else:
+        npt.assert_array_equal(val, result)
+    assert _index_len(val) == num
+
+def test_index_shift():
+    assert _index_shift(slice(0, 3), 5) == slice(5, 8)
+    npt.assert_array_equal(_index_shift(np.asarray([1, 3]), 2), [3, 5])
+
 @testdata_unavail
 def test_check_index_aeronet_subset(aeronetsunv3lev2_subset):
     aeronetsunv3lev2_subset._check_index()
@@ -124,6 +185,39 @@ def test_from_cache(aeronetsunv3lev2_subset, tempdir):
 
     assert reloaded.shape == aeronetsunv3lev2_subset.shape
 
+@testdata_unavail
+def test_to_station_data_all_bulk(aeronetsunv3lev2_subset):
+    data = aeronetsunv3lev2_subset
+    bulk = data.to_station_data_all('od550aer', bulk=True)
+    single = data.to_station_data_all('od550aer', bulk=False)
+
+    assert bulk['station_name'] == single['station_name']
+    assert len(bulk['failed']) == len(single['failed'])
+    for stat0, stat1 in zip(bulk['stats'], single['stats']):
+        npt.assert_array_equal(stat0.dtime, stat1.dtime)
+        npt.assert_array_equal(stat0.od550aer.values, stat1.od550aer.values)
+
+@testdata_unavail
+def test_concatenate(aeronetsunv3lev2_subset):
+    data = aeronetsunv3lev2_subset
+    shape = data.shape
+    merged = data.merge(data.copy(), new_obj=True)
+    concat = UngriddedData.concatenate([UngriddedData(), data, data])
+
+    assert data.shape == shape
+    assert concat.shape == merged.shape
+    assert list(concat.metadata.keys()) == list(merged.metadata.keys())
+    assert concat.var_idx == merged.var_idx
+    npt.assert_array_equal(concat._data[:, concat._DATAINDEX],
+                           merged._data[:, merged._DATAINDEX])
+
+@testdata_unavail
+def test_concatenate_single(aeronetsunv3lev2_subset):
+    data = aeronetsunv3lev2_subset
+    # single object with data is not copied
+    assert UngriddedData.concatenate([data]) is data
+    assert UngriddedData.concatenate([UngriddedData(), data]) is data
+
 def test_check_unit(data_scat_jungfraujoch):
     data_scat_jungfraujoch.check_unit('sc550aer', unit='1/Mm')
     from pyaerocom.exceptions import MetaDataError
@@ -29,7 +29,8 @@ class TimeResampler(object):
     def __init__(self, input_data=None):
         self.last_setup = None
         self._input_data = None
-        self.input_data = input_data
+        if input_data is not None:
+            self.input_data = input_data
         self.valid_base_ts_types = [x for x in const.GRID_IO.TS_TYPES if
                                     TsType(x).mulfac==1]
 
@@ -25,8 +25,49 @@ from pyaerocom.helpers import (same_meta_dict,
 
 from pyaerocom.metastandards import StationMetaData
 
-from pyaerocom.helpers_landsea_masks import (load_region_mask_xr,
-                                             get_mask_value)
+from pyaerocom.helpers_landsea_masks import check_coords_in_region_mask
+
+def _index_len(idx):
+    """Number of data rows of one entry in :attr:`UngriddedData.meta_idx`"""
+    if isinstance(idx, slice):
+        return idx.stop - idx.start
+    return len(idx)
+
+def _index_to_arr(idx):
+    """Convert entry in :attr:`UngriddedData.meta_idx` into index array"""
+    if isinstance(idx, slice):
+        return np.arange(idx.start, idx.stop)
+    return np.asarray(idx, dtype=int)
+
+def _index_shift(idx, offset):
+    """Shift entry in :attr:`UngriddedData.meta_idx` by input row offset"""
+    if isinstance(idx, slice):
+        return slice(idx.start + offset, idx.stop + offset)
+    return np.asarray(idx, dtype=int) + offset
+
+def _index_compress(idx):
+    """Convert index array into slice if it covers a contiguous range of rows
+
+    Parameters
+    ----------
+    idx : slice or list or ndarray
+        row indices
+
+    Returns
+    -------
+    slice or ndarray
+        slice(start, stop) if input indices are contiguous and ascending,
+        else, index array
+    """
+    if isinstance(idx, slice):
+        return idx
+    idx = np.asarray(idx, dtype=int)
+    if len(idx) == 0:
+        return slice(0, 0)
+    start, stop = int(idx[0]), int(idx[-1]) + 1
+    if stop - start == len(idx) and (np.diff(idx) == 1).all():
+        return slice(start, stop)
+    return idx
 
 class UngriddedData(object):
     """Class representing point-cloud data (ungridded)
@@ -69,8 +110,9 @@ class UngriddedData(object):
         dictionary containing index mapping for each station and variable. Keys
         correspond to metadata key (float -> station, see :attr:`metadata`) and
         values are dictionaries containing keys specifying variable name and
-        corresponding values are arrays or lists, specifying indices (rows) of
-        these station / variable information in :attr:`_data`. Note: this
+        corresponding values are slices (start, stop) or, for non-contiguous
+        data blocks, index arrays, specifying the rows of these station /
+        variable information in :attr:`_data`. Note: this
         information is redunant and is there to accelarate station data
         extraction since the data index matches for a given metadata block
         do not need to be searched in the underlying numpy array.
@@ -88,7 +130,7 @@ class UngriddedData(object):
 
     """
     #: version of class (for caching)
-    __version__ = '0.21'
+    __version__ = '0.22'
 
     #: default number of rows that are dynamically added if total number of
     #: data rows is reached.
@@ -143,6 +185,10 @@ class UngriddedData(object):
 
         self.filter_hist = od()
 
+        # lookup tables for metadata blocks (built on demand, see
+        # _get_meta_lookup)
+        self._meta_lookup = None
+
     def _get_data_revision_helper(self, data_id):
         rev = None
         for meta in self.metadata.values():
@@ -190,7 +236,7 @@ class UngriddedData(object):
 
             var_idx = self.meta_idx[idx]
             for var, indices in var_idx.items():
-                if len(indices) == 0:
+                if _index_len(indices) == 0:
                     continue # no data assigned for this metadata index
 
                 assert var in meta['var_info'], \
@@ -312,7 +358,7 @@ class UngriddedData(object):
                 var_info = stat['var_info'][var]
                 metadata[meta_key]['var_info'][var] = od()
                 metadata[meta_key]['var_info'][var].update(var_info)
-                meta_idx[meta_key][var] = np.arange(start, stop)
+                meta_idx[meta_key][var] = slice(start, stop)
 
                 idx += num_times
 
@@ -426,12 +472,8 @@ class UngriddedData(object):
     @property
     def contains_datasets(self):
         """List of all datasets in this object"""
-        datasets = []
-        for info in self.metadata.values():
-            ds = info['data_id']
-            if not ds in datasets:
-                datasets.append(ds)
-        return datasets
+        return [data_id for data_id in self._get_meta_lookup()['data_id']
+                if data_id is not None]
 
     @property
     def contains_instruments(self):
@@ -531,14 +573,13 @@ class UngriddedData(object):
     @property
     def unique_station_names(self):
         """List of unique station names"""
-        return sorted(list(dict.fromkeys(self.station_name)))
+        return sorted(self._get_meta_lookup()['station_name'].keys())
 
     @property
     def nonunique_station_names(self):
         """List of station names that occur more than once in metadata"""
-        import collections
-        lst = self.station_name
-        return [item for item, count in collections.Counter(lst).items() if count > 1]
+        lookup = self._get_meta_lookup()['station_name']
+        return [name for name, idx in lookup.items() if len(idx) > 1]
 
     @property
     def time(self):
@@ -574,6 +615,92 @@ class UngriddedData(object):
         self._data = np.append(self._data, chunk, axis=0)
         logger.info("adding chunk, new array size ({})".format(self._data.shape))
 
+    def _meta_lookup_state(self):
+        """Helper to check whether metadata lookup tables are up to date"""
+        return (id(self.metadata), len(self.metadata),
+                id(self.meta_idx), len(self.meta_idx))
+
+    def invalidate_meta_lookup(self):
+        """Invalidate metadata lookup tables (rebuilt on next access)
+
+        The lookup tables used for fast access to metadata blocks (e.g. by
+        station name, data ID or variable) are only recreated automatically
+        if metadata blocks are added or removed. This method needs to be
+        called after metadata blocks have been modified in place (e.g. after
+        renaming a station, changing the `data_id` or the variables of a
+        metadata block).
+        """
+        self._meta_lookup = None
+
+    def _meta_lookup_valid(self):
+        """Check if metadata lookup tables exist and are up to date"""
+        lookup = getattr(self, '_meta_lookup', None)
+        return (lookup is not None and
+                lookup['state'] == self._meta_lookup_state())
+
+    def _add_to_meta_lookup(self, meta_keys):
+        """Register metadata blocks in lookup tables
+
+        Parameters
+        ----------
+        meta_keys : iterable
+            metadata indices that are supposed to be added
+        """
+        lookup = self._meta_lookup
+        names = lookup['station_name']
+        data_ids = lookup['data_id']
+        var_names = lookup['var_name']
+        position = lookup['position']
+        for meta_key in meta_keys:
+            meta = self.metadata[meta_key]
+            position[meta_key] = len(position)
+            name = meta['station_name'] if 'station_name' in meta else np.nan
+            if not name in names:
+                names[name] = []
+            names[name].append(meta_key)
+
+            data_id = meta['data_id'] if 'data_id' in meta else None
+            if not data_id in data_ids:
+                data_ids[data_id] = []
+            data_ids[data_id].append(meta_key)
+
+            if meta_key in self.meta_idx:
+                for var, indices in self.meta_idx[meta_key].items():
+                    if _index_len(indices) == 0:
+                        continue
+                    if not var in var_names:
+                        var_names[var] = []
+                    var_names[var].append(meta_key)
+        lookup['state'] = self._meta_lookup_state()
+
+    def _get_meta_lookup(self):
+        """Get lookup tables for metadata blocks
+
+        The lookup tables are created on first access and are recreated if
+        metadata blocks were added to or removed from :attr:`metadata` or
+        :attr:`meta_idx` since (methods that add metadata blocks, such as
+        :func:`append`, update the tables directly). In place modifications
+        of existing metadata blocks are not detected, see
+        :func:`invalidate_meta_lookup`.
+
+        Returns
+        -------
+        dict
+            dictionary with keys `station_name`, `data_id` and `var_name`,
+            each of which is a dictionary that maps all available values
+            (e.g. station names) to lists of corresponding metadata indices.
+            Key `position` maps each metadata index to its position in
+            :attr:`metadata`.
+        """
+        if not self._meta_lookup_valid():
+            self._meta_lookup = dict(station_name=od(),
+                                     data_id=od(),
+                                     var_name=od(),
+                                     position={},
+                                     state=None)
+            self._add_to_meta_lookup(self.metadata.keys())
+        return self._meta_lookup
+
     def _find_station_indices_wildcards(self, station_str):
         """Find indices of all metadata blocks matching input station name
 
@@ -593,10 +720,16 @@ class UngriddedData(object):
         StationNotFoundError
             if no such station exists in this data object
         """
-        idx = []
-        for i, meta in self.metadata.items():
-            if fnmatch.fnmatch(meta['station_name'], station_str):
-                idx.append(i)
+        lookup = self._get_meta_lookup()
+        if not any([x in station_str for x in '*?[']):
+            idx = list(lookup['station_name'].get(station_str, []))
+        else:
+            idx = []
+            for name, meta_keys in lookup['station_name'].items():
+                if isinstance(name, str) and fnmatch.fnmatch(name,
+                                                             station_str):
+                    idx.extend(meta_keys)
+            idx = sorted(idx, key=lookup['position'].get)
         if len(idx) == 0:
             raise StationNotFoundError('No station available in UngriddedData '
                                        'that matches pattern {}'
@@ -622,15 +755,36 @@ class UngriddedData(object):
         StationNotFoundError
             if no such station exists in this data object
         """
-        idx = []
-        for i, meta in self.metadata.items():
-            if meta['station_name'] == station_str:
-                idx.append(i)
-        if len(idx) == 0:
+        lookup = self._get_meta_lookup()['station_name']
+        if not station_str in lookup:
             raise StationNotFoundError('No station available in UngriddedData '
                                        'that matches name {}'
                                        .format(station_str))
-        return idx
+        return list(lookup[station_str])
+
+    def find_var_meta_indices(self, var_name):
+        """Find indices of all metadata blocks that contain data of a variable
+
+        Parameters
+        ----------
+        var_name : str
+            variable name
+
+        Returns
+        -------
+        list
+            list of metadata indices
+
+        Raises
+        ------
+        VarNotAvailableError
+            if none of the metadata blocks contains data of input variable
+        """
+        lookup = self._get_meta_lookup()['var_name']
+        if not var_name in lookup:
+            raise VarNotAvailableError('No data available for variable {}'
+                                       .format(var_name))
+        return list(lookup[var_name])
 
     def _get_stat_coords(self):
         meta_idx = []
@@ -737,7 +891,7 @@ class UngriddedData(object):
                         merge_if_multi=True, merge_pref_attr=None,
                         merge_sort_by_largest=True, insert_nans=False,
                         allow_wildcards_station_name=True,
-                        **kwargs):
+                        data_blocks=None, **kwargs):
         """Convert data from one station to :class:`StationData`
 
         Todo
@@ -784,6 +938,11 @@ class UngriddedData(object):
             pattern), metadata matches will be identified applying wildcard
             matches between input `meta_idx` and all station names in this
             object.
+        data_blocks : dict, optional
+            data of all metadata blocks and variables, sorted by time, as
+            returned by :func:`_presort_data_blocks`. Used in
+            :func:`to_station_data_all`, to avoid indexing the data array
+            for each station individually.
 
         Returns
         -------
@@ -822,7 +981,8 @@ class UngriddedData(object):
             try:
                 stat = self._metablock_to_stationdata(idx,
                                                       vars_to_convert,
-                                                      start, stop)
+                                                      start, stop,
+                                                      data_blocks)
                 stats.append(stat)
             except (VarNotAvailableError, DataCoverageError) as e:
                 logger.info('Skipping meta index {}. Reason: {}'
@@ -893,8 +1053,52 @@ class UngriddedData(object):
 
     ### TODO: check if both `variables` and `var_info` attrs are required in
     ### metdatda blocks
+    def _presort_data_blocks(self, vars_to_convert=None):
+        """Sort data array by metadata block, variable and time
+
+        Extracts all data rows of the input variables from the data array
+        at once, sorted by metadata block, variable and time, and splits
+        the result into views for each metadata block and variable.
+
+        Parameters
+        ----------
+        vars_to_convert : list, optional
+            variables to be considered. If None, all variables are used.
+
+        Returns
+        -------
+        dict
+            nested dictionary containing the data subsets (views of one
+            sorted array) for each metadata index (1. level) and variable
+            (2. level).
+        """
+        if vars_to_convert is None:
+            vars_to_convert = self.contains_vars
+        elif isinstance(vars_to_convert, str):
+            vars_to_convert = [vars_to_convert]
+        keys, indices = [], []
+        for meta_idx, var_indices in self.meta_idx.items():
+            for var, idx in var_indices.items():
+                if var in vars_to_convert and _index_len(idx) > 0:
+                    keys.append((meta_idx, var))
+                    indices.append(_index_to_arr(idx))
+        blocks = {}
+        if len(keys) == 0:
+            return blocks
+        lens = np.asarray([len(idx) for idx in indices])
+        rows = np.concatenate(indices)
+        groups = np.repeat(np.arange(len(lens)), lens)
+        order = np.lexsort((self._data[rows, self._TIMEINDEX], groups))
+        data = self._data[rows[order]]
+        for (meta_idx, var), subset in zip(keys,
+                                           np.split(data, np.cumsum(lens)[:-1])):
+            if not meta_idx in blocks:
+                blocks[meta_idx] = {}
+            blocks[meta_idx][var] = subset
+        return blocks
+
     def _metablock_to_stationdata(self, meta_idx, vars_to_convert,
-                                  start=None, stop=None):
+                                  start=None, stop=None, data_blocks=None):
         """Convert one metadata index to StationData (helper method)
 
         See :func:`to_station_data` for input parameters
@@ -955,28 +1159,44 @@ class UngriddedData(object):
         FOUND_ONE = False
         for var in vars_avail:
 
-            # get indices of this variable
-            var_idx = self.meta_idx[meta_idx][var]
+            if data_blocks is not None:
+                # get subset (sorted by time)
+                try:
+                    subset = data_blocks[meta_idx][var]
+                except KeyError:
+                    subset = self._data[:0]
+                dtime = subset[:, self._TIMEINDEX].astype('datetime64[s]')
+                first, last = 0, len(dtime)
+                if start is not None:
+                    first = np.searchsorted(dtime, start, side='left')
+                if stop is not None:
+                    last = np.searchsorted(dtime, stop, side='right')
+                tmask = slice(first, max(first, last))
+                numvalid = tmask.stop - tmask.start
+            else:
+                # get indices of this variable
+                var_idx = self.meta_idx[meta_idx][var]
 
-            # vector of timestamps corresponding to this variable
-            dtime = self._data[var_idx,
-                               self._TIMEINDEX].astype('datetime64[s]')
+                # vector of timestamps corresponding to this variable
+                dtime = self._data[var_idx,
+                                   self._TIMEINDEX].astype('datetime64[s]')
 
-            # get subset
-            subset = self._data[var_idx]
+                # get subset
+                subset = self._data[var_idx]
 
-            # make sure to extract only valid timestamps
-            if start is None:
-                start = dtime.min()
-            if stop is None:
-                stop = dtime.max()
+                # make sure to extract only valid timestamps
+                if start is None:
+                    start = dtime.min()
+                if stop is None:
+                    stop = dtime.max()
 
-            # create access mask for valid time stamps
-            tmask = np.logical_and(dtime >= start,
-                                   dtime <= stop)
+                # create access mask for valid time stamps
+                tmask = np.logical_and(dtime >= start,
+                                       dtime <= stop)
+                numvalid = tmask.sum()
 
             # make sure there is some valid data
-            if tmask.sum() == 0:
+            if numvalid == 0:
                 logger.info('Ignoring station {}, var {} ({}): '
                             'no data available in specified time interval '
                             '{} - {}'.format(sd['station_name'],
@@ -1068,7 +1288,7 @@ class UngriddedData(object):
 
     def to_station_data_all(self, vars_to_convert=None, start=None, stop=None,
                             freq=None, by_station_name=True,
-                            ignore_index=None, **kwargs):
+                            ignore_index=None, bulk=True, **kwargs):
         """Convert all data to :class:`StationData` objects
 
         Creates one instance of :class:`StationData` for each metadata block in
@@ -1091,6 +1311,11 @@ class UngriddedData(object):
         by_station_name : bool
             if True, then iter over unique_station_name (and merge multiple
             matches if applicable), else, iter over metadata index
+        bulk : bool
+            if True (default), the data array is sorted and split into the
+            individual metadata blocks and variables only once (cf.
+            :func:`_presort_data_blocks`), rather than indexing the data
+            array separately for each station.
         **kwargs
             additional keyword args passed to :func:`to_station_data` (e.g.
             `merge_if_multi, merge_pref_attr, merge_sort_by_largest,
@@ -1113,6 +1338,9 @@ class UngriddedData(object):
                     'failed'        : [],
                     'longitude'     : []}
 
+        data_blocks = None
+        if bulk:
+            data_blocks = self._presort_data_blocks(vars_to_convert)
         _iter = self._generate_station_index(by_station_name,
                                              ignore_index)
         for idx in _iter:
@@ -1122,6 +1350,7 @@ class UngriddedData(object):
                                             stop, freq,
                                             merge_if_multi=True,
                                             allow_wildcards_station_name=False,
+                                            data_blocks=data_blocks,
                                             **kwargs)
 
                 out_data['latitude'].append(data['latitude'])
@@ -1509,7 +1738,7 @@ class UngriddedData(object):
                 meta_matches.append(meta_idx)
                 for var in meta['var_info']:
                     try:
-                        totnum += len(self.meta_idx[meta_idx][var])
+                        totnum += _index_len(self.meta_idx[meta_idx][var])
                     except KeyError:
                         const.print_log.warning('Ignoring variable {} in '
                                              'meta block {} since no data '
@@ -1588,18 +1817,18 @@ class UngriddedData(object):
         # 2. Get total number of datapoints -> defines shape of output UngriddedData
         # 3. Create
 
-        mask = load_region_mask_xr(region_id)
+        meta_indices = list(self.metadata)
+        lats = [self.metadata[idx]['latitude'] for idx in meta_indices]
+        lons = [self.metadata[idx]['longitude'] for idx in meta_indices]
+        in_mask = check_coords_in_region_mask(lats, lons, region_id)
 
         meta_matches = []
         totnum = 0
-        for meta_idx, meta in self.metadata.items():
-            lon, lat = meta['longitude'], meta['latitude']
-
-            mask_val = get_mask_value(lat, lon, mask)
-            if mask_val >= 1: # coordinate is in mask
+        for meta_idx, ok in zip(meta_indices, in_mask):
+            if ok: # coordinate is in mask
                 meta_matches.append(meta_idx)
-                for var in meta['var_info']:
-                    totnum += len(self.meta_idx[meta_idx][var])
+                for var in self.metadata[meta_idx]['var_info']:
+                    totnum += _index_len(self.meta_idx[meta_idx][var])
 
         new = self._new_from_meta_blocks(meta_matches, totnum)
         time_str = datetime.now().strftime('%Y%m%d%H%M%S')
@@ -1753,13 +1982,12 @@ class UngriddedData(object):
             new.meta_idx[meta_idx_new] = od()
             for var in meta['var_info']:
                 indices = self.meta_idx[meta_idx][var]
-                totnum = len(indices)
+                totnum = _index_len(indices)
 
                 stop = data_idx_new + totnum
 
                 new._data[data_idx_new:stop, :] = self._data[indices, :]
-                new.meta_idx[meta_idx_new][var] = np.arange(data_idx_new,
-                                                            stop)
+                new.meta_idx[meta_idx_new][var] = slice(data_idx_new, stop)
                 new.var_idx[var] = self.var_idx[var]
                 data_idx_new += totnum
 
@@ -1817,6 +2045,7 @@ class UngriddedData(object):
         elif num_removed > 0: # some meta blocks are empty
             obj.metadata = meta_new
             obj.meta_idx = meta_idx_new
+            obj.invalidate_meta_lookup()
 
         obj._add_to_filter_history('Removed {} metadata blocks that have no '
                                    'data assigned'.format(num_removed))
@@ -1889,7 +2118,7 @@ class UngriddedData(object):
         arr_idx = 0
 
         for midx, didx in self.meta_idx.items():
-            if var_name in didx and len(didx[var_name]) > 0:
+            if var_name in didx and _index_len(didx[var_name]) > 0:
                 meta_idx += 1
                 meta =  {}
                 _meta = self.metadata[midx]
@@ -1903,10 +2132,10 @@ class UngriddedData(object):
 
                 subset.meta_idx[meta_idx] = {}
 
-                num_add = len(idx)
+                num_add = _index_len(idx)
                 start = arr_idx
                 stop = arr_idx + num_add
-                subset.meta_idx[meta_idx][var_name] = np.arange(start, stop)
+                subset.meta_idx[meta_idx][var_name] = slice(start, stop)
 
                 subset._data[start:stop] = self._data[idx]
                 subset._data[start:stop, subset._METADATAKEYINDEX] = meta_idx
@@ -2075,17 +2304,17 @@ class UngriddedData(object):
 
                 data_var_idx = self.meta_idx[meta_idx]
                 for var, data_idx in data_var_idx.items():
-                    num = len(data_idx)
+                    num = _index_len(data_idx)
                     stop = didx + num
                     new._data[didx:stop, :] = self._data[data_idx]
                     new._data[didx:stop, 0] = i
                     if not var in _meta_idx_new:
-                        _meta_idx_new[var] = np.arange(didx, stop)
-                    else:
-                        _idx = np.append(_meta_idx_new[var], np.arange(didx, stop))
-                        _meta_idx_new[var] = _idx
+                        _meta_idx_new[var] = []
+                    _meta_idx_new[var].append(np.arange(didx, stop))
                     didx += num
 
+            for var, _idx in _meta_idx_new.items():
+                _meta_idx_new[var] = _index_compress(np.concatenate(_idx))
             new.meta_idx[i] = _meta_idx_new
             new.metadata[i] = _meta_check
         new.var_idx.update(self.var_idx)
@@ -2132,19 +2361,25 @@ class UngriddedData(object):
             obj.data_revision = other.data_revision
             obj.meta_idx = other.meta_idx
             obj.var_idx = other.var_idx
+            obj.invalidate_meta_lookup()
         else:
             # get offset in metadata index
             meta_offset = max([x for x in obj.metadata.keys()]) + 1
             data_offset = obj.shape[0]
 
+            update_lookup = obj._meta_lookup_valid()
+            meta_keys_new = []
             # add this offset to indices of meta dictionary in input data object
             for meta_idx_other, meta_other in other.metadata.items():
                 meta_idx = meta_offset + meta_idx_other
                 obj.metadata[meta_idx] = meta_other
                 _idx_map = od()
                 for var_name, indices in other.meta_idx[meta_idx_other].items():
-                    _idx_map[var_name] = np.asarray(indices) + data_offset
+                    _idx_map[var_name] = _index_shift(indices, data_offset)
                 obj.meta_idx[meta_idx] = _idx_map
+                meta_keys_new.append(meta_idx)
+            if update_lookup:
+                obj._add_to_meta_lookup(meta_keys_new)
 
             for var, idx in other.var_idx.items():
                 if var in obj.var_idx: #variable already exists in this object
@@ -2260,6 +2495,103 @@ class UngriddedData(object):
         """
         return self.merge(other, new_obj=False)
 
+    @staticmethod
+    def concatenate(data_objs):
+        """Concatenate multiple instances of :class:`UngriddedData`
+
+        Batched version of :func:`merge` (or repeated :func:`append`): the
+        data array of the output object is allocated only once, metadata
+        keys and variable indices of all input objects are remapped in a
+        single pass and the index is checked only once at the end. Metadata
+        keys and variable indices are assigned in the same way as when
+        appending the input objects one after another. The input objects
+        are not modified.
+
+        Note
+        ----
+        If only one of the input objects contains data, this object is
+        returned as it is (i.e. not copied), so that its data array is
+        shared (e.g. a memory-mapped array loaded from the cache, cf.
+        :class:`CacheHandlerUngridded`).
+
+        Parameters
+        ----------
+        data_objs : list
+            list of :class:`UngriddedData` objects
+
+        Returns
+        -------
+        UngriddedData
+            concatenated data object
+
+        Raises
+        ------
+        ValueError
+            if any of the input objects is not an instance of
+            :class:`UngriddedData` or if their data arrays have different
+            numbers of columns
+        """
+        data_objs = list(data_objs)
+        for obj in data_objs:
+            if not isinstance(obj, UngriddedData):
+                raise ValueError("Invalid input, need instance of "
+                                 "UngriddedData, got: {}".format(type(obj)))
+        filled = [obj for obj in data_objs if not obj.is_empty]
+        if len(filled) == 1:
+            return filled[0]
+        elif len(filled) == 0:
+            new = UngriddedData()
+        else:
+            colno = filled[0]._data.shape[1]
+            if any([obj._data.shape[1] != colno for obj in filled]):
+                raise ValueError('Cannot concatenate UngriddedData objects '
+                                 'with different number of data columns')
+            totnum = sum([obj.shape[0] for obj in filled])
+
+            new = UngriddedData(num_points=0)
+            new._chunksize = UngriddedData._CHUNKSIZE
+            new._index = filled[0]._index
+            new._data = np.empty([totnum, colno])
+
+            data_offset = 0
+            meta_offset = 0
+            for obj in filled:
+                stop = data_offset + obj.shape[0]
+                new._data[data_offset:stop] = obj._data
+                block = new._data[data_offset:stop]
+
+                # remap variable indices (cf. merge)
+                var_col = obj._data[:, obj._VARINDEX]
+                for var, idx in obj.var_idx.items():
+                    if var in new.var_idx:
+                        new_idx = new.var_idx[var]
+                    elif idx in new.var_idx.values():
+                        new_idx = max(new.var_idx.values()) + 1
+                    else:
+                        new_idx = idx
+                    new.var_idx[var] = new_idx
+                    if new_idx != idx:
+                        block[var_col == idx, new._VARINDEX] = new_idx
+
+                # add offset to metadata keys and data row indices
+                block[:, new._METADATAKEYINDEX] += meta_offset
+                for meta_key, meta in obj.metadata.items():
+                    key = meta_key + meta_offset
+                    new.metadata[key] = meta
+                    _idx_map = od()
+                    for var, indices in obj.meta_idx[meta_key].items():
+                        _idx_map[var] = _index_shift(indices, data_offset)
+                    new.meta_idx[key] = _idx_map
+                meta_offset = max(new.metadata.keys()) + 1
+                data_offset = stop
+
+        for obj in data_objs:
+            new.data_revision.update(obj.data_revision)
+            new.filter_hist.update(obj.filter_hist)
+        if not new.is_empty:
+            new._check_index()
+        return new
+
     def all_datapoints_var(self, var_name):
         """Get array of all data values of input variable
 
@@ -2660,9 +2992,10 @@ class UngriddedData(object):
 
         Note
         ----
-        So far, only storage as pickled object via
-        `CacheHandlerUngridded` is supported, so input file_name must end
-        with .pkl
+        Storage is done via `CacheHandlerUngridded`, so input file_name must
+        end with one of the supported cache file extensions, that is,
+        .npcache (columnar format with memory-mappable data array) or .pkl
+        (pickled object).
 
         Parameters
         ----------
@@ -2679,11 +3012,12 @@ class UngriddedData(object):
         """
         from pyaerocom.io.cachehandler_ungridded import CacheHandlerUngridded
 
+        exts = tuple(CacheHandlerUngridded.CACHE_FORMATS.values())
         if not os.path.exists(save_dir):
             raise FileNotFoundError('Directory does not exist: {}'.format(save_dir))
-        elif not file_name.endswith('.pkl'):
-            raise ValueError('Can only store files as pickle, file_name needs '
-                             'to have format .pkl')
+        elif not file_name.endswith(exts):
+            raise ValueError('Invalid file_name {}, needs to have one of the '
+                             'following formats: {}'.format(file_name, exts))
         ch = CacheHandlerUngridded()
         return ch.write(self, var_or_file_name=file_name,
                         cache_dir=save_dir)
@@ -2691,14 +3025,14 @@ class UngriddedData(object):
     @staticmethod
     def from_cache(data_dir, file_name):
         """
-        Load pickled instance of `UngriddedData`
+        Load cached instance of `UngriddedData`
 
         Parameters
         ----------
         data_dir : str
-            directory where pickled object is stored
+            directory where cached object is stored
         file_name : str
-            file name of pickled object (needs to end with pkl)
+            file name of cached object (needs to end with .npcache or .pkl)
 
         Raises
         ------
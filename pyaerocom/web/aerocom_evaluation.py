@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 from fnmatch import fnmatch
 import glob
+import multiprocessing
 import os
 import numpy as np
 import simplejson
@@ -12,6 +13,8 @@ from pyaerocom import const
 #from pyaerocom.region import Region, get_all_default_region_ids
 
 from pyaerocom.io.helpers import save_dict_json
+from pyaerocom.io.fingerprint_manifest import (FingerprintManifest,
+                                               make_fingerprint, files_info)
 
 from pyaerocom.web.helpers import (ObsConfigEval, ModelConfigEval,
                                    read_json, write_json)
@@ -22,7 +25,9 @@ from pyaerocom.web.helpers_evaluation_iface import (
     update_menu_evaluation_iface,
     make_info_table_evaluation_iface,
     compute_json_files_from_colocateddata,
-    delete_experiment_data_evaluation_iface)
+    delete_experiment_data_evaluation_iface,
+    set_shared_write_lock,
+    batched_json_output)
 
 from pyaerocom.colocation_auto import ColocationSetup, Colocator
 from pyaerocom.colocateddata import ColocatedData
@@ -158,6 +163,7 @@ class AerocomEvaluation(object):
     _OPTS_NAMES_OUTPUT = {
             'clear_existing_json' : 'Delete existing json files before reanalysis',
             'reanalyse_existing'  : 'Reanalyse existing colocated NetCDF files',
+            'reanalyse_changed'   : 'Reanalyse colocated NetCDF and json files with changed inputs',
             'only_colocation'     : 'Run only colocation (no json files computed)',
             'raise_exceptions'    : 'Raise exceptions if they occur'
     }
@@ -178,6 +184,10 @@ class AerocomEvaluation(object):
         self.only_colocation = False
         self.only_json = False
 
+        #: Number of processes used for running the model / obs combinations
+        #: in :func:`run_evaluation`. If None or 1, they are run serially.
+        self.num_proc = None
+
         self.weighted_stats=False
 
         #: Base directory for output
@@ -241,6 +251,15 @@ class AerocomEvaluation(object):
         """json file containing region specifications"""
         return os.path.join(self.exp_dir, 'regions.json')
 
+    @property
+    def json_manifest(self):
+        """Fingerprint manifest of json files computed from colocated data
+
+        Entry names are the names of the colocated data files (cf.
+        :func:`make_json_files`).
+        """
+        return FingerprintManifest(os.path.join(self.exp_dir, 'manifest'))
+
     @property
     def menu_file(self):
         """json file containing region specifications"""
@@ -724,13 +743,66 @@ class AerocomEvaluation(object):
         if len(files) == 0:
             const.print_log.info('Nothing to do...')
             return converted
-        for file in files:
-            const.print_log.info('Processing file {}'.format(file))
-            d = ColocatedData(file)
-            self.compute_json_files_from_colocateddata(d, obs_name, model_name)
-            converted.append(file)
+        manifest = self.json_manifest
+        # updates of shared json files (e.g. station time series) are
+        # flushed once per call of this method
+        with batched_json_output() as batch:
+            for file in files:
+                fname = os.path.basename(file)
+                fingerprint_info = self._json_fingerprint_info(file, obs_name,
+                                                               model_name)
+                fingerprint = make_fingerprint(fingerprint_info)
+                if (self.colocation_settings['reanalyse_changed'] and
+                    manifest.is_current(fname, fingerprint)):
+                    const.print_log.info('Skipping computation of json files '
+                                         'from colocated data file {}. Inputs '
+                                         'are unchanged'.format(fname))
+                    continue
+                const.print_log.info('Processing file {}'.format(file))
+                d = ColocatedData(file)
+                self.compute_json_files_from_colocateddata(d, obs_name,
+                                                           model_name)
+                # register json files once they are written
+                batch.after_flush(manifest.set, fname, fingerprint,
+                                  fingerprint_info)
+                converted.append(file)
         return converted
 
+    def _json_fingerprint_info(self, file, obs_name, model_name):
+        """Get information about inputs of json files for fingerprint
+
+        Parameters
+        ----------
+        file : str
+            path of colocated data file
+        obs_name : str
+            name of observation network
+        model_name : str
+            name of model run
+
+        Returns
+        -------
+        dict
+            information used to compute the fingerprint of the json files
+            computed from the colocated data file
+        """
+        from pyaerocom import __version__
+        # settings that may be added to the obs config during the run
+        obs_cfg = dict(self.obs_config[obs_name])
+        if obs_cfg.get('web_interface_name') is None:
+            obs_cfg['web_interface_name'] = obs_name
+        ovt = obs_cfg['obs_vert_type']
+        if isinstance(ovt, str) and ovt in self.VERT_SCHEMES:
+            obs_cfg.setdefault('vert_scheme', self.VERT_SCHEMES[ovt])
+        return dict(pyaerocom_version=__version__,
+                    coldata_file=files_info([file]),
+                    obs_config=obs_cfg,
+                    model_config=self.model_config[model_name],
+                    settings=self.colocation_settings.fingerprint_settings(),
+                    regions_how=self.regions_how,
+                    region_groups=self.region_groups,
+                    weighted_stats=self.weighted_stats)
+
     def _check_process_colfiles(self, files, colocator):
         remaining = []
         for file in files:
@@ -964,9 +1036,10 @@ class AerocomEvaluation(object):
 
     def run_evaluation(self, model_name=None, obs_name=None, var_name=None,
                        update_interface=True,
-                       reanalyse_existing=None, raise_exceptions=None,
+                       reanalyse_existing=None, reanalyse_changed=None,
+                       raise_exceptions=None,
                        clear_existing_json=None, only_colocation=None,
-                       only_json=None):
+                       only_json=None, num_proc=None):
         """Create colocated data and json files for model / obs combination
 
         Parameters
@@ -992,6 +1065,11 @@ class AerocomEvaluation(object):
         reanalyse_existing : Bool, optional
             if True, existing colocated data files are ignored. If None, the
             class default will be used (defined in config file)
+        reanalyse_changed : bool, optional
+            if True, existing colocated data files and the json files computed
+            from them are only recomputed if their inputs have changed (cf.
+            :attr:`ColocationSetup.reanalyse_changed`). If None, the class
+            default will be used (defined in config file)
         raise_exceptions : bool, optional
             if True, exceptions during colocation will be raised if they occur
             (for debugging). If None, the class default will be used (defined
@@ -1007,6 +1085,14 @@ class AerocomEvaluation(object):
         only_json : bool, optional
             if True, no colocation will be performed and only existing
             colocated data files will be re-processed.
+        num_proc : int, optional
+            number of processes used to run the model / obs combinations in
+            parallel (each comprising colocation and computation of json
+            files). Updates of json files that are shared between
+            combinations are serialised and the interface files (menu,
+            heatmap order, info table) are updated after all combinations
+            are finished. If None, the class default will be used
+            (:attr:`num_proc`).
 
         Returns
         -------
@@ -1017,6 +1103,8 @@ class AerocomEvaluation(object):
         res = None
         if reanalyse_existing is not None:
             self.colocation_settings['reanalyse_existing'] = reanalyse_existing
+        if reanalyse_changed is not None:
+            self.colocation_settings['reanalyse_changed'] = reanalyse_changed
         if raise_exceptions is not None:
             self.colocation_settings['raise_exceptions'] = raise_exceptions
         if clear_existing_json is not None:
@@ -1025,6 +1113,8 @@ class AerocomEvaluation(object):
             self.only_colocation = only_colocation
         if only_json is not None:
             self.only_json = only_json
+        if num_proc is not None:
+            self.num_proc = num_proc
         #self.iface_names = self._check_and_get_iface_names()
         if self.clear_existing_json:
             self.clean_json_files()
@@ -1043,6 +1133,7 @@ class AerocomEvaluation(object):
 
         self._update_custom_read_methods()
 
+        tasks = []
         for obs_name in obs_list:
             if obs_name in self.obs_ignore:
                 self._log.info('Skipping observation {}'.format(obs_name))
@@ -1058,17 +1149,18 @@ class AerocomEvaluation(object):
                 if model_name in self.model_ignore:
                     self._log.info('Skipping model {}'.format(model_name))
                     continue
+                tasks.append((model_name, obs_name, var_name,
+                              only_colocation))
 
-                if not self.only_json:
-                    col = self.run_colocation(model_name, obs_name, var_name)
-                else:
-                    col = None
-                if only_colocation:
-                    self._log.info('Skipping computation of json files for {}'
-                                   '/{}'.format(obs_name, model_name))
-                    continue
-                res = self.make_json_files(model_name, obs_name, var_name,
-                                           colocator=col)
+        if (self.num_proc is not None and self.num_proc > 1
+            and len(tasks) > 1):
+            results = self._run_tasks_multiproc(tasks)
+        else:
+            results = [self._run_task(*task) for task in tasks]
+
+        for task_res in results:
+            if task_res is not None:
+                res = task_res
 
         if update_interface:
             #self.clean_json_files()
@@ -1076,6 +1168,65 @@ class AerocomEvaluation(object):
 
         return res
 
+    def _run_task(self, model_name, obs_name, var_name=None,
+                  only_colocation=False):
+        """Run colocation and json computation for one model / obs combination
+
+        Returns
+        -------
+        list or None
+            list of converted colocated data files or None if computation of
+            json files is skipped
+        """
+        if not self.only_json:
+            col = self.run_colocation(model_name, obs_name, var_name)
+        else:
+            col = None
+        if only_colocation:
+            self._log.info('Skipping computation of json files for {}'
+                           '/{}'.format(obs_name, model_name))
+            return None
+        return self.make_json_files(model_name, obs_name, var_name,
+                                    colocator=col)
+
+    def _run_tasks_multiproc(self, tasks):
+        """Run model / obs combinations in parallel (cf. :func:`_run_task`)
+
+        The worker processes are forked, so that each of them inherits a copy
+        of this evaluation setup (including custom read methods and
+        registered auxiliary observation datasets). Updates of json files
+        that are shared between the different combinations are serialised
+        using a lock (cf. :func:`set_shared_write_lock`). If forking is not
+        supported on the current platform, the tasks are run serially.
+
+        Parameters
+        ----------
+        tasks : list
+            list of input argument tuples for :func:`_run_task`
+
+        Returns
+        -------
+        list
+            results of :func:`_run_task` for each task (in the same order as
+            input)
+        """
+        try:
+            ctx = multiprocessing.get_context('fork')
+        except ValueError:
+            const.print_log.warning('Multiprocessing via fork is not '
+                                    'available, running model / obs '
+                                    'combinations serially')
+            return [self._run_task(*task) for task in tasks]
+        num_proc = min(self.num_proc, len(tasks))
+        const.print_log.info('Running {} model / obs combinations using {} '
+                             'processes'.format(len(tasks), num_proc))
+        lock = ctx.Lock()
+        with ctx.Pool(processes=num_proc, initializer=_init_evaluation_worker,
+                      initargs=(self, lock)) as pool:
+            # one task at a time, since runtimes vary strongly
+            results = pool.starmap(_run_evaluation_task, tasks, chunksize=1)
+        return results
+
     def info_string_evalrun(self, obs_list, model_list):
         """Short information string that summarises settings for evaluation run
 
@@ -1282,6 +1433,7 @@ class AerocomEvaluation(object):
         This may be relevant when updating a model name or similar.
         """
 
+        removed = False
         for file in self.all_map_files:
             (obs_name, obs_var, vert_code,
             mod_name, mod_var) = self._info_from_map_file(file)
@@ -1300,6 +1452,10 @@ class AerocomEvaluation(object):
             if remove:
                 const.print_log.info('Removing outdated map file: {}'.format(file))
                 os.remove(os.path.join(self.out_dirs['map'], file))
+                removed = True
+        if removed:
+            # json files need to be recomputed for all colocated data files
+            self.json_manifest.clear()
         for fp in glob.glob('{}/*.json'.format(self.out_dirs['ts'])):
             self._check_clean_ts_file(fp)
         if update_interface:
@@ -1335,6 +1491,7 @@ class AerocomEvaluation(object):
             const.print_log.exception('FATAL: detected corrupt json file: {}. '
                                       'Removing file...'.format(fp))
             os.remove(fp)
+            self.json_manifest.clear()
             return
         if all([x in self.model_config for x in list(data.keys())]):
             return
@@ -1453,6 +1610,21 @@ class AerocomEvaluation(object):
 
         return s
 
+#: Evaluation setup in worker processes of
+#: :func:`AerocomEvaluation.run_evaluation`
+_WORKER_EVALUATION = None
+
+def _init_evaluation_worker(stp, lock):
+    """Initialise worker process for :func:`_run_evaluation_task`"""
+    global _WORKER_EVALUATION
+    _WORKER_EVALUATION = stp
+    set_shared_write_lock(lock)
+
+def _run_evaluation_task(model_name, obs_name, var_name, only_colocation):
+    """Run one model / obs combination in worker process"""
+    return _WORKER_EVALUATION._run_task(model_name, obs_name, var_name,
+                                        only_colocation)
+
 if __name__ == '__main__':
     cfg_dir = '/home/jonasg/github/aerocom_evaluation/data_new/config_files/'
     stp = AerocomEvaluation('aerocom', 'PIII-optics', config_dir=cfg_dir)
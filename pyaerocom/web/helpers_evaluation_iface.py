@@ -4,24 +4,184 @@
 Created on Mon Apr 15 14:00:44 2019
 """
 import os, glob, shutil
+from collections import OrderedDict as od
+from contextlib import contextmanager
 import numpy as np
 import simplejson
 from pyaerocom import const
 from pyaerocom._lowlevel_helpers import sort_dict_by_name
-from pyaerocom.io.helpers import save_dict_json
 from pyaerocom.web.helpers import read_json, write_json
 from pyaerocom.web.const import (HEATMAP_FILENAME_EVAL_IFACE_MONTHLY,
                                  HEATMAP_FILENAME_EVAL_IFACE_DAILY)
 from pyaerocom.colocateddata import ColocatedData
-from pyaerocom.mathutils import calc_statistics
+from pyaerocom.mathutils import calc_statistics, calc_statistics_multi
 from pyaerocom.tstype import TsType
 from pyaerocom.exceptions import DataDimensionError, TemporalResolutionError
 from pyaerocom.region import (get_all_default_region_ids,
-                              find_closest_region_coord,
+                              find_closest_region_coords,
                               get_all_default_regions, Region)
 
 #from pyaerocom import __version__ as PYA_VERSION
 
+#: Lock used to serialise updates of json files that are shared between
+#: different model / obs combinations (e.g. heatmap, regions and station
+#: time series files). Only set in worker processes of
+#: :func:`AerocomEvaluation.run_evaluation` (cf. :func:`set_shared_write_lock`)
+_SHARED_WRITE_LOCK = None
+
+def set_shared_write_lock(lock):
+    """Set lock for updates of shared json files in current process
+
+    Parameters
+    ----------
+    lock : multiprocessing.Lock, optional
+        lock that is shared between processes that write into the same
+        json files. None deactivates locking.
+    """
+    global _SHARED_WRITE_LOCK
+    _SHARED_WRITE_LOCK = lock
+
+@contextmanager
+def _shared_write():
+    """Context manager for read-modify-write of shared json files"""
+    if _SHARED_WRITE_LOCK is None:
+        yield
+    else:
+        with _SHARED_WRITE_LOCK:
+            yield
+
+#: Active batch of pending json file updates (cf. :func:`batched_json_output`)
+_JSON_BATCH = None
+
+class JSONUpdateBatch(object):
+    """Pending updates of json files that are shared between different model
+    / obs combinations (station time series, heatmap and regions files)
+
+    Updates are collected in memory and each file is read, updated and
+    written only once when :func:`flush` is called. Files are written to a
+    temporary file first which is then renamed, so that readers never see
+    incomplete files.
+    """
+    def __init__(self):
+        self._updates = od()
+        self._callbacks = []
+
+    @property
+    def num_files(self):
+        """Number of files with pending updates"""
+        return len(self._updates)
+
+    def add(self, fp, keys, value, overwrite=True, overwrite_msg=None):
+        """Add update of json file
+
+        Parameters
+        ----------
+        fp : str
+            path of json file
+        keys : tuple
+            keys of (nested) entry in json file that is updated
+        value
+            new value of entry
+        overwrite : bool
+            if False, existing entries are not updated
+        overwrite_msg : str, optional
+            message that is logged if an existing entry is overwritten
+        """
+        updates = self._updates.setdefault(fp, od())
+        if overwrite or not keys in updates:
+            updates[keys] = (value, overwrite, overwrite_msg)
+
+    def after_flush(self, fun, *args, **kwargs):
+        """Register function that is called after the next flush"""
+        self._callbacks.append((fun, args, kwargs))
+
+    def flush(self):
+        """Write all pending updates into json files"""
+        for fp, updates in self._updates.items():
+            with _shared_write():
+                current = _load_json_current(fp)
+                for keys, (value, overwrite, msg) in updates.items():
+                    entry = current
+                    for key in keys[:-1]:
+                        if not key in entry:
+                            entry[key] = {}
+                        entry = entry[key]
+                    if keys[-1] in entry:
+                        if not overwrite:
+                            continue
+                        elif msg is not None:
+                            const.print_log.info(msg)
+                    entry[keys[-1]] = value
+                _write_json_atomic(current, fp)
+        self._updates = od()
+        callbacks, self._callbacks = self._callbacks, []
+        for fun, args, kwargs in callbacks:
+            fun(*args, **kwargs)
+
+@contextmanager
+def batched_json_output():
+    """Context manager that collects updates of shared json files in memory
+
+    All updates of station time series, heatmap and regions json files
+    within the context are written when the outermost context is left (cf.
+    :class:`JSONUpdateBatch`). Nested contexts use the batch of the
+    outermost context.
+
+    Yields
+    ------
+    JSONUpdateBatch
+        active batch
+    """
+    global _JSON_BATCH
+    if _JSON_BATCH is not None:
+        yield _JSON_BATCH
+        return
+    batch = _JSON_BATCH = JSONUpdateBatch()
+    try:
+        yield batch
+    finally:
+        _JSON_BATCH = None
+        const.print_log.info('Writing updates of {} json files'
+                             .format(batch.num_files))
+        batch.flush()
+
+def _load_json_current(fp):
+    """Load existing json file for update (empty dict if it does not exist)"""
+    if not os.path.exists(fp):
+        return {}
+    try:
+        with open(fp, 'r') as f:
+            return simplejson.load(f)
+    except Exception as e:
+        raise Exception('Fatal: could not open existing json file: {}. '
+                        'Reason: {}'.format(fp, repr(e)))
+
+def _write_json_atomic(data, fp):
+    """Write json file via temporary file that is renamed"""
+    tmp = '{}.{}.tmp'.format(fp, os.getpid())
+    with open(tmp, 'w') as f:
+        simplejson.dump(data, f, ignore_nan=True)
+    os.replace(tmp, fp)
+
+def _update_json(fp, keys, value, overwrite=True, overwrite_msg=None):
+    """Update entry in json file (or add it to active batch, if applicable)
+
+    Parameters are the same as for :func:`JSONUpdateBatch.add`.
+
+    Returns
+    -------
+    bool
+        True if the file was written, False if the update was added to the
+        active batch (cf. :func:`batched_json_output`)
+    """
+    if _JSON_BATCH is not None:
+        _JSON_BATCH.add(fp, keys, value, overwrite, overwrite_msg)
+        return False
+    batch = JSONUpdateBatch()
+    batch.add(fp, keys, value, overwrite, overwrite_msg)
+    batch.flush()
+    return True
+
 def delete_experiment_data_evaluation_iface(base_dir, proj_id, exp_id):
     """Delete all data associated with a certain experiment
 
@@ -314,18 +474,7 @@ def _write_stationdata_json(ts_data, out_dirs):
                                     ts_data['vert_code'])
 
     fp = os.path.join(out_dirs['ts'], filename)
-    if os.path.exists(fp):
-        try:
-            with open(fp, 'r') as f:
-                current = simplejson.load(f)
-        except Exception as e:
-            raise Exception('Fatal: could not open existing json file: {}. '
-                            'Reason: {}'.format(fp, repr(e)))
-    else:
-        current = {}
-    current[ts_data['model_name']] = ts_data
-    with open(fp, 'w') as f:
-        simplejson.dump(current, f, ignore_nan=True)
+    _update_json(fp, (ts_data['model_name'],), ts_data)
 
 def _write_diurnal_week_stationdata_json(ts_data, out_dirs):
     """
@@ -355,51 +504,16 @@ def _write_diurnal_week_stationdata_json(ts_data, out_dirs):
                                     ts_data['vert_code'])
 
     fp = os.path.join(out_dirs['ts'],'dw', filename)
-    if os.path.exists(fp):
-        try:
-            with open(fp, 'r') as f:
-                current = simplejson.load(f)
-        except Exception as e:
-            raise Exception('Fatal: could not open existing json file: {}. '
-                            'Reason: {}'.format(fp, repr(e)))
-    else:
-        current = {}
-    current[ts_data['model_name']] = ts_data
-    with open(fp, 'w') as f:
-        simplejson.dump(current, f, ignore_nan=True)
+    _update_json(fp, (ts_data['model_name'],), ts_data)
 
 def add_entry_heatmap_json(heatmap_file, result, obs_name, obs_var, vert_code,
                            model_name, model_var):
-    fp = heatmap_file
-    if os.path.exists(fp):
-        try:
-            with open(fp, 'r') as f:
-                current = simplejson.load(f)
-        except Exception as e:
-            raise Exception('Fatal: could not open existing json file: {}. '
-                            'Reason: {}'.format(fp, repr(e)))
-    else:
-        current = {}
-    if not obs_var in current:
-        current[obs_var] = {}
-    ov = current[obs_var]
-    if not obs_name in ov:
-        ov[obs_name] = {}
-    on = ov[obs_name]
-    if not vert_code in on:
-        on[vert_code] = {}
-    ovc = on[vert_code]
-    if not model_name in ovc:
-        ovc[model_name] = {}
-    mn = ovc[model_name]
-    if model_var in mn:
-        const.print_log.info('Overwriting existing heatmap statistics for '
-                             'model {}/{} ({}, {}, {}) in glob_stats.json'
-                             .format(model_name, model_var, obs_var, obs_name,
-                                     vert_code))
-    mn[model_var] = result
-    with open(fp, 'w') as f:
-        simplejson.dump(current, f, ignore_nan=True)
+    msg = ('Overwriting existing heatmap statistics for '
+           'model {}/{} ({}, {}, {}) in glob_stats.json'
+           .format(model_name, model_var, obs_var, obs_name, vert_code))
+    _update_json(heatmap_file,
+                 (obs_var, obs_name, vert_code, model_name, model_var),
+                 result, overwrite_msg=msg)
 
 def _init_stats_dummy():
     # dummy for statistics dictionary for locations without data
@@ -453,16 +567,25 @@ def init_regions_web(coldata, regions_how):
         raise ValueError('Invalid input for regions_how', regions_how)
 
 def update_regions_json(region_defs, regions_json):
-    if os.path.exists(regions_json):
-        current = read_json(regions_json)
-    else:
-        current = {}
+    """Add region definitions that are not yet registered to regions json
 
+    Returns
+    -------
+    dict or None
+        updated content of regions json file or None, if the update is
+        added to the active batch (cf. :func:`batched_json_output`)
+    """
+    batch = _JSON_BATCH
+    if batch is None:
+        batch = JSONUpdateBatch()
     for region_id, region_info in region_defs.items():
-        if not region_id in current:
-            current[region_id] = region_info
-    save_dict_json(current, regions_json)
-    return current
+        batch.add(regions_json, (region_id,), region_info, overwrite=False)
+    if batch is _JSON_BATCH:
+        return None
+    batch.flush()
+    if not os.path.exists(regions_json):
+        return {}
+    return read_json(regions_json)
 
 def _init_data_default_frequenciesOLD(coldata, colocation_settings):
     ts_types_order = const.GRID_IO.TS_TYPES
@@ -529,22 +652,96 @@ def _init_ts_data():
         yearly_mod = []
         )
 
-def _create_diurnal_weekly_data_object(coldata,resolution):
+#: season names, index corresponds to season codes of :func:`_get_season_week_hour_codes`
+_SEASONS = ['DJF', 'MAM', 'JJA', 'SON']
+
+def _get_season_week_hour_codes(times):
     """
-    Private helper functions that creates the data set containing all the
-    weekly time series at the specified resolution. Called by
-    _process_sites_weekly_ts. The returned xarray.Dataset contains a dummy time
-    variable (currently not used) and the weekly time series as xarray.DataArray
-    objects.
+    Private helper that computes integer season and hour-of-week codes.
+
+    Parameters
+    ----------
+    times : numpy.ndarray
+        Array of datetime64 timestamps.
+
+    Returns
+    -------
+    season : numpy.ndarray
+        Season codes (0: DJF, 1: MAM, 2: JJA, 3: SON).
+    week_hour : numpy.ndarray
+        Hour of week (0-167, starting on Monday 00:00).
+
+    """
+    times = np.asarray(times).astype('datetime64[h]')
+    hours = times.astype(np.int64)
+    # 1970-01-01 was a Thursday (dayofweek 3)
+    dayofweek = (hours // 24 + 3) % 7
+    month = times.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    season = (month % 12) // 3
+    return season, dayofweek * 24 + hours % 24
+
+def _calc_rep_week_sums(coldata):
+    """
+    Private helper that computes sums and numbers of valid values of all
+    seasonal representative weeks of all stations in one pass.
+
+    Each time stamp is assigned to a group (season and hour of week) and
+    the values are summed up per group over the sorted time axis of the
+    colocated array (cf. :func:`numpy.add.reduceat`).
 
     Parameters
     ----------
     coldata : ColocatedData
         ColocatedData object colocated on hourly resolution.
+
+    Returns
+    -------
+    sums : numpy.ndarray
+        Sums of valid values, shape (season, data_source, hour of week,
+        station_name).
+    counts : numpy.ndarray
+        Number of valid values, same shape as sums.
+
+    """
+    data = coldata.data
+    arr = np.asarray(data.values, dtype=np.float64)
+    season, week_hour = _get_season_week_hour_codes(data.time.values)
+    groups = season * 168 + week_hour
+
+    order = np.argsort(groups, kind='stable')
+    groups = groups[order]
+    arr = arr[:, order]
+    valid = ~np.isnan(arr)
+
+    shape = (len(_SEASONS) * 168, arr.shape[0], arr.shape[2])
+    sums = np.zeros(shape)
+    counts = np.zeros(shape)
+    if len(groups) > 0:
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        found = groups[starts]
+        sums[found] = np.moveaxis(np.add.reduceat(np.where(valid, arr, 0),
+                                                  starts, axis=1), 1, 0)
+        counts[found] = np.moveaxis(np.add.reduceat(valid.astype(np.float64),
+                                                    starts, axis=1), 1, 0)
+    sums = sums.reshape((len(_SEASONS), 168) + shape[1:]).swapaxes(1, 2)
+    counts = counts.reshape((len(_SEASONS), 168) + shape[1:]).swapaxes(1, 2)
+    return sums, counts
+
+def _make_rep_week_dataset(coldata, sums, counts, resolution):
+    """
+    Private helper that creates the data set of representative weeks from
+    the output of :func:`_calc_rep_week_sums`.
+
+    Parameters
+    ----------
+    coldata : ColocatedData
+        ColocatedData object the sums were computed from.
+    sums : numpy.ndarray
+        Sums of valid values per season.
+    counts : numpy.ndarray
+        Number of valid values per season.
     resolution : string
-        String specifying the averaging window used to generate representative
-        weekly time series with hourly resolution. Valid values are 'yearly'
-        and  'seasonal'.
+        Averaging window, 'yearly' or 'seasonal'.
 
     Raises
     ------
@@ -555,48 +752,83 @@ def _create_diurnal_weekly_data_object(coldata,resolution):
     Returns
     -------
     rep_week_full_period : xarray.Dataset
-        Contains the weekly time series as the variable 'rep_week'
-
+        Contains the weekly time series as the variable 'rep_week' with
+        dimensions (period, data_source, dummy_time, station_name).
 
     """
     import xarray as xr
-    data = coldata.data
     if resolution == 'seasonal':
-        seasons = ['DJF','MAM','JJA','SON']
+        seasons = _SEASONS
     elif resolution == 'yearly':
         seasons = ['year']
+        sums = sums.sum(axis=0, keepdims=True)
+        counts = counts.sum(axis=0, keepdims=True)
     else:
         raise ValueError(f'Invalid resolution. Got {resolution}.')
 
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = sums / counts
+    means[counts == 0] = np.nan
 
-    for seas in seasons:
-        rep_week_ds = xr.Dataset()
-        if resolution == 'seasonal':
-            mon_slice = data.where(data['time.season']==seas,drop=True)
-        elif resolution == 'yearly':
-            mon_slice = data
+    data = coldata.data
+    coords = {k : v for k, v in data.coords.items()
+              if not 'time' in v.dims}
+    coords['dummy_time'] = np.arange(168) / 24 + 1
+    rep_week = xr.DataArray(means,
+                            dims=('period', 'data_source', 'dummy_time',
+                                  'station_name'),
+                            coords=coords)
+    month_stamps = np.zeros((len(seasons), 168), dtype='<U5')
+    month_stamps[:] = np.asarray(seasons)[:, np.newaxis]
+
+    rep_week_full_period = xr.Dataset()
+    rep_week_full_period['rep_week'] = rep_week
+    rep_week_full_period['month_stamp'] = (('period', 'dummy_time'),
+                                           month_stamps)
+    return rep_week_full_period
 
-        month_stamp = f'{seas}'
+def _create_diurnal_weekly_data_object(coldata,resolution):
+    """
+    Private helper functions that creates the data set containing all the
+    weekly time series at the specified resolution. The returned
+    xarray.Dataset contains a dummy time variable (currently not used) and
+    the weekly time series as xarray.DataArray objects.
 
-        for day in range(7):
-            day_slice = mon_slice.where(mon_slice['time.dayofweek']==day,drop=True)
-            rep_day = day_slice.groupby('time.hour').mean(dim='time')
-            rep_day['hour'] = rep_day.hour/24+day+1
-            if day == 0:
-                rep_week = rep_day
-            else:
-                rep_week = xr.concat([rep_week,rep_day],dim='hour')
+    Note
+    ----
+    :func:`_process_sites_weekly_ts` computes the seasonal and yearly data
+    sets from one pass over the data using :func:`_calc_rep_week_sums` and
+    :func:`_make_rep_week_dataset` directly.
 
-        rep_week=rep_week.rename({'hour':'dummy_time'})
-        month_stamps = np.zeros(rep_week.dummy_time.shape,dtype='<U5')
-        month_stamps[:] = month_stamp
-        rep_week_ds['rep_week']=rep_week
-        rep_week_ds['month_stamp'] = (('dummy_time'),month_stamps)
+    Parameters
+    ----------
+    coldata : ColocatedData
+        ColocatedData object colocated on hourly resolution.
+    resolution : string
+        String specifying the averaging window used to generate representative
+        weekly time series with hourly resolution. Valid values are 'yearly'
+        and  'seasonal'.
 
-        if seas in ['DJF','year']:
-            rep_week_full_period = rep_week_ds
-        else:
-            rep_week_full_period = xr.concat([rep_week_full_period,rep_week_ds],dim='period')
+    Raises
+    ------
+    ValueError
+        If an invalid resolution is given raise ValueError and print what
+        was given.
+
+    Returns
+    -------
+    rep_week_full_period : xarray.Dataset
+        Contains the weekly time series as the variable 'rep_week'
+
+
+    """
+    if not resolution in ('seasonal', 'yearly'):
+        raise ValueError(f'Invalid resolution. Got {resolution}.')
+    sums, counts = _calc_rep_week_sums(coldata)
+    rep_week_full_period = _make_rep_week_dataset(coldata, sums, counts,
+                                                  resolution)
+    if resolution == 'yearly':
+        rep_week_full_period = rep_week_full_period.isel(period=0)
     return rep_week_full_period
 
 def _get_period_keys(resolution):
@@ -618,8 +850,9 @@ def _process_one_station_weekly(stat_name, i,repw_res, meta_glob, time):
     i : int
         Index of the station to process in the xarray.Datasets.
     repw_res : dict
-        Dictionary of xarray.Datasets for each supported averaging window for
-        the weekly time series
+        Dictionary of numpy arrays (period, data_source, dummy_time,
+        station_name) for each supported averaging window for the weekly
+        time series
     meta_glob : TYPE
         Dictionary containing global metadata.
     time : list
@@ -642,15 +875,15 @@ def _process_one_station_weekly(stat_name, i,repw_res, meta_glob, time):
 
     for res,repw in repw_res.items():
         obs_vals = repw[:,0, :, i]
-        if (np.isnan(obs_vals)).all().values:
+        if (np.isnan(obs_vals)).all():
             continue
         has_data = True
         mod_vals = repw[:,1, :, i]
 
         period_keys = _get_period_keys(res)
         for period_num,pk in enumerate(period_keys):
-            ts_data[res]['obs'][pk] = obs_vals.sel(period=period_num).values.tolist()
-            ts_data[res]['mod'][pk] = mod_vals.sel(period=period_num).values.tolist()
+            ts_data[res]['obs'][pk] = obs_vals[period_num].tolist()
+            ts_data[res]['mod'][pk] = mod_vals[period_num].tolist()
     return ts_data, has_data
 
 def _process_weekly_object_to_station_time_series(repw_res,meta_glob):
@@ -675,8 +908,9 @@ def _process_weekly_object_to_station_time_series(repw_res,meta_glob):
     ts_objs = []
     dc = 0
     time = (np.arange(168)/24+1).round(4).tolist()
+    repw_arrs = {res : repw.values for res, repw in repw_res.items()}
     for i, stat_name in enumerate(repw_res['seasonal'].station_name.values):
-        ts_data, has_data = _process_one_station_weekly(stat_name, i, repw_res,
+        ts_data, has_data = _process_one_station_weekly(stat_name, i, repw_arrs,
                                                         meta_glob, time)
 
         if has_data:
@@ -776,8 +1010,11 @@ def _process_sites_weekly_ts(coldata,regions_how,region_ids,meta_glob):
         _check_flatten_latlon_dims(coldata)
         assert coldata.dims == ('data_source', 'time', 'station_name')
 
-    repw_res = {'seasonal':_create_diurnal_weekly_data_object(coldata, 'seasonal')['rep_week'],
-                'yearly':_create_diurnal_weekly_data_object(coldata, 'yearly')['rep_week'].expand_dims('period',axis=0),}
+    sums, counts = _calc_rep_week_sums(coldata)
+    repw_res = {}
+    for res in ('seasonal', 'yearly'):
+        repw_res[res] = _make_rep_week_dataset(coldata, sums, counts,
+                                               res)['rep_week']
 
     default_regs = get_all_default_regions(use_all_in_ini=False)
 
@@ -825,8 +1062,19 @@ def _process_sites(data, jsdate, regions_how, meta_glob):
     else:
         alts = [np.nan]*len(lats)
 
-    if regions_how == 'country':
-        countries = mon.data.country.values
+    if regions_how == 'default':
+        regions = find_closest_region_coords(lats, lons,
+                                             default_regs=default_regs)
+    elif regions_how == 'country':
+        regions = mon.data.country.values
+
+    # statistics of all stations for each frequency
+    site_stats = {}
+    for tres, coldata in data.items():
+        if coldata is not None:
+            site_stats[tres] = calc_statistics_multi(coldata.data.data,
+                                                     min_num_valid=1,
+                                                     as_list=True)
     dc = 0
     for i, stat_name in enumerate(mon.data.station_name.values):
         has_data = False
@@ -838,11 +1086,7 @@ def _process_sites(data, jsdate, regions_how, meta_glob):
         stat_lon = lons[i]
         stat_alt = alts[i]
 
-        if regions_how == 'default':
-            region = find_closest_region_coord(stat_lat, stat_lon,
-                                               default_regs=default_regs)
-        elif regions_how == 'country':
-            region = countries[i]
+        region = regions[i]
 
         # station information for map view
         map_stat = {'site'      : stat_name,
@@ -868,8 +1112,7 @@ def _process_sites(data, jsdate, regions_how, meta_glob):
             ts_data['{}_obs'.format(tres)] = obs_vals.tolist()
             ts_data['{}_mod'.format(tres)] = mod_vals.tolist()
 
-            station_statistics = calc_statistics(mod_vals, obs_vals,
-                                                 min_num_valid=1)
+            station_statistics = site_stats[tres][i]
 
             for k, v in station_statistics.items():
                 station_statistics[k] = np.float64(v)
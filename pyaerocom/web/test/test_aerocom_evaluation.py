@@ -1,5 +1,6 @@
 import os
 import pytest
+import simplejson
 from pandas import DataFrame
 
 from pyaerocom import Colocator, ColocatedData, GriddedData, UngriddedData
@@ -89,6 +90,22 @@ def test_aerocom_evaluation_run_evaluation(stp):
     assert len(col_paths) == 1
     assert os.path.isfile(col_paths[0])
 
+def test_aerocom_evaluation_run_evaluation_multiproc(stp, model_config):
+    model_config['TM5-copy'] = dict(model_config[MODEL_NAME])
+    stp['model_config'] = model_config
+    hm_file = stp._heatmap_files['monthly']
+
+    col_paths = stp.run_evaluation(update_interface=False)
+    with open(hm_file) as f:
+        hm = simplejson.load(f)
+
+    col_paths_mp = stp.run_evaluation(update_interface=False, num_proc=2)
+    with open(hm_file) as f:
+        hm_mp = simplejson.load(f)
+    assert col_paths_mp == col_paths
+    assert hm_mp == hm
+    assert sorted(hm[OBS_VARS][OBS_NAME][OBS_VERT_TYPE]) == ['TM5', 'TM5-copy']
+
 def test_aerocom_evaluation_get_web_overview_table(stp, tmpdir):
     stp.update()
     stp.run_evaluation(update_interface=False)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for helper methods of AerocomEvaluation interface
+"""
+import os
+import pytest
+import numpy as np
+import numpy.testing as npt
+import pandas as pd
+import xarray as xr
+
+from pyaerocom import ColocatedData
+from pyaerocom.web.helpers import read_json
+from pyaerocom.web.helpers_evaluation_iface import (
+    add_entry_heatmap_json, update_regions_json, batched_json_output,
+    _create_diurnal_weekly_data_object)
+
+def test_batched_json_output(tmpdir):
+    hm_file = os.path.join(str(tmpdir), 'glob_stats_monthly.json')
+    reg_file = os.path.join(str(tmpdir), 'regions.json')
+    update_regions_json({'WORLD' : {'minLat' : -90}}, reg_file)
+    with batched_json_output() as batch:
+        for model, nmb in (('mod1', 1), ('mod2', 2), ('mod1', 3)):
+            add_entry_heatmap_json(hm_file, {'nmb' : nmb}, 'obs', 'od550aer',
+                                   'Column', model, 'od550aer')
+        # existing regions are not overwritten
+        assert update_regions_json({'WORLD' : {'minLat' : 0},
+                                    'EUROPE' : {'minLat' : 30}},
+                                   reg_file) is None
+        assert not os.path.exists(hm_file)
+        assert batch.num_files == 2
+    assert read_json(hm_file) == {'od550aer' : {'obs' : {'Column' : {
+        'mod1' : {'od550aer' : {'nmb' : 3}},
+        'mod2' : {'od550aer' : {'nmb' : 2}}}}}}
+    assert read_json(reg_file) == {'WORLD' : {'minLat' : -90},
+                                     'EUROPE' : {'minLat' : 30}}
+
+def _make_hourly_coldata():
+    time = pd.date_range('2018-01-01', '2018-12-31 23:00', freq='H')
+    vals = np.random.RandomState(42).rand(2, len(time), 3)
+    vals[:, ::5, 1] = np.nan
+    vals[:, :, 2] = np.nan
+    arr = xr.DataArray(vals, dims=('data_source', 'time', 'station_name'),
+                       coords={'data_source' : ['obs', 'mod'],
+                               'time' : time,
+                               'station_name' : ['a', 'b', 'c'],
+                               'latitude' : ('station_name', [10, 20, 30])})
+    return ColocatedData(arr)
+
+@pytest.mark.parametrize('resolution,periods', [
+    ('seasonal', ['DJF', 'MAM', 'JJA', 'SON']), ('yearly', ['year'])
+    ])
+def test__create_diurnal_weekly_data_object(resolution, periods):
+    coldata = _make_hourly_coldata()
+    data = coldata.data
+    repw = _create_diurnal_weekly_data_object(coldata, resolution)['rep_week']
+    if resolution == 'yearly':
+        repw = repw.expand_dims('period', axis=0)
+    assert repw.dims == ('period', 'data_source', 'dummy_time',
+                         'station_name')
+    assert repw.shape == (len(periods), 2, 168, 3)
+    npt.assert_allclose(repw.dummy_time, np.arange(168) / 24 + 1)
+    assert repw.latitude.values.tolist() == [10, 20, 30]
+    for i, period in enumerate(periods):
+        sub = data
+        if not period == 'year':
+            sub = data.where(data['time.season'] == period, drop=True)
+        # Wednesday 05:00
+        sub = sub.where((sub['time.dayofweek'] == 2) &
+                        (sub['time.hour'] == 5), drop=True)
+        npt.assert_allclose(repw[i, :, 2 * 24 + 5].values,
+                            sub.mean(dim='time').values)
+    assert np.isnan(repw[..., 2]).all()
+
+if __name__ == '__main__':
+    import sys
+    pytest.main(sys.argv)